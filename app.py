@@ -1,7 +1,19 @@
+import hashlib
+import json
 import os
+import time
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from tools.pdf_classifier import PDFClassifier
+from tools.model_store import ModelStore
+from tools.text_cache import TextCache
+from tools.document_pipeline import DocumentPipeline
+from tools.rule_classifier import RuleClassifier
+from tools.metrics import MetricsRegistry
+from tools.ingestion_queue import IngestionQueue
+from tools.search_index import SearchIndex
+from tools.static_assets import StaticAssets
+from tools.response_cache import ResponseCache
 
 path_abs = os.path.dirname(os.path.abspath(__file__))
 
@@ -9,16 +21,79 @@ app = Flask(__name__)
 app.config.from_pyfile('config.py')
 
 db = SQLAlchemy(app)
-pdf_classifier = PDFClassifier()
-pdf_classifier.load_pdfs(f"{path_abs}/uploads/ml_files/imposto_de_renda", label=2)
-pdf_classifier.load_pdfs(f"{path_abs}/uploads/ml_files/nota_fiscal", label=1)
-pdf_classifier.load_pdfs(f"{path_abs}/uploads/ml_files/boleto", label=0)
-pdf_classifier.train_model()
+metrics = MetricsRegistry()
+static_assets = StaticAssets(app.static_folder, app.config['STATIC_BUILD_FOLDER'])
+static_assets.build()
+# As páginas guardadas dependem dos templates e dos arquivos estáticos publicados: cada versão deles tem as suas
+# entradas no armazenamento compartilhado, e as de versões anteriores são removidas apenas quando mudam
+template_folder = os.path.join(app.root_path, app.template_folder)
+response_cache_version = hashlib.sha256(json.dumps([static_assets.manifest, sorted(
+    (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns) for entry in os.scandir(template_folder)
+)]).encode('utf-8')).hexdigest()[:16]
+response_cache = ResponseCache(max_entries=app.config['RESPONSE_CACHE_MAX_ENTRIES'],
+                               default_ttl=app.config['RESPONSE_CACHE_TTL'],
+                               store_path=app.config['RESPONSE_CACHE_PATH'], version=response_cache_version)
+if app.config['RESPONSE_CACHE_ENABLED']:
+    app.extensions['response_cache'] = response_cache
+pdf_classifier = PDFClassifier(text_cache=TextCache(app.config['TEXT_CACHE_PATH'], app.config['TEXT_CACHE_MAX_BYTES']),
+                               feature_space=app.config['CLASSIFIER_FEATURE_SPACE'],
+                               n_features=app.config['CLASSIFIER_N_FEATURES'],
+                               rules=RuleClassifier() if app.config['CLASSIFIER_RULES'] else None)
+training_folders = {
+    2: f"{path_abs}/uploads/ml_files/imposto_de_renda",
+    1: f"{path_abs}/uploads/ml_files/nota_fiscal",
+    0: f"{path_abs}/uploads/ml_files/boleto",
+}
+
+# Reaproveita o modelo salvo enquanto o corpus de treinamento não mudar
+model_store = ModelStore(app.config['MODEL_STORE_PATH'], training=app.config['CLASSIFIER_TRAINING'])
+training_started = time.perf_counter()
+model_source = 'store'
+if not model_store.load(pdf_classifier, training_folders):
+    model_source = 'trained'
+    if app.config['CLASSIFIER_TRAINING'] == 'streaming':
+        pdf_classifier.train_streaming(training_folders, chunk_size=app.config['CLASSIFIER_CHUNK_SIZE'])
+    else:
+        pdf_classifier.load_corpus(training_folders)
+        pdf_classifier.train_model()
+        pdf_classifier.release_corpus()
+    model_store.save(pdf_classifier, training_folders)
+
+metrics.gauge('upflow_classifier_info', 'Versão do modelo de classificação carregado (impressão digital do ModelStore).',
+              ['version', 'feature_space', 'source']).labels(
+    version=model_store.fingerprint(pdf_classifier, training_folders)[:16],
+    feature_space=app.config['CLASSIFIER_FEATURE_SPACE'], source=model_source).set(1)
+metrics.gauge('upflow_classifier_training_seconds',
+              'Duração do treinamento (ou do carregamento do ModelStore) na inicialização, em segundos.').set(
+    time.perf_counter() - training_started)
+if pdf_classifier.rules is not None:
+    rule_decisions = metrics.counter('upflow_classifier_decisions_total', 'Documentos decididos por estágio da cascata.',
+                                     ['stage'])
+
+    def collect_rule_decisions():
+        for stage, count in dict(pdf_classifier.rules.stats).items():
+            rule_decisions.labels(stage=stage).set_total(count)
+
+    metrics.add_collector(collect_rule_decisions)
+
+document_pipeline = DocumentPipeline(pdf_classifier, early_exit={
+    'threshold': app.config['CLASSIFIER_EARLY_EXIT_THRESHOLD'],
+    'max_pages': app.config['CLASSIFIER_EARLY_EXIT_MAX_PAGES'],
+    'max_chars': app.config['CLASSIFIER_EARLY_EXIT_MAX_CHARS'],
+}, metrics=metrics)
+search_index = SearchIndex({template_id: document_pipeline.fields_for_template(template_id)
+                            for template_id, _ in DocumentPipeline.DOCUMENT_TYPES.values()})
+ingestion_queue = IngestionQueue(app, max_workers=app.config['INGESTION_WORKERS'],
+                                 batch_size=app.config['INGESTION_BATCH_SIZE'], metrics=metrics)
 
 from views.views import *
 from views.views_companies import *
 from views.views_users import *
 from views.views_files import *
 
+# Retoma os arquivos que ficaram na fila quando o processo anterior foi encerrado
+with app.app_context():
+    recover_queued_files()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
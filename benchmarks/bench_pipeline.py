@@ -0,0 +1,263 @@
+"""
+Benchmark offline do pipeline de documentos sobre o corpus de `uploads/ml_files`.
+
+Mede, para cada PDF do corpus, o tempo de cada etapa (extração do texto pelo PyPDF2, `preprocess_text`,
+estágio de marcadores, vetorização, predição e `ExtractionStrategy.extract_data`) e reporta p50/p95/máximo
+por tipo de documento, além do tempo de treinamento, do carregamento a frio a partir do ModelStore e do pico
+de memória do processo. Quando há um arquivo `.json` de valores reais ao lado do PDF (como no corpus gerado por
+`benchmarks.generate_corpus`), também reporta a acurácia da extração de cada campo e se cada campo indexado é
+encontrado pela busca (/search) a partir do seu valor real. Cada execução é acrescentada a um arquivo JSON, junto com o commit avaliado, para
+que regressões entre commits fiquem visíveis. Com `--min-accuracy`, o benchmark termina com erro se algum campo
+ficar abaixo da acurácia mínima, para ser usado como verificação antes de alterar as expressões de extração.
+
+Uso:
+    python -m benchmarks.bench_pipeline [--corpus uploads/ml_files] [--output benchmark_results.json] [--repeat 3]
+    python -m benchmarks.bench_pipeline --corpus /tmp/corpus --repeat 1 --min-accuracy 1.0
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.pdf_classifier import PDFClassifier
+from tools.model_store import ModelStore
+from tools.rule_classifier import RuleClassifier
+from tools.document_pipeline import DocumentPipeline
+from tools.search_index import SearchIndex
+
+# Diretório do corpus -> rótulo do classificador
+CORPUS_FOLDERS = {'imposto_de_renda': 2, 'nota_fiscal': 1, 'boleto': 0}
+
+
+def percentiles(samples):
+    """
+    Retorna p50, p95 e máximo (em milissegundos) de uma lista de tempos em segundos.
+    """
+    if not samples:
+        return {'p50_ms': None, 'p95_ms': None, 'max_ms': None, 'count': 0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] * 1000
+
+    return {'p50_ms': round(pick(0.50), 3), 'p95_ms': round(pick(0.95), 3),
+            'max_ms': round(ordered[-1] * 1000, 3), 'count': len(ordered)}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def peak_rss_mb():
+    # ru_maxrss é informado em KB no Linux e em bytes no macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def benchmark_training(folders):
+    """
+    Mede o carregamento do corpus e o treinamento, e o carregamento a frio dos artefatos salvos no ModelStore.
+    """
+    classifier = PDFClassifier()
+    _, load_seconds = timed(classifier.load_corpus, folders)
+    _, train_seconds = timed(classifier.train_model, False)
+
+    with tempfile.TemporaryDirectory() as store_path:
+        store = ModelStore(store_path)
+        store.save(classifier, folders)
+        _, warm_start_seconds = timed(store.load, PDFClassifier(), folders)
+
+    classifier.release_corpus()
+    return classifier, {
+        'corpus_load_s': round(load_seconds, 4),
+        'train_s': round(train_seconds, 4),
+        'model_store_load_s': round(warm_start_seconds, 4),
+    }
+
+
+def flatten_fields(data, path=()):
+    """
+    Percorre um resultado de extração aninhado, gerando tuplas ("Seção/Campo", valor).
+    """
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from flatten_fields(value, path + (key,))
+        else:
+            yield '/'.join(path + (key,)), value
+
+
+def field_matches(extracted, truth_path, counts):
+    """
+    Compara os dados extraídos com os valores reais de `truth_path`, acumulando acertos por campo em `counts`.
+    """
+    with open(truth_path, 'r', encoding='utf-8') as file:
+        truth = dict(flatten_fields(json.load(file)))
+    # Normaliza tuplas das tabelas para listas, como no JSON dos valores reais
+    values = dict(flatten_fields(json.loads(json.dumps(extracted, ensure_ascii=False))))
+    for field, expected in truth.items():
+        hits, total = counts.get(field, (0, 0))
+        counts[field] = (hits + (values.get(field) == expected), total + 1)
+
+
+def search_matches(search_index, template_id, extracted, truth_path, counts):
+    """
+    Verifica se cada campo indexado do documento é encontrado pela busca a partir do seu valor real (nos campos
+    'prefix', pela primeira palavra do valor), como em /search, acumulando acertos por campo em `counts`.
+    """
+    with open(truth_path, 'r', encoding='utf-8') as file:
+        truth = dict(flatten_fields(json.load(file)))
+    indexed = {entry['FieldName']: entry for entry in search_index.entries(template_id, extracted)}
+    for name, (_, field) in search_index.fields.get(template_id, {}).items():
+        expected = truth.get(name)
+        if not isinstance(expected, str) or not expected:
+            continue
+        value = search_index.query_value(field, expected.split()[0] if field.search == 'prefix' else expected)
+        entry = indexed.get(name, {})
+        stored = entry.get('ValueText', entry.get('ValueNumber', entry.get('ValueDate')))
+        if value is None or stored is None:
+            found = False
+        else:
+            found = stored.startswith(value) if field.search == 'prefix' else stored == value
+        hits, total = counts.get(name, (0, 0))
+        counts[name] = (hits + found, total + 1)
+
+
+def benchmark_stages(classifier, folders, repeat):
+    """
+    Mede cada etapa do pipeline para cada PDF do corpus, `repeat` vezes, e a acurácia de cada campo extraído
+    quando há valores reais disponíveis, junto com a acurácia da busca por esses valores no índice de busca.
+    """
+    pipeline = DocumentPipeline(classifier)
+    search_index = SearchIndex({template_id: pipeline.fields_for_template(template_id)
+                                for template_id, _ in DocumentPipeline.DOCUMENT_TYPES.values()})
+    rules = RuleClassifier()
+    names = {label: os.path.basename(path) for label, path in folders.items()}
+    stages = {name: {stage: [] for stage in ('pdf_text', 'preprocess', 'rules', 'vectorize', 'predict', 'extract')}
+              for name in names.values()}
+    accuracy = {name: {} for name in names.values()}
+    search_accuracy = {name: {} for name in names.values()}
+
+    for label, path in folders.items():
+        document_type = classifier.LABEL_NAMES[label]
+        extractor = pipeline.extractors[document_type]
+        timings = stages[names[label]]
+        for file_name in sorted(os.listdir(path)):
+            if not file_name.lower().endswith('.pdf'):
+                continue
+            pdf_path = os.path.join(path, file_name)
+            for _ in range(repeat):
+                text, seconds = timed(classifier.read_pdf_text, pdf_path)
+                timings['pdf_text'].append(seconds)
+                preprocessed_text, seconds = timed(classifier.preprocess_text, text)
+                timings['preprocess'].append(seconds)
+                _, seconds = timed(rules.classify, text)
+                timings['rules'].append(seconds)
+                vectorized_text, seconds = timed(classifier.vectorizer.transform, [preprocessed_text])
+                timings['vectorize'].append(seconds)
+                _, seconds = timed(classifier.model.predict_proba, vectorized_text)
+                timings['predict'].append(seconds)
+                data, seconds = timed(extractor.extract, text)
+                timings['extract'].append(seconds)
+            truth_path = os.path.splitext(pdf_path)[0] + '.json'
+            if os.path.exists(truth_path):
+                field_matches(data, truth_path, accuracy[names[label]])
+                search_matches(search_index, DocumentPipeline.DOCUMENT_TYPES[document_type][0], data, truth_path,
+                               search_accuracy[names[label]])
+
+    report = {
+        document_type: {stage: percentiles(samples) for stage, samples in timings.items()}
+        for document_type, timings in stages.items()
+    }
+    field_accuracy, field_search_accuracy = ({
+        document_type: {field: round(hits / total, 4) for field, (hits, total) in counts.items()}
+        for document_type, counts in results.items() if counts
+    } for results in (accuracy, search_accuracy))
+    return report, rules.hit_rates(), field_accuracy, field_search_accuracy
+
+
+def append_result(output_path, result):
+    if os.path.exists(output_path):
+        with open(output_path, 'r') as file:
+            data = json.load(file)
+    else:
+        data = {'runs': []}
+    data['runs'].append(result)
+    with open(output_path, 'w') as file:
+        json.dump(data, file, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark offline do pipeline de documentos.')
+    parser.add_argument('--corpus', default='uploads/ml_files', help='Diretório com as pastas de cada tipo de documento.')
+    parser.add_argument('--output', default='benchmark_results.json', help='Arquivo JSON onde o resultado é acrescentado.')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetições de cada documento por etapa.')
+    parser.add_argument('--min-accuracy', type=float, default=None,
+                        help='Acurácia mínima de cada campo com valores reais; abaixo dela, termina com erro.')
+    args = parser.parse_args()
+
+    folders = {label: os.path.join(args.corpus, folder) for folder, label in CORPUS_FOLDERS.items()}
+
+    classifier, training = benchmark_training(folders)
+    stages, rule_hit_rates, field_accuracy, search_accuracy = benchmark_stages(classifier, folders, args.repeat)
+
+    result = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_revision(),
+        'python': platform.python_version(),
+        'corpus': args.corpus,
+        'repeat': args.repeat,
+        'training': training,
+        'stages': stages,
+        'rule_hit_rates': rule_hit_rates,
+        'field_accuracy': field_accuracy,
+        'search_accuracy': search_accuracy,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    append_result(args.output, result)
+
+    print(f"Treinamento: {training}")
+    for document_type, timings in stages.items():
+        for stage, stats in timings.items():
+            print(f"{document_type:<18} {stage:<10} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms "
+                  f"max={stats['max_ms']}ms n={stats['count']}")
+    print(f"Marcadores: {rule_hit_rates}")
+    for document_type, fields in field_accuracy.items():
+        for field, rate in fields.items():
+            print(f"{document_type:<18} acurácia {field}: {rate:.2%}")
+    for document_type, fields in search_accuracy.items():
+        for field, rate in fields.items():
+            print(f"{document_type:<18} busca {field}: {rate:.2%}")
+    print(f"Pico de memória: {result['peak_rss_mb']} MB -> {args.output}")
+
+    if args.min_accuracy is not None:
+        below = [(kind, document_type, field, rate)
+                 for kind, accuracies in (('acurácia', field_accuracy), ('busca', search_accuracy))
+                 for document_type, fields in accuracies.items()
+                 for field, rate in fields.items() if rate < args.min_accuracy]
+        for kind, document_type, field, rate in below:
+            print(f"ABAIXO DO MÍNIMO: {document_type} {kind} {field}: {rate:.2%} < {args.min_accuracy:.2%}")
+        if below or not field_accuracy:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
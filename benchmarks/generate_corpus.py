@@ -0,0 +1,299 @@
+"""
+Gerador de corpus sintético de boletos, notas fiscais e extratos de imposto de renda para testes de escala.
+
+Cada documento é um PDF gerado diretamente (sem dependências além da biblioteca padrão) com o layout textual
+que as expressões de `tools/extractors` esperam, acompanhado de um arquivo `.json` com os valores reais de
+cada campo, no mesmo formato do resultado das estratégias de extração. Os arquivos são gravados em
+`<destino>/<tipo>/`, a mesma organização de `uploads/ml_files`, e a geração é determinística para uma mesma
+semente, paralela e feita em fluxo, de modo que milhões de documentos podem ser gerados sem acumular memória.
+
+Uso:
+    python -m benchmarks.generate_corpus --output /tmp/corpus --count 10000 [--types boleto nota_fiscal] [--seed 42]
+"""
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+FIRST_NAMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela', 'João',
+               'Larissa', 'Marcos', 'Natália', 'Otávio', 'Paula', 'Rafael', 'Sofia', 'Tiago', 'Vitória', 'Lúcia']
+LAST_NAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+              'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Araújo', 'Fernandes', 'Rocha', 'Barbosa', 'Conceição']
+COMPANIES = ['Academia XYZ', 'Mercado Bom Preço', 'Escola Saber', 'Clínica Vida', 'Auto Peças União',
+             'Padaria Pão Quente', 'Construtora Alicerce', 'Farmácia Saúde', 'Livraria Página', 'Ótica Visão']
+CITIES = [('SP', 'SAO PAULO'), ('RJ', 'RIO DE JANEIRO'), ('MG', 'BELO HORIZONTE'), ('CE', 'FORTALEZA'),
+          ('RS', 'PORTO ALEGRE'), ('PR', 'CURITIBA'), ('BA', 'SALVADOR'), ('PE', 'RECIFE')]
+STREETS = ['Rua das Flores', 'Avenida Brasil', 'Alameda Santos', 'Rua XV de Novembro', 'Avenida Paulista']
+NATUREZAS = [('VENDA DE MERCADORIA ADQUIRIDA OU RECEBIDA', 'DE TERCEIROS'),
+             ('PRESTACAO DE SERVICOS TRIBUTADA PELO', 'ISSQN'),
+             ('REMESSA DE MERCADORIA PARA', 'DEMONSTRACAO')]
+RECEITAS = ['Salário', 'Aluguel', 'Herança', 'Dividendos', 'Honorários']
+DESPESAS = ['Saúde', 'Educação', 'Compra de Móveis', 'Previdência', 'Pensão']
+
+PAGE_LINES = 54
+
+
+def _escape(line):
+    # Strings literais do PDF em WinAnsiEncoding, com octais para bytes fora do ASCII imprimível
+    out = []
+    for byte in line.encode('cp1252'):
+        char = chr(byte)
+        if char in '\\()':
+            out.append('\\' + char)
+        elif 32 <= byte < 127:
+            out.append(char)
+        else:
+            out.append('\\%03o' % byte)
+    return ''.join(out)
+
+
+def write_pdf(path, lines):
+    """
+    Grava um PDF mínimo com uma linha de texto (Helvetica) por item de `lines`, quebrando em páginas.
+    """
+    pages = [lines[i:i + PAGE_LINES] for i in range(0, len(lines), PAGE_LINES)] or [[]]
+    font_id = 3
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>']
+    kids = []
+    for page in pages:
+        content = ('BT /F1 10 Tf 14 TL 40 800 Td\n' +
+                   '\n'.join(f'({_escape(line)}) Tj T*' for line in page) + '\nET').encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+        content_id = len(objects)
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>' % (font_id, content_id))
+        kids.append(b'%d 0 R' % len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [' + b' '.join(kids) + b'] /Count %d >>' % len(kids)
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as file:
+        file.write(out)
+
+
+def _person(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def _digits(rng, size):
+    return ''.join(rng.choice('0123456789') for _ in range(size))
+
+
+def _cnpj(rng):
+    digits = _digits(rng, 14)
+    return digits, f'{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}'
+
+
+def _cpf(rng):
+    digits = _digits(rng, 11)
+    return f'{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}'
+
+
+def _date(rng, start=date(2023, 1, 1), days=730):
+    return start + timedelta(days=rng.randrange(days))
+
+
+def _money(rng, low, high):
+    cents = rng.randrange(low * 100, high * 100)
+    return cents / 100
+
+
+def _br(value, thousands=False):
+    # Formato brasileiro: "1234,56" ou, com separador de milhar, "1.234,56"
+    text = f'{value:,.2f}' if thousands else f'{value:.2f}'
+    return text.translate(str.maketrans(',.', '.,'))
+
+
+def boleto(rng):
+    """
+    Retorna as linhas e os valores reais de um boleto sintético.
+    """
+    cedente = rng.choice(COMPANIES)
+    agencia = f'{_digits(rng, 4)} / {_digits(rng, 6)}'
+    nosso_numero = _digits(rng, 17)
+    numero_documento = _digits(rng, 6)
+    _, cnpj = _cnpj(rng)
+    vencimento = _date(rng).strftime('%d/%m/%Y')
+    valor = _money(rng, 50, 5000)
+    desconto, deducoes, mora, acrescimos = (_money(rng, 0, 100) for _ in range(4))
+    cobrado = valor - desconto - deducoes + mora + acrescimos
+    sacado = _person(rng)
+    endereco = f'{rng.choice(STREETS)}, {rng.randrange(1, 3000)}'
+    cep = f'{_digits(rng, 5)}-{_digits(rng, 3)}'
+    instrucoes = f'Não receber após {rng.randrange(5, 60)} dias do vencimento.'
+    autenticacao = _digits(rng, 20)
+    linha = f'237-{_digits(rng, 5)}.{_digits(rng, 5)} {_digits(rng, 5)}.{_digits(rng, 6)} {_digits(rng, 1)} {_digits(rng, 14)}'
+
+    lines = [
+        # Como nos boletos reais: "Recibo do Sacado" no cabeçalho e o nome do cedente na mesma linha do rótulo
+        # seguinte
+        'Recibo do Sacado', f'Linha digitável: {linha}',
+        'Cedente', f'{cedente} Agência/Código do Cedente', agencia, 'Espécie', 'R$',
+        'Nosso Número', nosso_numero, 'Número do Documento', numero_documento, 'CPF/CNPJ', cnpj,
+        'Vencimento', vencimento, 'Valor do Documento', _br(valor, thousands=True),
+        '(-) Desconto/Abatimento', _br(desconto), '(-) Outras Deduções', _br(deducoes),
+        '(+) Mora/Multa', _br(mora), '(+) Outros Acréscimos', _br(acrescimos),
+        '(=) Valor Cobrado', _br(cobrado, thousands=True),
+        'Instruções (Texto de responsabilidade do Cedente)', instrucoes,
+        'Sacado', sacado, 'Autenticação mecânica', autenticacao,
+        f'Endereço: {endereco}', f'Bairro, CEP: {cep}',
+    ]
+    truth = {
+        'Cedente': {'Nome': cedente, 'Agência/Código': agencia, 'Espécie': 'R$'},
+        'Documento': {
+            'Nosso Número': nosso_numero, 'Número do Documento': numero_documento, 'CPF/CNPJ': cnpj,
+            'Vencimento': vencimento, 'Valor do Documento': f'{valor:.2f}'
+        },
+        'Descontos e Acréscimos': {
+            'Desconto/Abatimento': f'{desconto:.2f}', 'Outras Deduções': f'{deducoes:.2f}',
+            'Mora/Multa': f'{mora:.2f}', 'Outros Acréscimos': f'{acrescimos:.2f}', 'Valor Cobrado': f'{cobrado:.2f}'
+        },
+        'Sacado': {'Nome': sacado, 'Endereço': endereco, 'Bairro e CEP': cep},
+        'Instruções': instrucoes,
+        'Autenticação Mecânica': autenticacao
+    }
+    return lines, truth
+
+
+def nota_fiscal(rng):
+    """
+    Retorna as linhas e os valores reais de uma nota fiscal eletrônica sintética.
+    """
+    numero = _digits(rng, 7)
+    serie = str(rng.randrange(1, 999))
+    emissao = f"{_date(rng).strftime('%d/%m/%Y')} {rng.randrange(24):02d}:{rng.randrange(60):02d}:00"
+    evento = f"{_date(rng).strftime('%d/%m/%Y')} {rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+    chave = _digits(rng, 44)
+    natureza = rng.choice(NATUREZAS)
+    emitente_cnpj, _ = _cnpj(rng)
+    emitente_uf, emitente_municipio = rng.choice(CITIES)
+    razao_social = f'{rng.choice(COMPANIES).upper()} LTDA'
+    destinatario_cnpj, _ = _cnpj(rng)
+    destinatario_uf, _ = rng.choice(CITIES)
+    destinatario = f'{_person(rng).upper()} COMERCIO'
+    valor = _money(rng, 100, 20000)
+
+    lines = [
+        f'NFe No {numero}', f'Série {serie}', f'Data de Emissão {emissao}', 'Nota Fiscal', 'Dados da Nota Fiscal',
+        'Chave de', f'Acesso{chave}', 'Modelo55 - NF-E EMITIDA EM SUBSTITUIÇÃO AO MODELO 1', 'OU 1A',
+        'Natureza da', f'Operação{natureza[0]}', natureza[1],
+        'Evento Mais', 'RecenteAutorização de Uso', f'Data/Hora Evento Mais Recente {evento}',
+        'Dados do Emitente', f'CPF/CNPJ {emitente_cnpj}', f'Razão Social {razao_social}',
+        f'UF {emitente_uf}', f'Município {emitente_municipio}',
+        'Dados do Destinatário', f'CNPJ {destinatario_cnpj}', f'Nome{destinatario}', f'UF {destinatario_uf}',
+        'Indicador IE NÃO CONTRIBUINTE', 'Destino da', 'Operação2 - OPERAÇÃO INTERESTADUAL',
+        'Consumidor Final 1 - CONSUMIDOR FINAL', 'Presença do', 'Comprador0 - NÃO SE APLICA',
+        f'Valor Nota Fiscal {_br(valor)}', 'Nota Fiscal gerada automaticamente',
+    ]
+    truth = {
+        'Dados da Nota Fiscal': {
+            'Numero da Nota Fiscal': numero, 'Serie': serie, 'Data de Emissao': emissao,
+            'Modelo': '55 - NF-E EMITIDA EM SUBSTITUIÇÃO AO MODELO 1\nOU 1A',
+            'Natureza da Operacao': f'{natureza[0]}\n{natureza[1]}', 'Evento Mais Recente': 'Autorização de Uso',
+            'Data/Hora Evento Mais Recente': evento, 'Chave de Acesso': chave
+        },
+        'Dados do Emitente': {
+            'CPF/CNPJ': emitente_cnpj, 'Razao Social': razao_social, 'UF': emitente_uf,
+            'Municipio': emitente_municipio
+        },
+        'Dados do Destinatario': {
+            'CNPJ': destinatario_cnpj, 'Nome': destinatario, 'UF': destinatario_uf,
+            'Indicador IE': 'NÃO CONTRIBUINTE', 'Destino da Operacao': '2 - OPERAÇÃO INTERESTADUAL',
+            'Consumidor Final': '1 - CONSUMIDOR FINAL', 'Presenca do Comprador': '0 - NÃO SE APLICA'
+        },
+        'Valor Nota Fiscal': {'Valor': f'{valor:.2f}'},
+        'Nota': 'Nota Fiscal gerada automaticamente'
+    }
+    return lines, truth
+
+
+def imposto_de_renda(rng):
+    """
+    Retorna as linhas e os valores reais de um extrato de imposto de renda sintético.
+    """
+    nome = _person(rng)
+    cpf = _cpf(rng)
+    year = rng.randrange(2019, 2025)
+    inicio, fim = f'01/01/{year}', f'31/12/{year}'
+
+    def rows(descriptions, low, high):
+        return [(_date(rng, date(year, 1, 1), 365).strftime('%d/%m/%Y'), rng.choice(descriptions),
+                 float(rng.randrange(low, high) * 100)) for _ in range(rng.randrange(1, 12))]
+
+    receitas = rows(RECEITAS, 10, 300)
+    despesas = rows(DESPESAS, 1, 100)
+    total_receitas = sum(value for _, _, value in receitas)
+    total_despesas = sum(value for _, _, value in despesas)
+    imposto = max(total_receitas - total_despesas, 0.0)
+
+    lines = ['Extrato do Imposto de Renda', f'Nome do Contribuinte: {nome}', f'CPF: {cpf}',
+             f'Período: {inicio} - {fim}', 'Receitas', 'Data Descrição Valor (R$)']
+    lines += [f'{day} {description} {value}' for day, description, value in receitas]
+    lines += ['Despesas', 'Data Descrição Valor (R$)']
+    lines += [f'{day} {description} {value}' for day, description, value in despesas]
+    lines += ['Resumo', f'Total de Receitas: R$ {total_receitas}', f'Total de Despesas: R$ {total_despesas}',
+              f'Imposto a Pagar: R$ {imposto}']
+    truth = {
+        'Dados do Contribuinte': {'Nome': nome, 'CPF': cpf, 'Período Inicial': inicio, 'Período Final': fim},
+        'Receitas': {'Tabela': [[day, description, f'{value:.2f}'] for day, description, value in receitas]},
+        'Despesas': {'Tabela': [[day, description, f'{value:.2f}'] for day, description, value in despesas]},
+        'Resumo': {
+            'Total de Receitas': f'{total_receitas:.2f}', 'Total de Despesas': f'{total_despesas:.2f}',
+            'Imposto a Pagar': f'{imposto:.2f}'
+        },
+        'Nota': 'Extrato do Imposto de Renda'
+    }
+    return lines, truth
+
+
+GENERATORS = {'boleto': boleto, 'nota_fiscal': nota_fiscal, 'imposto_de_renda': imposto_de_renda}
+
+
+def generate_document(task):
+    """
+    Gera um documento e o seu arquivo de valores reais. `task` é a tupla (destino, tipo, índice, semente).
+    """
+    output, document_type, index, seed = task
+    rng = random.Random(f'{seed}-{document_type}-{index}')
+    lines, truth = GENERATORS[document_type](rng)
+    base_path = os.path.join(output, document_type, f'{document_type}_synthetic_{index:08d}')
+    write_pdf(base_path + '.pdf', lines)
+    with open(base_path + '.json', 'w', encoding='utf-8') as file:
+        json.dump(truth, file, ensure_ascii=False)
+    return document_type
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera um corpus sintético de documentos PDF com valores reais.')
+    parser.add_argument('--output', required=True, help='Diretório de destino (uma pasta por tipo de documento).')
+    parser.add_argument('--count', type=int, default=1000, help='Número de documentos de cada tipo.')
+    parser.add_argument('--types', nargs='+', choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument('--seed', default='42', help='Semente da geração; a mesma semente gera o mesmo corpus.')
+    parser.add_argument('--workers', type=int, default=None, help='Número de processos (padrão: CPUs da máquina).')
+    args = parser.parse_args()
+
+    for document_type in args.types:
+        os.makedirs(os.path.join(args.output, document_type), exist_ok=True)
+
+    tasks = ((args.output, document_type, index, args.seed)
+             for index in range(args.count) for document_type in args.types)
+    total = args.count * len(args.types)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for done, _ in enumerate(executor.map(generate_document, tasks, chunksize=256), 1):
+            if done % 10000 == 0 or done == total:
+                print(f'{done}/{total} documentos gerados')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,6 @@
 import os
+import json
+from functools import partial
 
 SECRET_KEY = 'flaskDbUpflow'
 SQLALCHEMY_DATABASE_URI = \
@@ -9,6 +11,55 @@ SQLALCHEMY_DATABASE_URI = \
         servidor = 'localhost',
         database = 'db_upflow'
     )
+# Grava as colunas JSON em UTF-8 (sem escapes \uXXXX)
+SQLALCHEMY_ENGINE_OPTIONS = {'json_serializer': partial(json.dumps, ensure_ascii=False)}
 UPLOAD_PATH = os.path.dirname(os.path.abspath(__file__)) + "/uploads"
 UPLOAD_FOLDER = os.path.dirname(os.path.abspath(__file__)) + "/uploads/files"
-MAX_CONTENT_LENGTH = 16 * 1024 * 1024
\ No newline at end of file
+# Arquivos de /uploads/<nome>: tempo de cache no navegador e entrega pelo proxy da frente (None: pelo próprio Flask;
+# 'x-accel': X-Accel-Redirect do nginx para UPLOADS_ACCEL_PREFIX, uma location `internal` com `alias` para uploads/;
+# 'x-sendfile': X-Sendfile com o caminho do arquivo, para Apache/lighttpd)
+UPLOADS_MAX_AGE = 60 * 60
+UPLOADS_SENDFILE = None
+UPLOADS_ACCEL_PREFIX = '/protected-uploads/'
+MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+# Versões minificadas, pré-comprimidas e com hash no nome dos arquivos de static/, geradas na inicialização
+STATIC_BUILD_FOLDER = os.path.dirname(os.path.abspath(__file__)) + "/static/dist"
+STATIC_ASSETS_MAX_AGE = 365 * 24 * 60 * 60
+# Cache das páginas renderizadas (início, dashboard, serviços e sobre), por rota e nível de permissão: LRU em memória
+# em cada processo e, com RESPONSE_CACHE_PATH, um diretório compartilhado entre os processos da máquina
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_TTL = 5 * 60
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_PATH = None
+LIST_FILES_PAGE_SIZE = 50
+EXPORT_BATCH_SIZE = 1000
+SEARCH_PAGE_SIZE = 50
+PIPELINE_MAX_WORKERS = 4
+# Processamento dos uploads em segundo plano (False processa os arquivos dentro da própria requisição)
+INGESTION_ASYNC = True
+INGESTION_WORKERS = 2
+INGESTION_BATCH_SIZE = 8
+# Arquivos em 'Processing' enviados há mais tempo que isto (em segundos) são enfileirados novamente na
+# inicialização: o processo que os processava terminou antes de concluir
+INGESTION_STALE_SECONDS = 15 * 60
+# Exposição das métricas do pipeline em /metrics (formato texto do Prometheus), apenas para os endereços de
+# METRICS_ALLOWED_IPS (o endereço de quem conecta; atrás de um proxy, o do proxy) ou para requisições com o
+# cabeçalho "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_ENABLED = True
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+METRICS_TOKEN = None
+# 'count' (vocabulário fixo) ou 'hashing' (sem estado, aceita termos novos nas atualizações incrementais)
+CLASSIFIER_FEATURE_SPACE = 'count'
+CLASSIFIER_N_FEATURES = 2 ** 18
+# Decide pelos marcadores textuais de cada tipo antes de recorrer ao modelo
+CLASSIFIER_RULES = True
+# 'memory' (corpus inteiro em memória) ou 'streaming' (em blocos de CLASSIFIER_CHUNK_SIZE PDFs; requer 'hashing')
+CLASSIFIER_TRAINING = 'memory'
+CLASSIFIER_CHUNK_SIZE = 256
+# Classificação parcial: para de ler páginas ao atingir a probabilidade ou os limites abaixo
+CLASSIFIER_EARLY_EXIT_THRESHOLD = 0.95
+CLASSIFIER_EARLY_EXIT_MAX_PAGES = 3
+CLASSIFIER_EARLY_EXIT_MAX_CHARS = 20000
+MODEL_STORE_PATH = os.path.dirname(os.path.abspath(__file__)) + "/model_store"
+TEXT_CACHE_PATH = os.path.dirname(os.path.abspath(__file__)) + "/text_cache"
+TEXT_CACHE_MAX_BYTES = 256 * 1024 * 1024
\ No newline at end of file
@@ -1,5 +1,6 @@
 from functools import wraps
-from flask import redirect, url_for, session, flash
+from urllib.parse import urlencode
+from flask import redirect, url_for, session, flash, request, current_app, make_response, Response
 from enums import PermissionLevel
 
 def login_required(f):
@@ -44,3 +45,43 @@ def permission_required(required_permission):
             return f(*args, **kwargs)
         return decorated_function
     return decorator
+
+def cached_response(ttl=None, query_args=()):
+    """
+    Decorador para servir a resposta renderizada de uma rota a partir do cache de respostas (ResponseCache), sem
+    renderizar o template novamente.
+
+    A chave é a rota (o caminho e apenas os parâmetros da query string listados em `query_args`, para que
+    parâmetros arbitrários não criem entradas novas), o estado de login e o nível de permissão da sessão, que é
+    tudo o que as páginas usam da sessão. Deve ser aplicado abaixo de login_required/permission_required, para
+    que as verificações de acesso sejam feitas antes do cache. Apenas requisições GET com resposta 200 são
+    guardadas; com mensagens flash pendentes, a rota é executada normalmente e a resposta não é guardada.
+    As páginas em cache não dependem dos arquivos enviados; uma rota que passe a depender deles deve ter as suas
+    entradas invalidadas (ResponseCache.invalidate) pelas rotas que alteram esses dados.
+
+    Parâmetros:
+    - ttl: Tempo de vida das respostas, em segundos (por padrão, RESPONSE_CACHE_TTL).
+    - query_args: Parâmetros da query string usados pela rota, que entram na chave.
+
+    Retorna:
+    - Decorador que consulta e preenche o cache de respostas.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None or request.method != 'GET' or '_flashes' in session:
+                return f(*args, **kwargs)
+            query = urlencode(sorted((name, value) for name in query_args for value in request.args.getlist(name)))
+            key = f"{request.endpoint}|{request.path}?{query}|{bool(session.get('logged_in'))}|{session.get('permission_level_id')}"
+            cached = cache.get(key)
+            if cached is not None:
+                body, status, headers = cached
+                return Response(body, status=status, headers=headers)
+            response = make_response(f(*args, **kwargs))
+            # Sessão alterada pela rota (por exemplo, mensagens flash exibidas na página): a resposta não é reutilizável
+            if response.status_code == 200 and not response.direct_passthrough and not session.modified:
+                cache.set(key, (response.get_data(), response.status_code, list(response.headers)), ttl)
+            return response
+        return decorated_function
+    return decorator
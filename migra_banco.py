@@ -0,0 +1,378 @@
+import hashlib
+import json
+import os
+import re
+from decimal import Decimal
+import mysql.connector
+from mysql.connector import errorcode
+
+# Migrações aplicadas a um banco já existente (criado por prepara_banco.py), em ordem.
+# Cada migração é uma lista de comandos SQL ou de funções que recebem a conexão e o cursor; as já aplicadas
+# ficam registradas em tbMigrations e não são executadas novamente.
+MIGRATIONS = []
+
+
+def hash_existing_files(conn, cursor):
+    """
+    Preenche o ContentHash dos arquivos já cadastrados, lendo cada arquivo do disco em blocos.
+    Arquivos ausentes, ou com conteúdo repetido em outro registro, ficam com ContentHash nulo.
+    """
+    cursor.execute("SELECT FileID, FilePath FROM tbFiles WHERE ContentHash IS NULL;")
+    seen = set()
+    for file_id, file_path in cursor.fetchall():
+        if not os.path.exists(file_path):
+            continue
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+        if content_hash in seen:
+            continue
+        seen.add(content_hash)
+        cursor.execute("UPDATE tbFiles SET ContentHash = %s WHERE FileID = %s;", (content_hash, file_id))
+
+
+MIGRATIONS.append(('001_files_content_hash', [
+    "ALTER TABLE tbFiles ADD COLUMN ContentHash CHAR(64) NULL;",
+    "ALTER TABLE tbFiles ADD UNIQUE INDEX ux_files_content_hash (ContentHash);",
+    hash_existing_files,
+]))
+
+MIGRATIONS.append(('002_files_insertion_date_index', [
+    "ALTER TABLE tbFiles ADD INDEX ix_files_insertion_date (InsertionDate, FileID);",
+]))
+
+def repair_text(value):
+    """
+    Desfaz a corrupção de acentos dos dados extraídos antes da gravação em UTF-8 (por exemplo, 'AutorizaÃ§Ã£o'
+    volta a ser 'Autorização'). Textos que não estão corrompidos são mantidos.
+    """
+    if isinstance(value, dict):
+        return {key: repair_text(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [repair_text(item) for item in value]
+    if isinstance(value, str):
+        try:
+            return value.encode('latin1').decode('utf-8')
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            return value
+    return value
+
+
+def normalize_file_data(conn, cursor, batch_size=500):
+    """
+    Converte o campo Information de tbFileData, gravado como texto JSON com escapes (json.dumps) dentro da
+    coluna JSON, em um objeto JSON nativo em UTF-8. Os registros são lidos e atualizados em lotes pela chave
+    primária, com um commit por lote, para não manter uma única transação longa sobre a tabela inteira.
+    """
+    last_id = 0
+    while True:
+        cursor.execute("SELECT DataID, Information FROM tbFileData WHERE DataID > %s ORDER BY DataID LIMIT %s;",
+                       (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        updates = []
+        for data_id, information in rows:
+            value = json.loads(information) if isinstance(information, (str, bytes, bytearray)) else information
+            if isinstance(value, str):
+                # Texto JSON gravado dentro da coluna JSON (dupla codificação)
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError:
+                    continue
+            updates.append((json.dumps(repair_text(value), ensure_ascii=False), data_id))
+        if updates:
+            cursor.executemany("UPDATE tbFileData SET Information = CAST(%s AS JSON) WHERE DataID = %s;", updates)
+        conn.commit()
+        last_id = rows[-1][0]
+        print(f'{last_id}', end=' ', flush=True)
+
+
+MIGRATIONS.append(('003_file_data_native_json', [
+    normalize_file_data,
+]))
+
+# Colunas geradas com os campos mais consultados de cada template (as mesmas de prepara_banco.py). São virtuais:
+# não ocupam espaço na tabela, apenas nos índices, e o ALTER TABLE não reescreve os registros existentes.
+# As datas são validadas pelo calendário, inclusive anos bissextos, antes do STR_TO_DATE: no modo estrito, uma
+# data inexistente como 31/02/2024 faria o INSERT falhar.
+FILE_DATA_GENERATED_COLUMNS = [
+    '''TaxID VARCHAR(18) GENERATED ALWAYS AS (CASE
+        WHEN Information->>'$."Documento"."CPF/CNPJ"' REGEXP '^[0-9./-]{11,18}$'
+            THEN Information->>'$."Documento"."CPF/CNPJ"'
+        WHEN Information->>'$."Dados do Emitente"."CPF/CNPJ"' REGEXP '^[0-9./-]{11,18}$'
+            THEN Information->>'$."Dados do Emitente"."CPF/CNPJ"'
+        WHEN Information->>'$."Dados do Contribuinte"."CPF"' REGEXP '^[0-9./-]{11,18}$'
+            THEN Information->>'$."Dados do Contribuinte"."CPF"'
+    END) VIRTUAL''',
+    '''DueDate DATE GENERATED ALWAYS AS (CASE
+        WHEN Information->>'$."Documento"."Vencimento"' REGEXP '^(((0[1-9]|1[0-9]|2[0-8])/(0[1-9]|1[0-2])|(29|30)/(0[13-9]|1[0-2])|31/(0[13578]|1[02]))/[1-9][0-9]{3}|29/02/([1-9][0-9](0[48]|[2468][048]|[13579][26])|(1[26]|[2468][048]|[3579][26])00))$'
+            THEN STR_TO_DATE(Information->>'$."Documento"."Vencimento"', '%d/%m/%Y')
+    END) VIRTUAL''',
+    '''Amount DECIMAL(15, 2) GENERATED ALWAYS AS (CASE
+        WHEN Information->>'$."Documento"."Valor do Documento"' REGEXP '^-?[0-9]{1,13}([.][0-9]+)?$'
+            THEN CAST(Information->>'$."Documento"."Valor do Documento"' AS DECIMAL(15, 2))
+        WHEN Information->>'$."Valor Nota Fiscal"."Valor"' REGEXP '^-?[0-9]{1,13}([.][0-9]+)?$'
+            THEN CAST(Information->>'$."Valor Nota Fiscal"."Valor"' AS DECIMAL(15, 2))
+    END) VIRTUAL''',
+    '''AccessKey CHAR(44) GENERATED ALWAYS AS (CASE
+        WHEN Information->>'$."Dados da Nota Fiscal"."Chave de Acesso"' REGEXP '^[0-9]{44}$'
+            THEN Information->>'$."Dados da Nota Fiscal"."Chave de Acesso"'
+    END) VIRTUAL''',
+    '''IssueDate DATETIME GENERATED ALWAYS AS (CASE
+        WHEN Information->>'$."Dados da Nota Fiscal"."Data de Emissao"' REGEXP '^(((0[1-9]|1[0-9]|2[0-8])/(0[1-9]|1[0-2])|(29|30)/(0[13-9]|1[0-2])|31/(0[13578]|1[02]))/[1-9][0-9]{3}|29/02/([1-9][0-9](0[48]|[2468][048]|[13579][26])|(1[26]|[2468][048]|[3579][26])00)) ([01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]$'
+            THEN STR_TO_DATE(Information->>'$."Dados da Nota Fiscal"."Data de Emissao"', '%d/%m/%Y %H:%i:%s')
+    END) VIRTUAL''',
+]
+
+MIGRATIONS.append(('004_indexed_generated_columns', [
+    "ALTER TABLE tbFiles ADD INDEX ix_files_template_date (TemplateID, InsertionDate, FileID);",
+    "ALTER TABLE tbFiles ADD INDEX ix_files_status_date (Status, InsertionDate, FileID);",
+    *[f"ALTER TABLE tbFileData ADD COLUMN {column};" for column in FILE_DATA_GENERATED_COLUMNS],
+    "ALTER TABLE tbFileData ADD INDEX ix_file_data_tax_id (TaxID);",
+    "ALTER TABLE tbFileData ADD INDEX ix_file_data_due_date (DueDate);",
+    "ALTER TABLE tbFileData ADD INDEX ix_file_data_amount (Amount);",
+    "ALTER TABLE tbFileData ADD INDEX ix_file_data_access_key (AccessKey);",
+    "ALTER TABLE tbFileData ADD INDEX ix_file_data_issue_date (IssueDate);",
+]))
+
+
+def index_file_data(conn, cursor, batch_size=500):
+    """
+    Preenche o índice de busca (tbFileSearch) com os dados já extraídos de tbFileData, em lotes pela chave
+    primária e com um commit por lote. Arquivos que já têm entradas no índice são ignorados.
+
+    O tipo vem de tbFiles: os registros de tbFileData gravados antes desta série não têm TemplateID.
+    """
+    from tools.document_pipeline import DocumentPipeline
+    from tools.search_index import SearchIndex
+
+    search_index = SearchIndex({template_id: strategy.engine.fields
+                                for template_id, strategy in DocumentPipeline.DOCUMENT_TYPES.values()})
+    last_id = 0
+    while True:
+        cursor.execute("""
+            SELECT d.DataID, d.FileID, f.TemplateID, d.Information FROM tbFileData d JOIN tbFiles f ON f.FileID = d.FileID
+            WHERE d.DataID > %s AND d.FileID NOT IN (SELECT FileID FROM tbFileSearch)
+            ORDER BY d.DataID LIMIT %s;
+        """, (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        entries = []
+        for _, file_id, template_id, information in rows:
+            if isinstance(information, (str, bytes, bytearray)):
+                information = json.loads(information)
+            for entry in search_index.entries(template_id, information):
+                entries.append((file_id, entry['TemplateID'], entry['FieldName'], entry.get('ValueText'),
+                                entry.get('ValueNumber'), entry.get('ValueDate')))
+        if entries:
+            cursor.executemany("""
+                INSERT INTO tbFileSearch (FileID, TemplateID, FieldName, ValueText, ValueNumber, ValueDate)
+                VALUES (%s, %s, %s, %s, %s, %s);
+            """, entries)
+        conn.commit()
+        last_id = rows[-1][0]
+        print(f'{last_id}', end=' ', flush=True)
+
+
+MIGRATIONS.append(('005_file_search_index', [
+    '''CREATE TABLE tbFileSearch (
+        SearchID INT AUTO_INCREMENT PRIMARY KEY,
+        FileID INT NOT NULL,
+        TemplateID INT NOT NULL,
+        FieldName VARCHAR(100) NOT NULL,
+        ValueText VARCHAR(255),
+        ValueNumber DECIMAL(15, 2),
+        ValueDate DATETIME,
+        INDEX ix_file_search_text (TemplateID, FieldName, ValueText, SearchID),
+        INDEX ix_file_search_number (TemplateID, FieldName, ValueNumber, SearchID),
+        INDEX ix_file_search_date (TemplateID, FieldName, ValueDate, SearchID),
+        INDEX ix_file_search_file (FileID),
+        FOREIGN KEY (FileID) REFERENCES tbFiles(FileID),
+        FOREIGN KEY (TemplateID) REFERENCES tbTemplate(TemplateID)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_bin;''',
+    index_file_data,
+]))
+
+
+def reextract_boleto_names(conn, cursor, batch_size=200):
+    """
+    Extrai novamente, dos PDFs, o nome do cedente e do sacado dos boletos já cadastrados (as expressões antigas
+    capturavam parte do documento ou nada) e atualiza tbFileData e as entradas desses campos em tbFileSearch,
+    em lotes pela chave primária e com um commit por lote. Arquivos ausentes do disco são mantidos como estão.
+    Os boletos são identificados pelo tipo em tbFiles, já que os registros antigos de tbFileData não têm TemplateID.
+    """
+    from tools.pdf_classifier import PDFClassifier
+    from tools.document_pipeline import DocumentPipeline
+    from tools.extractors.boleto_extraction import BoletoExtractionStrategy
+    from tools.search_index import SearchIndex
+
+    template_id = DocumentPipeline.DOCUMENT_TYPES['Boleto'][0]
+    fields = ('Cedente/Nome', 'Sacado/Nome')
+    search_index = SearchIndex({template_id: BoletoExtractionStrategy.engine.fields})
+    classifier = PDFClassifier()
+    last_id = 0
+    while True:
+        cursor.execute("""
+            SELECT d.DataID, d.FileID, f.FilePath FROM tbFileData d JOIN tbFiles f ON f.FileID = d.FileID
+            WHERE d.DataID > %s AND f.TemplateID = %s ORDER BY d.DataID LIMIT %s;
+        """, (last_id, template_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        for data_id, file_id, file_path in rows:
+            if not os.path.exists(file_path):
+                continue
+            information = BoletoExtractionStrategy.engine.extract(classifier.read_pdf_text(file_path))
+            cursor.execute("""
+                UPDATE tbFileData SET Information = JSON_SET(Information, '$."Cedente"."Nome"', %s,
+                                                             '$."Sacado"."Nome"', %s)
+                WHERE DataID = %s;
+            """, (information['Cedente']['Nome'], information['Sacado']['Nome'], data_id))
+            cursor.execute("DELETE FROM tbFileSearch WHERE FileID = %s AND FieldName IN (%s, %s);",
+                           (file_id, *fields))
+            entries = [(file_id, entry['TemplateID'], entry['FieldName'], entry['ValueText'])
+                       for entry in search_index.entries(template_id, information) if entry['FieldName'] in fields]
+            if entries:
+                cursor.executemany("""
+                    INSERT INTO tbFileSearch (FileID, TemplateID, FieldName, ValueText) VALUES (%s, %s, %s, %s);
+                """, entries)
+        conn.commit()
+        last_id = rows[-1][0]
+        print(f'{last_id}', end=' ', flush=True)
+
+
+MIGRATIONS.append(('006_reextract_boleto_names', [
+    reextract_boleto_names,
+]))
+
+# Bancos que já aplicaram a 004 têm as datas validadas apenas pelo formato; as colunas são redefinidas com a
+# validação pelo calendário (a redefinição de uma coluna virtual apenas reconstrói o seu índice)
+MIGRATIONS.append(('007_file_data_calendar_dates', [
+    f"ALTER TABLE tbFileData MODIFY COLUMN {column};"
+    for column in FILE_DATA_GENERATED_COLUMNS if column.startswith(('DueDate ', 'IssueDate '))
+]))
+
+
+def normalize_amount(value):
+    """
+    Converte um valor gravado com separador de milhar ('1.234,56', ou '1.234.56' pela extração antiga) para o
+    formato "0.00". Outros valores são mantidos.
+    """
+    if isinstance(value, str) and re.fullmatch(r'\d{1,3}([.,]\d{3})+[.,]\d{2}|\d+,\d{2}', value):
+        return f"{Decimal(re.sub(r'[.,]', '', value)) / 100:.2f}"
+    return value
+
+
+def normalize_boleto_amounts(conn, cursor, batch_size=500):
+    """
+    Normaliza os valores dos boletos já cadastrados que foram gravados com separador de milhar, para que a
+    coluna Amount e a busca por faixa de valores os encontrem, e atualiza as entradas desses campos em
+    tbFileSearch, em lotes pela chave primária e com um commit por lote.
+    """
+    from tools.document_pipeline import DocumentPipeline
+    from tools.extractors.boleto_extraction import BoletoExtractionStrategy
+    from tools.search_index import SearchIndex
+
+    template_id = DocumentPipeline.DOCUMENT_TYPES['Boleto'][0]
+    paths = [path for path, field in BoletoExtractionStrategy.engine.fields if field.kind == 'decimal']
+    search_index = SearchIndex({template_id: BoletoExtractionStrategy.engine.fields})
+    last_id = 0
+    while True:
+        cursor.execute("""
+            SELECT d.DataID, d.FileID, d.Information FROM tbFileData d JOIN tbFiles f ON f.FileID = d.FileID
+            WHERE d.DataID > %s AND f.TemplateID = %s ORDER BY d.DataID LIMIT %s;
+        """, (last_id, template_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        for data_id, file_id, information in rows:
+            if isinstance(information, (str, bytes, bytearray)):
+                information = json.loads(information)
+            changed = []
+            for group, name in paths:
+                values = information.get(group)
+                if isinstance(values, dict) and normalize_amount(values.get(name)) != values.get(name):
+                    values[name] = normalize_amount(values[name])
+                    changed.append(f'{group}/{name}')
+            if not changed:
+                continue
+            cursor.execute("UPDATE tbFileData SET Information = CAST(%s AS JSON) WHERE DataID = %s;",
+                           (json.dumps(information, ensure_ascii=False), data_id))
+            cursor.execute(f"DELETE FROM tbFileSearch WHERE FileID = %s AND FieldName IN ({', '.join(['%s'] * len(changed))});",
+                           (file_id, *changed))
+            entries = [(file_id, entry['TemplateID'], entry['FieldName'], entry.get('ValueNumber'))
+                       for entry in search_index.entries(template_id, information) if entry['FieldName'] in changed]
+            if entries:
+                cursor.executemany("""
+                    INSERT INTO tbFileSearch (FileID, TemplateID, FieldName, ValueNumber) VALUES (%s, %s, %s, %s);
+                """, entries)
+        conn.commit()
+        last_id = rows[-1][0]
+        print(f'{last_id}', end=' ', flush=True)
+
+
+MIGRATIONS.append(('008_boleto_amounts_thousands_separator', [
+    normalize_boleto_amounts,
+]))
+
+# Erros que indicam que o comando já foi aplicado (por exemplo, em um banco criado pelo prepara_banco.py atual)
+ALREADY_APPLIED = (errorcode.ER_DUP_FIELDNAME, errorcode.ER_DUP_KEYNAME, errorcode.ER_TABLE_EXISTS_ERROR)
+
+
+def main():
+    print("Conectando...")
+    try:
+        conn = mysql.connector.connect(
+            host='127.0.0.1',
+            user='admin',
+            password='admin',
+            database='db_upflow'
+        )
+    except mysql.connector.Error as err:
+        if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
+            print('Existe algo errado no nome de usuário ou senha')
+        else:
+            print(err)
+        return
+
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tbMigrations (
+            Name VARCHAR(255) PRIMARY KEY,
+            AppliedDate DATETIME DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_bin;
+    ''')
+    cursor.execute("SELECT Name FROM tbMigrations;")
+    applied = {name for (name,) in cursor.fetchall()}
+
+    for name, steps in MIGRATIONS:
+        if name in applied:
+            continue
+        print(f'Aplicando migração {name}:', end=' ')
+        for step in steps:
+            try:
+                if callable(step):
+                    step(conn, cursor)
+                else:
+                    cursor.execute(step)
+            except mysql.connector.Error as err:
+                if err.errno not in ALREADY_APPLIED:
+                    print(err.msg)
+                    conn.rollback()
+                    cursor.close()
+                    conn.close()
+                    return
+        cursor.execute("INSERT INTO tbMigrations (Name) VALUES (%s);", (name,))
+        conn.commit()
+        print('OK')
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -122,12 +122,19 @@ class File(db.Model):
     - InsertionDate: Data de inserção do arquivo.
     - TemplateID: Identificador do template associado.
     - FilePath: Caminho do arquivo no sistema de arquivos.
+    - ContentHash: Hash SHA-256 do conteúdo do arquivo, usado para identificar uploads repetidos.
     """
     __tablename__ = 'tbFiles'
+    __table_args__ = (
+        db.Index('ix_files_insertion_date', 'InsertionDate', 'FileID'),
+        db.Index('ix_files_template_date', 'TemplateID', 'InsertionDate', 'FileID'),
+        db.Index('ix_files_status_date', 'Status', 'InsertionDate', 'FileID'),
+    )
     FileID = db.Column(db.Integer, primary_key=True, autoincrement=True)
     Status = db.Column(db.String(50))
     InsertionDate = db.Column(db.DateTime, default=datetime.utcnow)
     FilePath = db.Column(db.String(255), nullable=False)
+    ContentHash = db.Column(db.String(64), unique=True)
     TemplateID = db.Column(db.Integer, db.ForeignKey('tbTemplate.TemplateID'), nullable=False)
     
     file_data = db.relationship('FileData', backref='file', lazy=True)  # Alterado para 'file_data'
@@ -152,13 +159,86 @@ class FileData(db.Model):
     - FileID: Identificador do arquivo associado.
     - InsertionDate: Data de inserção dos dados.
     - Information: Informações dos dados em formato JSON.
+
+    Colunas geradas pelo banco a partir de Information (somente leitura, indexadas; nulas quando o campo não
+    existe no template ou não está bem formado). As datas são validadas pelo calendário, inclusive anos
+    bissextos, antes da conversão: uma data inexistente como 31/02/2024 faria o INSERT falhar no modo estrito.
+    - TaxID: CPF/CNPJ do documento (boleto), do emitente (nota fiscal) ou do contribuinte (imposto de renda).
+    - DueDate: Data de vencimento do boleto.
+    - Amount: Valor do documento (boleto) ou da nota fiscal.
+    - AccessKey: Chave de acesso da nota fiscal.
+    - IssueDate: Data de emissão da nota fiscal.
     """
     __tablename__ = 'tbFileData'
+    __table_args__ = (
+        db.Index('ix_file_data_tax_id', 'TaxID'),
+        db.Index('ix_file_data_due_date', 'DueDate'),
+        db.Index('ix_file_data_amount', 'Amount'),
+        db.Index('ix_file_data_access_key', 'AccessKey'),
+        db.Index('ix_file_data_issue_date', 'IssueDate'),
+    )
     DataID = db.Column(db.Integer, primary_key=True, autoincrement=True)
     TemplateID = db.Column(db.Integer, db.ForeignKey('tbTemplate.TemplateID'), nullable=False)
     FileID = db.Column(db.Integer, db.ForeignKey('tbFiles.FileID'), nullable=False)
     InsertionDate = db.Column(db.DateTime, default=datetime.utcnow)
     Information = db.Column(db.JSON, nullable=False)
+    TaxID = db.Column(db.String(18), db.Computed('''CASE
+        WHEN Information->>'$."Documento"."CPF/CNPJ"' REGEXP '^[0-9./-]{11,18}$'
+            THEN Information->>'$."Documento"."CPF/CNPJ"'
+        WHEN Information->>'$."Dados do Emitente"."CPF/CNPJ"' REGEXP '^[0-9./-]{11,18}$'
+            THEN Information->>'$."Dados do Emitente"."CPF/CNPJ"'
+        WHEN Information->>'$."Dados do Contribuinte"."CPF"' REGEXP '^[0-9./-]{11,18}$'
+            THEN Information->>'$."Dados do Contribuinte"."CPF"'
+    END''', persisted=False))
+    DueDate = db.Column(db.Date, db.Computed('''CASE
+        WHEN Information->>'$."Documento"."Vencimento"' REGEXP '^(((0[1-9]|1[0-9]|2[0-8])/(0[1-9]|1[0-2])|(29|30)/(0[13-9]|1[0-2])|31/(0[13578]|1[02]))/[1-9][0-9]{3}|29/02/([1-9][0-9](0[48]|[2468][048]|[13579][26])|(1[26]|[2468][048]|[3579][26])00))$'
+            THEN STR_TO_DATE(Information->>'$."Documento"."Vencimento"', '%d/%m/%Y')
+    END''', persisted=False))
+    Amount = db.Column(db.Numeric(15, 2), db.Computed('''CASE
+        WHEN Information->>'$."Documento"."Valor do Documento"' REGEXP '^-?[0-9]{1,13}([.][0-9]+)?$'
+            THEN CAST(Information->>'$."Documento"."Valor do Documento"' AS DECIMAL(15, 2))
+        WHEN Information->>'$."Valor Nota Fiscal"."Valor"' REGEXP '^-?[0-9]{1,13}([.][0-9]+)?$'
+            THEN CAST(Information->>'$."Valor Nota Fiscal"."Valor"' AS DECIMAL(15, 2))
+    END''', persisted=False))
+    AccessKey = db.Column(db.String(44), db.Computed('''CASE
+        WHEN Information->>'$."Dados da Nota Fiscal"."Chave de Acesso"' REGEXP '^[0-9]{44}$'
+            THEN Information->>'$."Dados da Nota Fiscal"."Chave de Acesso"'
+    END''', persisted=False))
+    IssueDate = db.Column(db.DateTime, db.Computed('''CASE
+        WHEN Information->>'$."Dados da Nota Fiscal"."Data de Emissao"' REGEXP '^(((0[1-9]|1[0-9]|2[0-8])/(0[1-9]|1[0-2])|(29|30)/(0[13-9]|1[0-2])|31/(0[13578]|1[02]))/[1-9][0-9]{3}|29/02/([1-9][0-9](0[48]|[2468][048]|[13579][26])|(1[26]|[2468][048]|[3579][26])00)) ([01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]$'
+            THEN STR_TO_DATE(Information->>'$."Dados da Nota Fiscal"."Data de Emissao"', '%d/%m/%Y %H:%i:%s')
+    END''', persisted=False))
 
     def __repr__(self):
         return '<FileData %r>' % self.DataID
+
+class FileSearch(db.Model):
+    """
+    Modelo para a tabela do índice de busca dos dados extraídos (preenchida na extração, ver SearchIndex).
+    
+    Atributos:
+    - SearchID: Identificador único da entrada.
+    - FileID: Identificador do arquivo associado.
+    - TemplateID: Identificador do template associado.
+    - FieldName: Caminho do campo nos dados extraídos (por exemplo, 'Documento/CPF/CNPJ').
+    - ValueText: Valor normalizado dos campos de texto (busca exata ou por prefixo).
+    - ValueNumber: Valor dos campos numéricos (busca por faixa).
+    - ValueDate: Valor dos campos de data (busca por faixa).
+    """
+    __tablename__ = 'tbFileSearch'
+    __table_args__ = (
+        db.Index('ix_file_search_text', 'TemplateID', 'FieldName', 'ValueText', 'SearchID'),
+        db.Index('ix_file_search_number', 'TemplateID', 'FieldName', 'ValueNumber', 'SearchID'),
+        db.Index('ix_file_search_date', 'TemplateID', 'FieldName', 'ValueDate', 'SearchID'),
+        db.Index('ix_file_search_file', 'FileID'),
+    )
+    SearchID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    FileID = db.Column(db.Integer, db.ForeignKey('tbFiles.FileID'), nullable=False)
+    TemplateID = db.Column(db.Integer, db.ForeignKey('tbTemplate.TemplateID'), nullable=False)
+    FieldName = db.Column(db.String(100), nullable=False)
+    ValueText = db.Column(db.String(255))
+    ValueNumber = db.Column(db.Numeric(15, 2))
+    ValueDate = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return '<FileSearch %r>' % self.FieldName
@@ -71,7 +71,12 @@ TABLES['tbFiles'] = ('''
         Status VARCHAR(50),
         InsertionDate DATETIME DEFAULT CURRENT_TIMESTAMP,
         FilePath VARCHAR(255) NOT NULL,
+        ContentHash CHAR(64) NULL,
         TemplateID INT,
+        UNIQUE INDEX ux_files_content_hash (ContentHash),
+        INDEX ix_files_insertion_date (InsertionDate, FileID),
+        INDEX ix_files_template_date (TemplateID, InsertionDate, FileID),
+        INDEX ix_files_status_date (Status, InsertionDate, FileID),
         FOREIGN KEY (TemplateID) REFERENCES tbTemplate(TemplateID)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_bin;
 ''')
@@ -83,6 +88,57 @@ TABLES['tbFileData'] = ('''
         FileID INT,
         InsertionDate DATETIME DEFAULT CURRENT_TIMESTAMP,
         Information JSON,
+        -- Campos mais consultados de cada template, extraídos do JSON (somente valores bem formados; as datas
+        -- são validadas pelo calendário, inclusive anos bissextos, antes da conversão)
+        TaxID VARCHAR(18) GENERATED ALWAYS AS (CASE
+            WHEN Information->>'$."Documento"."CPF/CNPJ"' REGEXP '^[0-9./-]{11,18}$'
+                THEN Information->>'$."Documento"."CPF/CNPJ"'
+            WHEN Information->>'$."Dados do Emitente"."CPF/CNPJ"' REGEXP '^[0-9./-]{11,18}$'
+                THEN Information->>'$."Dados do Emitente"."CPF/CNPJ"'
+            WHEN Information->>'$."Dados do Contribuinte"."CPF"' REGEXP '^[0-9./-]{11,18}$'
+                THEN Information->>'$."Dados do Contribuinte"."CPF"'
+        END) VIRTUAL,
+        DueDate DATE GENERATED ALWAYS AS (CASE
+            WHEN Information->>'$."Documento"."Vencimento"' REGEXP '^(((0[1-9]|1[0-9]|2[0-8])/(0[1-9]|1[0-2])|(29|30)/(0[13-9]|1[0-2])|31/(0[13578]|1[02]))/[1-9][0-9]{3}|29/02/([1-9][0-9](0[48]|[2468][048]|[13579][26])|(1[26]|[2468][048]|[3579][26])00))$'
+                THEN STR_TO_DATE(Information->>'$."Documento"."Vencimento"', '%d/%m/%Y')
+        END) VIRTUAL,
+        Amount DECIMAL(15, 2) GENERATED ALWAYS AS (CASE
+            WHEN Information->>'$."Documento"."Valor do Documento"' REGEXP '^-?[0-9]{1,13}([.][0-9]+)?$'
+                THEN CAST(Information->>'$."Documento"."Valor do Documento"' AS DECIMAL(15, 2))
+            WHEN Information->>'$."Valor Nota Fiscal"."Valor"' REGEXP '^-?[0-9]{1,13}([.][0-9]+)?$'
+                THEN CAST(Information->>'$."Valor Nota Fiscal"."Valor"' AS DECIMAL(15, 2))
+        END) VIRTUAL,
+        AccessKey CHAR(44) GENERATED ALWAYS AS (CASE
+            WHEN Information->>'$."Dados da Nota Fiscal"."Chave de Acesso"' REGEXP '^[0-9]{44}$'
+                THEN Information->>'$."Dados da Nota Fiscal"."Chave de Acesso"'
+        END) VIRTUAL,
+        IssueDate DATETIME GENERATED ALWAYS AS (CASE
+            WHEN Information->>'$."Dados da Nota Fiscal"."Data de Emissao"' REGEXP '^(((0[1-9]|1[0-9]|2[0-8])/(0[1-9]|1[0-2])|(29|30)/(0[13-9]|1[0-2])|31/(0[13578]|1[02]))/[1-9][0-9]{3}|29/02/([1-9][0-9](0[48]|[2468][048]|[13579][26])|(1[26]|[2468][048]|[3579][26])00)) ([01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]$'
+                THEN STR_TO_DATE(Information->>'$."Dados da Nota Fiscal"."Data de Emissao"', '%d/%m/%Y %H:%i:%s')
+        END) VIRTUAL,
+        INDEX ix_file_data_tax_id (TaxID),
+        INDEX ix_file_data_due_date (DueDate),
+        INDEX ix_file_data_amount (Amount),
+        INDEX ix_file_data_access_key (AccessKey),
+        INDEX ix_file_data_issue_date (IssueDate),
+        FOREIGN KEY (FileID) REFERENCES tbFiles(FileID),
+        FOREIGN KEY (TemplateID) REFERENCES tbTemplate(TemplateID)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_bin;
+''')
+
+TABLES['tbFileSearch'] = ('''
+    CREATE TABLE tbFileSearch (
+        SearchID INT AUTO_INCREMENT PRIMARY KEY,
+        FileID INT NOT NULL,
+        TemplateID INT NOT NULL,
+        FieldName VARCHAR(100) NOT NULL,
+        ValueText VARCHAR(255),
+        ValueNumber DECIMAL(15, 2),
+        ValueDate DATETIME,
+        INDEX ix_file_search_text (TemplateID, FieldName, ValueText, SearchID),
+        INDEX ix_file_search_number (TemplateID, FieldName, ValueNumber, SearchID),
+        INDEX ix_file_search_date (TemplateID, FieldName, ValueDate, SearchID),
+        INDEX ix_file_search_file (FileID),
         FOREIGN KEY (FileID) REFERENCES tbFiles(FileID),
         FOREIGN KEY (TemplateID) REFERENCES tbTemplate(TemplateID)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_bin;
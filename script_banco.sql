@@ -46,20 +46,83 @@ CREATE TABLE tbFiles (
     Status VARCHAR(50),
     InsertionDate TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FilePath VARCHAR(255) NOT NULL,
+    ContentHash CHAR(64) UNIQUE,
     TemplateID INT,
     FOREIGN KEY (TemplateID) REFERENCES tbTemplate(TemplateID)
 );
 
+CREATE INDEX ix_files_insertion_date ON tbFiles (InsertionDate, FileID);
+CREATE INDEX ix_files_template_date ON tbFiles (TemplateID, InsertionDate, FileID);
+CREATE INDEX ix_files_status_date ON tbFiles (Status, InsertionDate, FileID);
+
 CREATE TABLE tbFileData (
     DataID SERIAL PRIMARY KEY,
     TemplateID INT,
     FileID INT,
     InsertionDate TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     Information JSON,
+    -- Campos mais consultados de cada template, extraídos do JSON (somente valores bem formados; as datas
+    -- são validadas pelo calendário, inclusive anos bissextos, antes da conversão)
+    TaxID VARCHAR(18) GENERATED ALWAYS AS (CASE
+        WHEN Information #>> '{Documento,CPF/CNPJ}' ~ '^[0-9./-]{11,18}$'
+            THEN Information #>> '{Documento,CPF/CNPJ}'
+        WHEN Information #>> '{Dados do Emitente,CPF/CNPJ}' ~ '^[0-9./-]{11,18}$'
+            THEN Information #>> '{Dados do Emitente,CPF/CNPJ}'
+        WHEN Information #>> '{Dados do Contribuinte,CPF}' ~ '^[0-9./-]{11,18}$'
+            THEN Information #>> '{Dados do Contribuinte,CPF}'
+    END) STORED,
+    DueDate DATE GENERATED ALWAYS AS (CASE
+        WHEN Information #>> '{Documento,Vencimento}' ~ '^(((0[1-9]|1[0-9]|2[0-8])/(0[1-9]|1[0-2])|(29|30)/(0[13-9]|1[0-2])|31/(0[13578]|1[02]))/[1-9][0-9]{3}|29/02/([1-9][0-9](0[48]|[2468][048]|[13579][26])|(1[26]|[2468][048]|[3579][26])00))$'
+            THEN make_date(substr(Information #>> '{Documento,Vencimento}', 7, 4)::int,
+                           substr(Information #>> '{Documento,Vencimento}', 4, 2)::int,
+                           substr(Information #>> '{Documento,Vencimento}', 1, 2)::int)
+    END) STORED,
+    Amount NUMERIC(15, 2) GENERATED ALWAYS AS (CASE
+        WHEN Information #>> '{Documento,Valor do Documento}' ~ '^-?[0-9]{1,13}([.][0-9]+)?$'
+            THEN (Information #>> '{Documento,Valor do Documento}')::numeric(15, 2)
+        WHEN Information #>> '{Valor Nota Fiscal,Valor}' ~ '^-?[0-9]{1,13}([.][0-9]+)?$'
+            THEN (Information #>> '{Valor Nota Fiscal,Valor}')::numeric(15, 2)
+    END) STORED,
+    AccessKey CHAR(44) GENERATED ALWAYS AS (CASE
+        WHEN Information #>> '{Dados da Nota Fiscal,Chave de Acesso}' ~ '^[0-9]{44}$'
+            THEN Information #>> '{Dados da Nota Fiscal,Chave de Acesso}'
+    END) STORED,
+    IssueDate TIMESTAMP GENERATED ALWAYS AS (CASE
+        WHEN Information #>> '{Dados da Nota Fiscal,Data de Emissao}' ~ '^(((0[1-9]|1[0-9]|2[0-8])/(0[1-9]|1[0-2])|(29|30)/(0[13-9]|1[0-2])|31/(0[13578]|1[02]))/[1-9][0-9]{3}|29/02/([1-9][0-9](0[48]|[2468][048]|[13579][26])|(1[26]|[2468][048]|[3579][26])00)) ([01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]$'
+            THEN make_timestamp(substr(Information #>> '{Dados da Nota Fiscal,Data de Emissao}', 7, 4)::int,
+                                substr(Information #>> '{Dados da Nota Fiscal,Data de Emissao}', 4, 2)::int,
+                                substr(Information #>> '{Dados da Nota Fiscal,Data de Emissao}', 1, 2)::int,
+                                substr(Information #>> '{Dados da Nota Fiscal,Data de Emissao}', 12, 2)::int,
+                                substr(Information #>> '{Dados da Nota Fiscal,Data de Emissao}', 15, 2)::int,
+                                substr(Information #>> '{Dados da Nota Fiscal,Data de Emissao}', 18, 2)::int)
+    END) STORED,
     FOREIGN KEY (FileID) REFERENCES tbFiles(FileID),
     FOREIGN KEY (TemplateID) REFERENCES tbTemplate(TemplateID)
 );
 
+CREATE INDEX ix_file_data_tax_id ON tbFileData (TaxID);
+CREATE INDEX ix_file_data_due_date ON tbFileData (DueDate);
+CREATE INDEX ix_file_data_amount ON tbFileData (Amount);
+CREATE INDEX ix_file_data_access_key ON tbFileData (AccessKey);
+CREATE INDEX ix_file_data_issue_date ON tbFileData (IssueDate);
+
+CREATE TABLE tbFileSearch (
+    SearchID SERIAL PRIMARY KEY,
+    FileID INT NOT NULL,
+    TemplateID INT NOT NULL,
+    FieldName VARCHAR(100) NOT NULL,
+    ValueText VARCHAR(255),
+    ValueNumber NUMERIC(15, 2),
+    ValueDate TIMESTAMP,
+    FOREIGN KEY (FileID) REFERENCES tbFiles(FileID),
+    FOREIGN KEY (TemplateID) REFERENCES tbTemplate(TemplateID)
+);
+
+CREATE INDEX ix_file_search_text ON tbFileSearch (TemplateID, FieldName, ValueText text_pattern_ops, SearchID);
+CREATE INDEX ix_file_search_number ON tbFileSearch (TemplateID, FieldName, ValueNumber, SearchID);
+CREATE INDEX ix_file_search_date ON tbFileSearch (TemplateID, FieldName, ValueDate, SearchID);
+CREATE INDEX ix_file_search_file ON tbFileSearch (FileID);
+
 CREATE TABLE tbContacts (
     ContactID SERIAL PRIMARY KEY,
     Name VARCHAR(255) NOT NULL,
@@ -0,0 +1,148 @@
+import json
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+class ColumnarExporter:
+    """
+    Classe que converte os dados extraídos de um template em colunas tipadas, para exportação em Parquet ou CSV.
+
+    Cada campo da especificação do template (FieldSpecEngine.fields) vira uma coluna "Seção/Campo" com o tipo
+    declarado no campo: decimais como números, datas como datas e tabelas como texto JSON. Os registros são
+    convertidos em lotes: os valores de cada lote são reunidos em um DataFrame e a conversão de tipos é feita
+    de uma vez por coluna.
+
+    Atributos:
+    -----------
+    columns : list
+        Lista de tuplas (nome da coluna, caminho no resultado da extração, tipo).
+    schema : pyarrow.Schema or None
+        O esquema Parquet das colunas, ou None se o pyarrow não estiver instalado.
+
+    Métodos:
+    --------
+    parquet_available():
+        Indica se a exportação em Parquet está disponível (pyarrow instalado).
+
+    to_frame(rows):
+        Converte um lote de registros em um DataFrame com as colunas tipadas.
+
+    write_parquet(batches, output):
+        Grava os lotes de registros em um arquivo Parquet.
+
+    iter_csv(batches):
+        Gera o CSV dos lotes de registros, um lote por vez.
+    """
+
+    # Colunas de tbFiles/tbFileData presentes em cada registro, antes do campo Information
+    BASE_COLUMNS = [('FileID', 'integer'), ('Status', 'text'), ('InsertionDate', 'timestamp'),
+                    ('FilePath', 'text'), ('DataID', 'integer')]
+    DATE_FORMATS = {'date': '%d/%m/%Y', 'datetime': '%d/%m/%Y %H:%M:%S'}
+
+    def __init__(self, fields):
+        """
+        Inicializa o exportador a partir dos campos de um template.
+
+        Parâmetros:
+        -----------
+        fields : list
+            Lista de tuplas (caminho, campo), como em `FieldSpecEngine.fields`.
+        """
+        self.columns = [('/'.join(path), path, field.kind) for path, field in fields]
+        self.schema = self._schema() if pa is not None else None
+
+    def parquet_available(self):
+        return pa is not None
+
+    def _schema(self):
+        types = {'integer': pa.int64(), 'text': pa.string(), 'table': pa.string(), 'decimal': pa.float64(),
+                 'date': pa.date32(), 'datetime': pa.timestamp('s'), 'timestamp': pa.timestamp('us')}
+        return pa.schema([(name, types[kind]) for name, kind in self.BASE_COLUMNS] +
+                         [(name, types[kind]) for name, _, kind in self.columns])
+
+    @staticmethod
+    def _lookup(information, path):
+        value = information
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    def to_frame(self, rows):
+        """
+        Converte um lote de registros em um DataFrame com as colunas tipadas.
+
+        Parâmetros:
+        -----------
+        rows : list
+            Tuplas (FileID, Status, InsertionDate, FilePath, DataID, Information).
+
+        Retorna:
+        --------
+        pandas.DataFrame
+            As colunas base seguidas de uma coluna por campo do template; valores ausentes ou inválidos ficam nulos.
+        """
+        frame = pd.DataFrame.from_records([row[:-1] for row in rows], columns=[name for name, _ in self.BASE_COLUMNS])
+        informations = [row[-1] if isinstance(row[-1], dict) else {} for row in rows]
+        for name, path, kind in self.columns:
+            values = pd.Series([self._lookup(information, path) for information in informations], dtype=object)
+            if kind == 'decimal':
+                values = pd.to_numeric(values, errors='coerce')
+            elif kind in self.DATE_FORMATS:
+                values = pd.to_datetime(values, format=self.DATE_FORMATS[kind], errors='coerce')
+                if kind == 'date':
+                    values = values.dt.date
+            elif kind == 'table':
+                values = values.map(lambda value: json.dumps(value, ensure_ascii=False) if value else None)
+            else:
+                values = values.map(lambda value: value if value else None)
+            frame[name] = values
+        return frame
+
+    def write_parquet(self, batches, output):
+        """
+        Grava os lotes de registros em um arquivo Parquet, um grupo de linhas por lote.
+
+        Parâmetros:
+        -----------
+        batches : iterable
+            Lotes (listas) de registros, como em `to_frame`.
+        output : str or file
+            O caminho ou arquivo de destino.
+
+        Retorna:
+        --------
+        None
+        """
+        with pq.ParquetWriter(output, self.schema) as writer:
+            for rows in batches:
+                writer.write_table(pa.Table.from_pandas(self.to_frame(rows), schema=self.schema, preserve_index=False))
+
+    def iter_csv(self, batches):
+        """
+        Gera o CSV dos lotes de registros (datas em AAAA-MM-DD e decimais com ponto), um lote por vez.
+
+        Parâmetros:
+        -----------
+        batches : iterable
+            Lotes (listas) de registros, como em `to_frame`.
+
+        Retorna:
+        --------
+        generator
+            As partes do CSV, começando pelo cabeçalho.
+        """
+        header = True
+        for rows in batches:
+            yield self.to_frame(rows).to_csv(index=False, header=header)
+            header = False
+        if header:
+            yield pd.DataFrame(columns=[name for name, _ in self.BASE_COLUMNS] +
+                               [name for name, _, _ in self.columns]).to_csv(index=False)
@@ -0,0 +1,336 @@
+from dataclasses import dataclass, field
+from tools.metrics import MetricsRegistry
+from tools.pdf_data_extractor import PDFDataExtractor
+from tools.extractors.boleto_extraction import BoletoExtractionStrategy
+from tools.extractors.nota_fiscal_extraction import NotaFiscalExtractionStrategy
+from tools.extractors.imposto_de_renda_extraction import ImpostoDeRendaExtractionStrategy
+
+
+@dataclass
+class DocumentResult:
+    """
+    Resultado do processamento de um documento pelo DocumentPipeline.
+
+    Atributos:
+    -----------
+    file_path : str
+        O caminho do arquivo PDF processado.
+    text : str
+        O texto extraído do PDF.
+    preprocessed_text : str
+        O texto após o pré-processamento usado pelo classificador.
+    prediction : str
+        O tipo de documento predito ("Nota Fiscal", "Boleto", "Imposto de Renda", ou "Tipo desconhecido").
+    probabilities : dict
+        Dicionário {tipo de documento: probabilidade} retornado pelo classificador.
+    template_id : int
+        O TemplateID correspondente ao tipo de documento predito.
+    data : dict
+        Os dados extraídos pela estratégia do tipo de documento (vazio para tipos desconhecidos).
+    error : str or None
+        A mensagem de erro, caso o texto do PDF não tenha podido ser extraído.
+    """
+    file_path: str
+    text: str
+    preprocessed_text: str
+    prediction: str
+    probabilities: dict
+    template_id: int
+    data: dict = field(default_factory=dict)
+    error: str = None
+
+    @property
+    def is_known(self):
+        """
+        Indica se o documento foi classificado em um tipo com estratégia de extração.
+        """
+        return self.template_id != DocumentPipeline.UNKNOWN_TEMPLATE_ID
+
+
+class DocumentPipeline:
+    """
+    Classe que classifica um documento PDF e extrai seus dados lendo o PDF uma única vez.
+
+    O texto extraído é compartilhado entre o PDFClassifier e a estratégia de extração do tipo predito,
+    em vez de cada etapa ler o arquivo novamente.
+
+    Atributos:
+    -----------
+    classifier : PDFClassifier
+        O classificador treinado usado para predizer o tipo do documento.
+    stage_seconds : Histogram
+        Duração de cada etapa ('parse', 'classify', 'extract') por chamada; em `process_many`, 'parse' e
+        'classify' medem o lote inteiro.
+    documents : Counter
+        Documentos processados por tipo predito, incluindo "Tipo desconhecido".
+    failures : Counter
+        Documentos cujo texto não pôde ser extraído.
+
+    Métodos:
+    --------
+    process(pdf_path):
+        Classifica o documento e extrai seus dados, retornando um DocumentResult.
+
+    process_many(pdf_paths, max_workers=None):
+        Classifica e extrai os dados de vários documentos, com extração paralela e classificação em lote.
+
+    classify(pdf_path):
+        Apenas classifica o documento, lendo somente as páginas necessárias.
+
+    extract_for_template(template_id, text):
+        Extrai os dados de um texto com a estratégia de um TemplateID específico.
+
+    label_for_template(template_id):
+        Retorna o rótulo do classificador correspondente a um TemplateID.
+    """
+
+    # Tipo de documento -> (TemplateID, estratégia de extração)
+    DOCUMENT_TYPES = {
+        "Nota Fiscal": (1, NotaFiscalExtractionStrategy),
+        "Boleto": (2, BoletoExtractionStrategy),
+        "Imposto de Renda": (3, ImpostoDeRendaExtractionStrategy),
+    }
+    UNKNOWN_TEMPLATE_ID = 4
+
+    def __init__(self, classifier, early_exit=None, metrics=None):
+        """
+        Inicializa o DocumentPipeline com um classificador treinado.
+
+        Parâmetros:
+        -----------
+        classifier : PDFClassifier
+            O classificador treinado usado para predizer o tipo do documento.
+        early_exit : dict, opcional
+            Argumentos de `PDFClassifier.classify_pages` (threshold, max_pages, max_chars) usados na
+            classificação de `process`, `process_many` e `classify`. Vazio, os documentos são classificados
+            pelo texto completo.
+        metrics : MetricsRegistry, opcional
+            Registro onde as métricas do pipeline são publicadas. Por padrão, um registro próprio não exposto.
+        """
+        self.classifier = classifier
+        self.early_exit = early_exit or {}
+        metrics = metrics or MetricsRegistry()
+        self.stage_seconds = metrics.histogram('upflow_pipeline_stage_seconds',
+                                               'Duração de cada etapa do pipeline de documentos, em segundos.',
+                                               ['stage'])
+        self.documents = metrics.counter('upflow_documents_total', 'Documentos processados por tipo predito.',
+                                         ['type'])
+        self.failures = metrics.counter('upflow_documents_failed_total',
+                                        'Documentos cujo texto não pôde ser extraído.')
+        self.extractors = {
+            prediction: PDFDataExtractor(strategy())
+            for prediction, (_, strategy) in self.DOCUMENT_TYPES.items()
+        }
+
+    def process(self, pdf_path):
+        """
+        Lê o PDF uma única vez, classifica o documento e extrai seus dados com a estratégia correspondente.
+
+        Com `early_exit`, a classificação consome apenas as primeiras páginas necessárias para uma decisão
+        confiável; as demais são lidas em seguida apenas para a extração dos dados.
+
+        Parâmetros:
+        -----------
+        pdf_path : str
+            O caminho completo do arquivo PDF.
+
+        Retorna:
+        --------
+        DocumentResult
+            O texto, a classificação e os dados extraídos do documento.
+        """
+        if self.early_exit:
+            return self._build_result(pdf_path, *self._read_and_classify(pdf_path))
+
+        with self.stage_seconds.labels(stage='parse').time():
+            text = self.classifier.extract_text_from_pdf(pdf_path)
+        with self.stage_seconds.labels(stage='classify').time():
+            preprocessed_text = self.classifier.preprocess_text(text)
+            prediction, probabilities = self.classifier.classify_texts([text], [preprocessed_text])[0]
+        return self._build_result(pdf_path, text, preprocessed_text, prediction, probabilities)
+
+    def _read_and_classify(self, pdf_path):
+        # Lê o PDF uma única vez: a classificação consome apenas as primeiras páginas (parada antecipada) e as
+        # demais são lidas em seguida, para a extração dos dados. Com early exit, a etapa 'classify' inclui a
+        # leitura das páginas consumidas pela classificação.
+        text_cache = self.classifier.text_cache
+        max_chars = self.early_exit.get('max_chars')
+        key = None
+        if text_cache is not None:
+            with self.stage_seconds.labels(stage='parse').time():
+                key = text_cache.hash_file(pdf_path)
+                text = text_cache.get(key)
+            if text is not None:
+                with self.stage_seconds.labels(stage='classify').time():
+                    prediction, probabilities = self.classifier.classify_texts([text[:max_chars]])[0]
+                    preprocessed_text = self.classifier.preprocess_text(text[:max_chars])
+                return text, preprocessed_text, prediction, probabilities
+
+        pages_read = []
+
+        def reading(pages):
+            for page_text in pages:
+                pages_read.append(page_text)
+                yield page_text
+
+        pages = self.classifier.iter_pdf_pages(pdf_path)
+        try:
+            with self.stage_seconds.labels(stage='classify').time():
+                prediction, probabilities, _ = self.classifier.classify_pages(reading(pages), **self.early_exit)
+                preprocessed_text = self.classifier.preprocess_text("".join(pages_read)[:max_chars])
+            with self.stage_seconds.labels(stage='parse').time():
+                text = "".join(pages_read) + "".join(pages)
+        finally:
+            pages.close()
+        if key is not None:
+            text_cache.set(key, text)
+        return text, preprocessed_text, prediction, probabilities
+
+    def process_many(self, pdf_paths, max_workers=None):
+        """
+        Processa vários documentos: os textos são extraídos em paralelo e classificados com uma única vetorização.
+
+        Com `early_exit`, a classificação usa apenas o início de cada documento: na leitura sequencial
+        (`max_workers=1` ou um único arquivo), as páginas são classificadas à medida que são lidas, como em
+        `process`; com o pool de processos, que devolve o texto completo, apenas os primeiros `max_chars`
+        caracteres são classificados.
+
+        Parâmetros:
+        -----------
+        pdf_paths : list
+            Os caminhos completos dos arquivos PDF.
+        max_workers : int, opcional
+            Número de processos usados na extração do texto dos PDFs.
+
+        Retorna:
+        --------
+        list
+            Lista de DocumentResult na mesma ordem de `pdf_paths`. Arquivos que não puderam ser lidos recebem
+            "Tipo desconhecido" e a mensagem de erro em `error`.
+        """
+        if self.early_exit and (max_workers == 1 or len(pdf_paths) <= 1):
+            # Leitura sequencial: cada documento é lido página a página e classificado com parada antecipada
+            results = []
+            for pdf_path in pdf_paths:
+                try:
+                    read = self._read_and_classify(pdf_path)
+                except Exception as e:
+                    self.failures.inc()
+                    results.append(DocumentResult(pdf_path, '', '', self.classifier.UNKNOWN_LABEL, {},
+                                                  self.UNKNOWN_TEMPLATE_ID, error=f'{type(e).__name__}: {e}'))
+                    continue
+                results.append(self._build_result(pdf_path, *read))
+            return results
+
+        with self.stage_seconds.labels(stage='parse').time():
+            extracted = self.classifier.extract_texts(pdf_paths, max_workers)
+        texts = [text for text, _ in extracted if text is not None]
+        with self.stage_seconds.labels(stage='classify').time():
+            if self.early_exit:
+                # O texto completo já foi extraído para a extração dos dados; a classificação usa apenas os
+                # primeiros `max_chars` caracteres de cada documento
+                texts = [text[:self.early_exit.get('max_chars')] for text in texts]
+            preprocessed_texts = [self.classifier.preprocess_text(text) for text in texts]
+            predictions = iter(self.classifier.classify_texts(texts, preprocessed_texts))
+        preprocessed = iter(preprocessed_texts)
+
+        results = []
+        for pdf_path, (text, error) in zip(pdf_paths, extracted):
+            if error is not None:
+                self.failures.inc()
+                results.append(DocumentResult(pdf_path, '', '', self.classifier.UNKNOWN_LABEL, {},
+                                              self.UNKNOWN_TEMPLATE_ID, error=error))
+                continue
+            prediction, probabilities = next(predictions)
+            results.append(self._build_result(pdf_path, text, next(preprocessed), prediction, probabilities))
+        return results
+
+    def classify(self, pdf_path):
+        """
+        Classifica o documento sem extrair seus dados, lendo apenas as páginas necessárias para a decisão.
+
+        Parâmetros:
+        -----------
+        pdf_path : str
+            O caminho completo do arquivo PDF.
+
+        Retorna:
+        --------
+        tuple
+            O tipo de documento predito, o TemplateID correspondente e o dicionário {tipo de documento: probabilidade}.
+        """
+        with self.stage_seconds.labels(stage='classify').time():
+            prediction, probabilities, _ = self.classifier.predict_pdf_type_partial(pdf_path, **self.early_exit)
+        template_id, _ = self.DOCUMENT_TYPES.get(prediction, (self.UNKNOWN_TEMPLATE_ID, None))
+        return prediction, template_id, probabilities
+
+    def extract_for_template(self, template_id, text):
+        """
+        Extrai os dados de um texto com a estratégia do TemplateID informado.
+
+        Parâmetros:
+        -----------
+        template_id : int
+            O TemplateID do tipo de documento.
+        text : str
+            O texto extraído do PDF.
+
+        Retorna:
+        --------
+        dict
+            Os dados extraídos, ou um dicionário vazio se o TemplateID não tiver estratégia de extração.
+        """
+        for prediction, (type_template_id, _) in self.DOCUMENT_TYPES.items():
+            if type_template_id == template_id:
+                with self.stage_seconds.labels(stage='extract').time():
+                    return self.extractors[prediction].extract(text)
+        return {}
+
+    def fields_for_template(self, template_id):
+        """
+        Retorna os campos da especificação de extração de um TemplateID, com o tipo declarado de cada um.
+
+        Parâmetros:
+        -----------
+        template_id : int
+            O TemplateID do tipo de documento.
+
+        Retorna:
+        --------
+        list
+            Lista de tuplas (caminho, campo), ou uma lista vazia se o TemplateID não tiver estratégia de extração.
+        """
+        for type_template_id, strategy in self.DOCUMENT_TYPES.values():
+            if type_template_id == template_id:
+                return strategy.engine.fields
+        return []
+
+    def label_for_template(self, template_id):
+        """
+        Retorna o rótulo do classificador (0: Boleto, 1: Nota Fiscal, 2: Imposto de Renda) de um TemplateID.
+
+        Parâmetros:
+        -----------
+        template_id : int
+            O TemplateID do tipo de documento.
+
+        Retorna:
+        --------
+        int or None
+            O rótulo correspondente, ou None para o TemplateID de tipo desconhecido.
+        """
+        for label, prediction in self.classifier.LABEL_NAMES.items():
+            if prediction in self.DOCUMENT_TYPES and self.DOCUMENT_TYPES[prediction][0] == template_id:
+                return label
+        return None
+
+    def _build_result(self, pdf_path, text, preprocessed_text, prediction, probabilities):
+        self.documents.labels(type=prediction).inc()
+        if prediction not in self.DOCUMENT_TYPES:
+            return DocumentResult(pdf_path, text, preprocessed_text, prediction, probabilities,
+                                  self.UNKNOWN_TEMPLATE_ID)
+
+        template_id, _ = self.DOCUMENT_TYPES[prediction]
+        with self.stage_seconds.labels(stage='extract').time():
+            data = self.extractors[prediction].extract(text)
+        return DocumentResult(pdf_path, text, preprocessed_text, prediction, probabilities, template_id, data)
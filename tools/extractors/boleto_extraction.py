@@ -1,47 +1,46 @@
 from tools.extractors.extraction_strategy import ExtractionStrategy
+from tools.extractors.field_engine import FieldSpecEngine, Field, format_decimal
 import re
 
+decimal = format_decimal(decimal_separator=',', thousands_separator='.')
+
+BOLETO_FIELDS = {
+    'Cedente': {
+        # O nome ocupa a linha seguinte a "Cedente", às vezes seguido do rótulo "Agência/Código do Cedente"
+        'Nome': Field(r'^Cedente\n([^\n]+?)(?:\s*Agência/Código do Cedente)?$', flags=re.MULTILINE,
+                      search='prefix'),
+        'Agência/Código': Field(r'Agência/Código do Cedente\n([\d\s/]+)'),
+        'Espécie': Field(r'Espécie\n(.*?)\n')
+    },
+    'Documento': {
+        'Nosso Número': Field(r'Nosso Número\n(\d+)', search='exact'),
+        'Número do Documento': Field(r'Número do Documento\n(\d+)', search='exact'),
+        'CPF/CNPJ': Field(r'CPF/CNPJ\n([\d./-]+)', search='exact'),
+        'Vencimento': Field(r'Vencimento\n([\d/]+)', kind='date', search='range'),
+        'Valor do Documento': Field(r'Valor do Documento\n([\d,.]+)', normalize=decimal, kind='decimal',
+                                    search='range')
+    },
+    'Descontos e Acréscimos': {
+        'Desconto/Abatimento': Field(r'\(-\) Desconto/Abatimento\n([\d,.]+)', normalize=decimal, kind='decimal'),
+        'Outras Deduções': Field(r'\(-\) Outras Deduções\n([\d,.]+)', normalize=decimal, kind='decimal'),
+        'Mora/Multa': Field(r'\(\+\) Mora/Multa\n([\d,.]+)', normalize=decimal, kind='decimal'),
+        'Outros Acréscimos': Field(r'\(\+\) Outros Acréscimos\n([\d,.]+)', normalize=decimal, kind='decimal'),
+        'Valor Cobrado': Field(r'\(=\) Valor Cobrado\n([\d,.]+)', normalize=decimal, kind='decimal', search='range')
+    },
+    'Sacado': {
+        # "Sacado" no início da linha, para não coincidir com "Recibo do Sacado"
+        'Nome': Field(r'^Sacado\n([^\n]+)', flags=re.MULTILINE, search='prefix'),
+        'Endereço': Field(r'Endereço:\s*(.*?)(?:\n|$)', flags=re.DOTALL),
+        'Bairro e CEP': Field(r'Bairro, CEP: ([\d-]+)')
+    },
+    'Instruções': Field(r'Instruções \(Texto de responsabilidade do Cedente\)\n(.*?)(?:\nSacado|$)', flags=re.DOTALL),
+    'Autenticação Mecânica': Field(r'Autenticação mecânica\n(.*?)(?:\n|$)', flags=re.DOTALL)
+}
+
+boleto_engine = FieldSpecEngine(BOLETO_FIELDS)
+
 class BoletoExtractionStrategy(ExtractionStrategy):
-    def extract_data(self, text):
-        def extract_with_regex(pattern, text, default='', flags=0):
-            match = re.search(pattern, text, flags)
-            return match.group(1).strip() if match else default
-        
-        def format_decimal(value):
-            try:
-                return f"{float(value):.2f}"
-            except ValueError:
-                return value
-            
-        text = text.encode('utf-8').decode('unicode_escape')
-        
-        data = {
-            'Cedente': {
-                'Nome': extract_with_regex(r'Cedente\n(.*?)\nAgência/Código', text, flags=re.DOTALL),
-                'Agência/Código': extract_with_regex(r'Agência/Código do Cedente\n([\d\s/]+)', text),
-                'Espécie': extract_with_regex(r'Espécie\n(.*?)\n', text)
-            },
-            'Documento': {
-                'Nosso Número': extract_with_regex(r'Nosso Número\n(\d+)', text),
-                'Número do Documento': extract_with_regex(r'Número do Documento\n(\d+)', text),
-                'CPF/CNPJ': extract_with_regex(r'CPF/CNPJ\n([\d./-]+)', text),
-                'Vencimento': extract_with_regex(r'Vencimento\n([\d/]+)', text),
-                'Valor do Documento': format_decimal(extract_with_regex(r'Valor do Documento\n([\d,.]+)', text).replace(',', '.'))
-            },
-            'Descontos e Acréscimos': {
-                'Desconto/Abatimento':format_decimal( extract_with_regex(r'\(-\) Desconto/Abatimento\n([\d,.]+)', text).replace(',', '.')),
-                'Outras Deduções': format_decimal(extract_with_regex(r'\(-\) Outras Deduções\n([\d,.]+)', text).replace(',', '.')),
-                'Mora/Multa': format_decimal(extract_with_regex(r'\(\+\) Mora/Multa\n([\d,.]+)', text).replace(',', '.')),
-                'Outros Acréscimos': format_decimal(extract_with_regex(r'\(\+\) Outros Acréscimos\n([\d,.]+)', text).replace(',', '.')),
-                'Valor Cobrado': format_decimal(extract_with_regex(r'\(=\) Valor Cobrado\n([\d,.]+)', text).replace(',', '.'))
-            },
-            'Sacado': {
-                'Nome': extract_with_regex(r'Sacado\n(.*?)\nAutenticação mecânica', text, flags=re.DOTALL),
-                'Endereço': extract_with_regex(r'Endereço:\s*(.*?)(?:\n|$)', text, flags=re.DOTALL),
-                'Bairro e CEP': extract_with_regex(r'Bairro, CEP: ([\d-]+)', text)
-            },
-            'Instruções': extract_with_regex(r'Instruções \(Texto de responsabilidade do Cedente\)\n(.*?)(?:\nSacado|$)', text, flags=re.DOTALL),
-            'Autenticação Mecânica': extract_with_regex(r'Autenticação mecânica\n(.*?)(?:\n|$)', text, flags=re.DOTALL)
-        }
+    engine = boleto_engine
 
-        return data
+    def extract_data(self, text):
+        return boleto_engine.extract(text)
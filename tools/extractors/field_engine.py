@@ -0,0 +1,201 @@
+import re
+
+
+def unicode_escape_decode(text):
+    """
+    Decodifica sequências de escape (como `\\n` literais) presentes no texto extraído do PDF, preservando os
+    caracteres acentuados (que seriam corrompidos se o texto fosse codificado em UTF-8 antes da decodificação).
+    """
+    return text.encode('latin-1', 'backslashreplace').decode('unicode_escape')
+
+
+def format_decimal(decimal_separator=',', thousands_separator=None):
+    """
+    Cria um normalizador que converte um número textual para o formato "0.00".
+
+    Parâmetros:
+    -----------
+    decimal_separator : str
+        O separador decimal usado no documento.
+    thousands_separator : str, opcional
+        O separador de milhar usado no documento, removido antes da conversão.
+
+    Retorna:
+    --------
+    function
+        Função que recebe o valor textual e retorna o valor formatado, ou o próprio valor se não for numérico.
+    """
+    def normalize(value):
+        number = value
+        if thousands_separator:
+            number = number.replace(thousands_separator, '')
+        try:
+            return f"{float(number.replace(decimal_separator, '.')):.2f}"
+        except ValueError:
+            return value
+    return normalize
+
+
+class Field:
+    """
+    Campo extraído pelo primeiro grupo de uma expressão regular, compilada na criação do campo.
+
+    Atributos:
+    -----------
+    regex : re.Pattern
+        A expressão regular compilada; o valor do campo é o seu primeiro grupo.
+    normalize : function or None
+        Função aplicada ao valor encontrado (por exemplo, `format_decimal()`).
+    strip : bool
+        Se os espaços nas extremidades do valor devem ser removidos.
+    default : str
+        O valor do campo quando a expressão não é encontrada.
+    kind : str
+        O tipo do valor na exportação em colunas: 'text', 'decimal' (formato "0.00"), 'date' (DD/MM/AAAA) ou
+        'datetime' (DD/MM/AAAA HH:MM:SS).
+    search : str or None
+        Como o campo é indexado para a busca: 'exact' (identificadores), 'prefix' (nomes), 'range' (valores e
+        datas) ou None (não indexado).
+    """
+
+    def __init__(self, pattern, flags=0, normalize=None, strip=True, default='', kind='text', search=None):
+        self.regex = re.compile(pattern, flags)
+        self.normalize = normalize
+        self.strip = strip
+        self.default = default
+        self.kind = kind
+        self.search = search
+
+    def extract(self, text):
+        match = self.regex.search(text)
+        if not match:
+            return self.default
+        value = match.group(1)
+        if self.strip:
+            value = value.strip()
+        return self.normalize(value) if self.normalize else value
+
+
+class Marker:
+    """
+    Campo que indica a presença de um trecho literal no documento: vale o próprio trecho, ou '' se ausente.
+    """
+
+    kind = 'text'
+    search = None
+
+    def __init__(self, literal):
+        self.literal = literal
+
+    def extract(self, text):
+        return self.literal if self.literal in text else ''
+
+
+class Table:
+    """
+    Campo tabular: uma expressão localiza a seção da tabela e outra extrai as suas linhas.
+
+    Atributos:
+    -----------
+    section : re.Pattern
+        Expressão compilada cujo primeiro grupo é o conteúdo da seção.
+    row : re.Pattern
+        Expressão compilada cujos grupos são as colunas de cada linha.
+    columns : list
+        Normalizador (ou None) de cada coluna, na ordem dos grupos de `row`.
+    default : str
+        O valor do campo quando a seção não é encontrada.
+    """
+
+    kind = 'table'
+    search = None
+
+    def __init__(self, section_pattern, row_pattern, columns, flags=0, default=''):
+        self.section = re.compile(section_pattern, flags)
+        self.row = re.compile(row_pattern, flags)
+        self.columns = columns
+        self.default = default
+
+    def extract(self, text):
+        match = self.section.search(text)
+        if not match:
+            return self.default
+        section = match.group(1)
+        if not section:
+            return section
+        return [
+            tuple(normalize(value) if normalize else value for normalize, value in zip(self.columns, row))
+            for row in self.row.findall(section)
+        ]
+
+
+class FieldSpecEngine:
+    """
+    Motor de extração declarativo: cada template descreve uma única vez seus campos (Field, Marker, Table),
+    organizados em um dicionário aninhado com o mesmo formato do resultado, e o motor os aplica ao texto.
+
+    As expressões são compiladas na criação dos campos (na importação do módulo do template), a especificação
+    é convertida uma única vez em um plano de listas (chave, campo ou subplano), e o texto de cada documento é
+    decodificado apenas uma vez antes da extração.
+
+    Atributos:
+    -----------
+    fields : list
+        Lista de tuplas (caminho, campo), onde o caminho é a sequência de chaves do campo no resultado.
+    decode : function or None
+        Função aplicada ao texto antes da extração.
+
+    Métodos:
+    --------
+    extract(text):
+        Extrai todos os campos do texto, retornando um dicionário aninhado conforme a especificação.
+    """
+
+    def __init__(self, spec, decode=unicode_escape_decode):
+        """
+        Inicializa o motor a partir da especificação de campos de um template.
+
+        Parâmetros:
+        -----------
+        spec : dict
+            Dicionário aninhado cujas folhas são campos (Field, Marker ou Table).
+        decode : function, opcional
+            Função aplicada ao texto antes da extração. Por padrão, decodifica sequências de escape.
+        """
+        self.fields = list(self._flatten(spec, ()))
+        self.decode = decode
+        self._plan = self._compile(spec)
+
+    def _compile(self, spec):
+        return [(key, self._compile(value) if isinstance(value, dict) else value) for key, value in spec.items()]
+
+    def _flatten(self, spec, path):
+        for key, value in spec.items():
+            if isinstance(value, dict):
+                yield from self._flatten(value, path + (key,))
+            else:
+                yield path + (key,), value
+
+    def extract(self, text):
+        """
+        Extrai todos os campos do texto.
+
+        Parâmetros:
+        -----------
+        text : str
+            O texto extraído de um documento PDF.
+
+        Retorna:
+        --------
+        dict
+            Um dicionário aninhado com os valores de cada campo, no formato da especificação.
+        """
+        if self.decode:
+            text = self.decode(text)
+        return self._run(self._plan, text)
+
+    def _run(self, plan, text):
+        return {
+            key: self._run(item, text) if isinstance(item, list) else item.extract(text)
+            for key, item in plan
+        }
@@ -1,57 +1,45 @@
 from tools.extractors.extraction_strategy import ExtractionStrategy
+from tools.extractors.field_engine import FieldSpecEngine, Field, Marker, Table, format_decimal
 import re
 
-class ImpostoDeRendaExtractionStrategy(ExtractionStrategy):
-    def extract_data(self, text):
-        def extract_with_regex(pattern, text, default='', flags=0):
-            matches = re.findall(pattern, text, flags)
-            return matches[0] if matches else default
-        
-        def format_decimal(value):
-            try:
-                return f"{float(value.replace('.', '').replace(',', '.')):.2f}"
-            except ValueError:
-                return value
+decimal = format_decimal(decimal_separator=',', thousands_separator='.')
 
-        # Processamento do texto para garantir que está no formato correto
-        text = text.encode('utf-8').decode('unicode_escape')
+# Linhas das tabelas de receitas e despesas: data, descrição e valor
+TABLE_ROW = r'(\d{2}/\d{2}/\d{4})\s+([^\d]+)\s+([\d\.]+)'
+TABLE_COLUMNS = [None, None, decimal]
 
-        # Extrair dados do extrato do imposto de renda
-        data = {
-            'Dados do Contribuinte': {
-                'Nome': extract_with_regex(r'Nome do Contribuinte:\s*(.*)', text),
-                'CPF': extract_with_regex(r'CPF:\s*(\d{3}\.\d{3}\.\d{3}-\d{2})', text),
-                'Período Inicial': extract_with_regex(r'Período:\s*(\d{2}/\d{2}/\d{4})', text),
-                'Período Final': extract_with_regex(r'Período:\s*\d{2}/\d{2}/\d{4}\s*-\s*(\d{2}/\d{2}/\d{4})', text)
-            },
-            'Receitas': {
-                'Tabela': extract_with_regex(r'Receitas\s+Data\s+Descrição\s+Valor \(R\$\)\s*((?:\d{2}/\d{2}/\d{4}\s+[^\d]+\s+[\d\.]+\s*)+)', text, flags=re.DOTALL)
-            },
-            'Despesas': {
-                'Tabela': extract_with_regex(r'Despesas\s+Data\s+Descrição\s+Valor \(R\$\)\s*((?:\d{2}/\d{2}/\d{4}\s+[^\d]+\s+[\d\.]+\s*)+)', text, flags=re.DOTALL)
-            },
-            'Resumo': {
-                'Total de Receitas': format_decimal(extract_with_regex(r'Total de Receitas:\s*R\$\s*([\d\.]+)', text)),
-                'Total de Despesas': format_decimal(extract_with_regex(r'Total de Despesas:\s*R\$\s*([\d\.]+)', text)),
-                'Imposto a Pagar': format_decimal(extract_with_regex(r'Imposto a Pagar:\s*R\$\s*([\d\.]+)', text))
-            },
-            'Nota': 'Extrato do Imposto de Renda' if 'Extrato do Imposto de Renda' in text else ''
-        }
+IMPOSTO_DE_RENDA_FIELDS = {
+    'Dados do Contribuinte': {
+        'Nome': Field(r'Nome do Contribuinte:\s*(.*)', strip=False, search='prefix'),
+        'CPF': Field(r'CPF:\s*(\d{3}\.\d{3}\.\d{3}-\d{2})', strip=False, search='exact'),
+        'Período Inicial': Field(r'Período:\s*(\d{2}/\d{2}/\d{4})', strip=False, kind='date',
+                                 search='range'),
+        'Período Final': Field(r'Período:\s*\d{2}/\d{2}/\d{4}\s*-\s*(\d{2}/\d{2}/\d{4})', strip=False, kind='date',
+                               search='range')
+    },
+    'Receitas': {
+        'Tabela': Table(r'Receitas\s+Data\s+Descrição\s+Valor \(R\$\)\s*((?:\d{2}/\d{2}/\d{4}\s+[^\d]+\s+[\d\.]+\s*)+)',
+                        TABLE_ROW, TABLE_COLUMNS, flags=re.DOTALL)
+    },
+    'Despesas': {
+        'Tabela': Table(r'Despesas\s+Data\s+Descrição\s+Valor \(R\$\)\s*((?:\d{2}/\d{2}/\d{4}\s+[^\d]+\s+[\d\.]+\s*)+)',
+                        TABLE_ROW, TABLE_COLUMNS, flags=re.DOTALL)
+    },
+    'Resumo': {
+        'Total de Receitas': Field(r'Total de Receitas:\s*R\$\s*([\d\.]+)', normalize=decimal, strip=False, kind='decimal',
+                                   search='range'),
+        'Total de Despesas': Field(r'Total de Despesas:\s*R\$\s*([\d\.]+)', normalize=decimal, strip=False, kind='decimal',
+                                   search='range'),
+        'Imposto a Pagar': Field(r'Imposto a Pagar:\s*R\$\s*([\d\.]+)', normalize=decimal, strip=False, kind='decimal',
+                                 search='range')
+    },
+    'Nota': Marker('Extrato do Imposto de Renda')
+}
 
-        # Separar as linhas de receitas
-        receitas_section = extract_with_regex(r'Receitas\s+Data\s+Descrição\s+Valor \(R\$\)\s*((?:\d{2}/\d{2}/\d{4}\s+[^\d]+\s+[\d\.]+\s*)+)', text, flags=re.DOTALL)
-        if receitas_section:
-            data['Receitas']['Tabela'] = [
-                (date, description, format_decimal(value))
-                for date, description, value in re.findall(r'(\d{2}/\d{2}/\d{4})\s+([^\d]+)\s+([\d\.]+)', receitas_section, flags=re.DOTALL)
-            ]
+imposto_de_renda_engine = FieldSpecEngine(IMPOSTO_DE_RENDA_FIELDS)
 
-        # Separar as linhas de despesas
-        despesas_section = extract_with_regex(r'Despesas\s+Data\s+Descrição\s+Valor \(R\$\)\s*((?:\d{2}/\d{2}/\d{4}\s+[^\d]+\s+[\d\.]+\s*)+)', text, flags=re.DOTALL)
-        if despesas_section:
-            data['Despesas']['Tabela'] = [
-                (date, description, format_decimal(value))
-                for date, description, value in re.findall(r'(\d{2}/\d{2}/\d{4})\s+([^\d]+)\s+([\d\.]+)', despesas_section, flags=re.DOTALL)
-            ]
+class ImpostoDeRendaExtractionStrategy(ExtractionStrategy):
+    engine = imposto_de_renda_engine
 
-        return data
+    def extract_data(self, text):
+        return imposto_de_renda_engine.extract(text)
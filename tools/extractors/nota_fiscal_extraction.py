@@ -1,51 +1,44 @@
 from tools.extractors.extraction_strategy import ExtractionStrategy
+from tools.extractors.field_engine import FieldSpecEngine, Field, Marker, format_decimal
 import re
 
-class NotaFiscalExtractionStrategy(ExtractionStrategy):
-    def extract_data(self, text):
-        def extract_with_regex(pattern, text, default='', flags=0):
-            match = re.search(pattern, text, flags)
-            return match.group(1).strip() if match else default
-
-        def format_decimal(value):
-            try:
-                return f"{float(value.replace(',', '.')):.2f}"
-            except ValueError:
-                return value
+NOTA_FISCAL_FIELDS = {
+    'Dados da Nota Fiscal': {
+        'Numero da Nota Fiscal': Field(r'NFe No (\d+)', search='exact'),
+        'Serie': Field(r'Série (\d+)'),
+        'Data de Emissao': Field(r'Data de Emissão ([\d/ :]+)', kind='datetime', search='range'),
+        'Modelo': Field(r'Modelo\s*(\d{2} - NF-E EMITIDA EM SUBSTITUIÇÃO AO MODELO \d+\s*OU \d\w?)'),
+        'Natureza da Operacao': Field(r'Natureza da\s*Operação\s*([^\n]+\s*[^\n]*)', flags=re.DOTALL),
+        'Evento Mais Recente': Field(r'Evento Mais\s*Recente\s*([^\n]+)', flags=re.DOTALL),
+        'Data/Hora Evento Mais Recente': Field(r'Data/Hora Evento Mais Recente\s+([\d/ :]+)', kind='datetime'),
+        'Chave de Acesso': Field(r'Chave de\s*Acesso\s*(\d{44})', flags=re.DOTALL, search='exact')
+    },
+    'Dados do Emitente': {
+        'CPF/CNPJ': Field(r'CPF/CNPJ\s+(\d+)', search='exact'),
+        'Razao Social': Field(r'Razão Social\s+(.+?)\n', flags=re.DOTALL, search='prefix'),
+        'UF': Field(r'UF\s+(\w+)'),
+        'Municipio': Field(r'Município\s+([\w ]+)')
+    },
+    'Dados do Destinatario': {
+        'CNPJ': Field(r'CNPJ\s+(\d+)', search='exact'),
+        'Nome': Field(r'Nome\s*([A-Z\s,]+(?:\n[A-Z\s,]+)*)\n', flags=re.DOTALL, search='prefix'),
+        'UF': Field(r'UF\s+(\w+)'),
+        'Indicador IE': Field(r'Indicador IE\s+([\w ]+)'),
+        'Destino da Operacao': Field(r'Destino da\s*Operação\s*([\d -]+[^\n]*)', flags=re.DOTALL),
+        'Consumidor Final': Field(r'Consumidor Final\s+(\d+ - \w+)'),
+        'Presenca do Comprador': Field(r'Presença do\s*Comprador\s*([\d -]+[^\n]*)', flags=re.DOTALL)
+    },
+    'Valor Nota Fiscal': {
+        'Valor': Field(r'Valor Nota Fiscal\s+([\d,]+)', normalize=format_decimal(decimal_separator=','), kind='decimal',
+                       search='range')
+    },
+    'Nota': Marker('Nota Fiscal gerada automaticamente')
+}
 
-        # Processamento do texto para garantir que está no formato correto
-        text = text.encode('utf-8').decode('unicode_escape')
+nota_fiscal_engine = FieldSpecEngine(NOTA_FISCAL_FIELDS)
 
-        data = {
-            'Dados da Nota Fiscal': {
-                'Numero da Nota Fiscal': extract_with_regex(r'NFe No (\d+)', text),
-                'Serie': extract_with_regex(r'Série (\d+)', text),
-                'Data de Emissao': extract_with_regex(r'Data de Emissão ([\d/ :]+)', text),
-                'Modelo': extract_with_regex(r'Modelo\s*(\d{2} - NF-E EMITIDA EM SUBSTITUIÇÃO AO MODELO \d+\s*OU \d\w?)', text),
-                'Natureza da Operacao': extract_with_regex(r'Natureza da\s*Operação\s*([^\n]+\s*[^\n]*)', text, flags=re.DOTALL),
-                'Evento Mais Recente': extract_with_regex(r'Evento Mais\s*Recente\s*([^\n]+)', text, flags=re.DOTALL),
-                'Data/Hora Evento Mais Recente': extract_with_regex(r'Data/Hora Evento Mais Recente\s+([\d/ :]+)', text),
-                'Chave de Acesso': extract_with_regex(r'Chave de\s*Acesso\s*(\d{44})', text, flags=re.DOTALL)
-            },
-            'Dados do Emitente': {
-                'CPF/CNPJ': extract_with_regex(r'CPF/CNPJ\s+(\d+)', text),
-                'Razao Social': extract_with_regex(r'Razão Social\s+(.+?)\n', text, flags=re.DOTALL),
-                'UF': extract_with_regex(r'UF\s+(\w+)', text),
-                'Municipio': extract_with_regex(r'Município\s+([\w ]+)', text)
-            },
-            'Dados do Destinatario': {
-                'CNPJ': extract_with_regex(r'CNPJ\s+(\d+)', text),
-                'Nome': extract_with_regex(r'Nome\s*([A-Z\s,]+(?:\n[A-Z\s,]+)*)\n', text, flags=re.DOTALL),
-                'UF': extract_with_regex(r'UF\s+(\w+)', text),
-                'Indicador IE': extract_with_regex(r'Indicador IE\s+([\w ]+)', text),
-                'Destino da Operacao': extract_with_regex(r'Destino da\s*Operação\s*([\d -]+[^\n]*)', text, flags=re.DOTALL),
-                'Consumidor Final': extract_with_regex(r'Consumidor Final\s+(\d+ - \w+)', text),
-                'Presenca do Comprador': extract_with_regex(r'Presença do\s*Comprador\s*([\d -]+[^\n]*)', text, flags=re.DOTALL)
-            },
-            'Valor Nota Fiscal': {
-                'Valor': format_decimal(extract_with_regex(r'Valor Nota Fiscal\s+([\d,]+)', text))
-            },
-            'Nota': 'Nota Fiscal gerada automaticamente' if 'Nota Fiscal gerada automaticamente' in text else ''
-        }
+class NotaFiscalExtractionStrategy(ExtractionStrategy):
+    engine = nota_fiscal_engine
 
-        return data
+    def extract_data(self, text):
+        return nota_fiscal_engine.extract(text)
@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+from tools.metrics import MetricsRegistry
+
+
+class IngestionQueue:
+    """
+    Fila de processamento em segundo plano dos documentos enviados, executada por um pool local de threads.
+
+    A requisição de upload apenas persiste os arquivos e enfileira seus identificadores; os lotes são
+    processados pelas threads da fila, cada uma dentro do seu próprio contexto da aplicação Flask (e, portanto,
+    com a sua própria sessão do banco de dados). Assim, o tempo de resposta do upload não depende da quantidade
+    de documentos enviados.
+
+    Atributos:
+    -----------
+    app : Flask
+        A aplicação cujo contexto é ativado na execução de cada lote.
+    batch_size : int
+        Número máximo de itens entregues a cada execução da função de processamento.
+    pending : Gauge
+        Número de lotes enfileirados ou em processamento.
+
+    Métodos:
+    --------
+    submit(func, items):
+        Divide os itens em lotes e agenda `func(lote)` para cada um deles.
+
+    shutdown(wait=True):
+        Encerra o pool de threads, aguardando (ou não) os lotes pendentes.
+    """
+
+    def __init__(self, app, max_workers=4, batch_size=8, metrics=None):
+        """
+        Inicializa a fila de processamento.
+
+        Parâmetros:
+        -----------
+        app : Flask
+            A aplicação cujo contexto é ativado na execução de cada lote.
+        max_workers : int
+            Número de threads que processam os lotes.
+        batch_size : int
+            Número máximo de itens por lote.
+        metrics : MetricsRegistry, opcional
+            Registro onde o tamanho da fila é publicado. Por padrão, um registro próprio não exposto.
+        """
+        self.app = app
+        self.batch_size = batch_size
+        self.pending = (metrics or MetricsRegistry()).gauge('upflow_ingestion_pending_batches',
+                                                            'Lotes de documentos aguardando processamento.')
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingestion')
+
+    def submit(self, func, items):
+        """
+        Agenda o processamento dos itens em lotes de até `batch_size` itens.
+
+        Parâmetros:
+        -----------
+        func : function
+            Função chamada com a lista de itens de cada lote, dentro do contexto da aplicação.
+        items : list
+            Os itens a processar (por exemplo, os FileID dos arquivos enviados).
+
+        Retorna:
+        --------
+        list
+            Lista de Future, um para cada lote agendado.
+        """
+        futures = []
+        for start in range(0, len(items), self.batch_size):
+            self.pending.inc()
+            futures.append(self._executor.submit(self._run, func, items[start:start + self.batch_size]))
+        return futures
+
+    def _run(self, func, batch):
+        try:
+            with self.app.app_context():
+                func(batch)
+        except Exception as e:
+            # O lote não deve derrubar a thread da fila; o erro fica registrado no log
+            print(f"Erro ao processar o lote {batch}: {e}")
+        finally:
+            self.pending.inc(-1)
+
+    def shutdown(self, wait=True):
+        """
+        Encerra o pool de threads da fila.
+
+        Parâmetros:
+        -----------
+        wait : bool
+            Se True, aguarda a conclusão dos lotes já agendados.
+
+        Retorna:
+        --------
+        None
+        """
+        self._executor.shutdown(wait=wait)
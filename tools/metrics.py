@@ -0,0 +1,246 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Base das métricas: guarda os valores de cada combinação de rótulos, protegidos por uma trava.
+    """
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        """
+        Retorna a série da métrica para a combinação de rótulos informada.
+        """
+        return _Child(self, tuple(str(labels[name]) for name in self.labelnames))
+
+    def _samples(self):
+        with self._lock:
+            return [(key, self._copy(value)) for key, value in sorted(self._values.items())]
+
+    def _copy(self, value):
+        return value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        for key, value in self._samples():
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+
+class _Child:
+    """
+    Série de uma métrica para uma combinação fixa de rótulos.
+    """
+
+    def __init__(self, metric, key):
+        self._metric = metric
+        self._key = key
+
+    def __getattr__(self, name):
+        method = getattr(self._metric, name)
+        return lambda *args, **kwargs: method(*args, _key=self._key, **kwargs)
+
+
+class Counter(_Metric):
+    """
+    Contador monotônico.
+    """
+
+    type_name = 'counter'
+
+    def inc(self, amount=1, _key=()):
+        with self._lock:
+            self._values[_key] = self._values.get(_key, 0) + amount
+
+    def set_total(self, value, _key=()):
+        """
+        Copia o total de uma contagem mantida por outro objeto (por exemplo, em um coletor). O valor exposto
+        nunca diminui.
+        """
+        with self._lock:
+            self._values[_key] = max(value, self._values.get(_key, 0))
+
+
+class Gauge(_Metric):
+    """
+    Valor que pode subir e descer, ou ser calculado no momento da coleta.
+    """
+
+    type_name = 'gauge'
+
+    def set(self, value, _key=()):
+        with self._lock:
+            self._values[_key] = value
+
+    def inc(self, amount=1, _key=()):
+        with self._lock:
+            self._values[_key] = self._values.get(_key, 0) + amount
+
+
+class Histogram(_Metric):
+    """
+    Distribuição de valores (por exemplo, durações em segundos) em faixas cumulativas.
+    """
+
+    type_name = 'histogram'
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, _key=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(_key)
+            if state is None:
+                # Contagem por faixa (não cumulativa), mais a faixa +Inf, a soma e o total de observações
+                state = self._values[_key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, _key=()):
+        """
+        Mede a duração do bloco `with` e a registra na métrica.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, _key=_key)
+
+    def _copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        for key, (counts, total, count) in self._samples():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas da aplicação, exposto no formato texto do Prometheus.
+
+    As métricas são criadas uma única vez por nome: chamadas seguintes de `counter`, `gauge` ou `histogram` com o
+    mesmo nome retornam a métrica já registrada, de modo que diferentes módulos podem instrumentar a mesma série.
+    Cada observação custa uma trava e uma atualização de dicionário, o que permite deixar a instrumentação sempre
+    ativa. Valores derivados de outros objetos (como as taxas da cascata de classificação) são atualizados por
+    coletores chamados apenas no momento da exposição.
+
+    Atributos:
+    -----------
+    metrics : dict
+        Dicionário {nome: métrica} com as métricas registradas, na ordem de registro.
+
+    Métodos:
+    --------
+    counter(name, documentation, labelnames=()):
+        Retorna o contador com o nome informado, criando-o se necessário.
+
+    gauge(name, documentation, labelnames=()):
+        Retorna o gauge com o nome informado, criando-o se necessário.
+
+    histogram(name, documentation, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        Retorna o histograma com o nome informado, criando-o se necessário.
+
+    add_collector(collector):
+        Registra uma função chamada antes de cada exposição para atualizar métricas derivadas.
+
+    render():
+        Retorna todas as métricas no formato texto do Prometheus.
+    """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self.metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name, *args, **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"A métrica '{name}' já foi registrada como {metric.type_name}.")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def add_collector(self, collector):
+        """
+        Registra uma função sem parâmetros chamada antes de cada exposição.
+
+        Parâmetros:
+        -----------
+        collector : function
+            Função que atualiza métricas derivadas (por exemplo, com `Gauge.set` ou `Counter.set_total`).
+
+        Retorna:
+        --------
+        None
+        """
+        self._collectors.append(collector)
+
+    def render(self):
+        """
+        Retorna todas as métricas no formato texto do Prometheus.
+
+        Retorna:
+        --------
+        str
+            O texto de exposição, com as linhas HELP/TYPE e as amostras de cada métrica.
+        """
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
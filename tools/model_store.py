@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+
+class ModelStore:
+    """
+    Classe para persistir os artefatos treinados do PDFClassifier (modelo e vetorizador), indexados pela
+    impressão digital (fingerprint) do corpus de treinamento.
+
+    A impressão digital combina o nome, o tamanho e a data de modificação de cada PDF do corpus, o rótulo
+    de cada diretório, o modo de treinamento e os parâmetros do vetorizador e do modelo. Enquanto ela não
+    mudar, os artefatos salvos são reaproveitados e o corpus não precisa ser lido nem o modelo treinado
+    novamente. A cada novo artefato salvo, os artefatos anteriores a ele são removidos.
+
+    Atributos:
+    -----------
+    store_path : str
+        Diretório onde os artefatos são armazenados, um subdiretório por impressão digital.
+    training : str
+        O modo de treinamento dos artefatos ('memory' ou 'streaming').
+
+    Métodos:
+    --------
+    fingerprint(classifier, folders):
+        Calcula a impressão digital do corpus e dos parâmetros do classificador.
+
+    load(classifier, folders):
+        Carrega o modelo e o vetorizador salvos no classificador, se a impressão digital corresponder.
+
+    save(classifier, folders):
+        Salva o modelo e o vetorizador treinados sob a impressão digital atual.
+
+    refresh(classifier, folders):
+        Carrega no classificador o artefato salvo por outro processo desde a última carga ou gravação.
+    """
+
+    MODEL_FILE = 'model.pkl'
+    VECTORIZER_FILE = 'vectorizer.pkl'
+
+    def __init__(self, store_path, training='memory'):
+        """
+        Inicializa o ModelStore com o diretório de armazenamento dos artefatos.
+
+        Parâmetros:
+        -----------
+        store_path : str
+            Diretório onde os artefatos são armazenados.
+        training : str
+            O modo de treinamento dos artefatos ('memory' ou 'streaming'), que entra na impressão digital.
+        """
+        self.store_path = store_path
+        self.training = training
+        self._store_mtime = None
+
+    def fingerprint(self, classifier, folders):
+        """
+        Calcula a impressão digital do corpus de treinamento e dos parâmetros do classificador.
+
+        Parâmetros:
+        -----------
+        classifier : PDFClassifier
+            O classificador cujos parâmetros de vetorizador e modelo entram na impressão digital.
+        folders : dict
+            Dicionário {rótulo: diretório} com os diretórios do corpus de treinamento.
+
+        Retorna:
+        --------
+        str
+            A impressão digital em hexadecimal (SHA-256).
+        """
+        corpus = []
+        for label, path in folders.items():
+            for file_name in sorted(os.listdir(path)):
+                if not file_name.lower().endswith('.pdf'):
+                    continue
+                stat = os.stat(os.path.join(path, file_name))
+                corpus.append([label, os.path.basename(path), file_name, stat.st_size, stat.st_mtime_ns])
+
+        payload = {
+            'corpus': corpus,
+            'training': self.training,
+            'vectorizer': [type(classifier.vectorizer).__name__, repr(sorted(classifier.vectorizer.get_params().items()))],
+            'model': [type(classifier.model).__name__, repr(sorted(classifier.model.get_params().items()))],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def load(self, classifier, folders):
+        """
+        Carrega no classificador o modelo e o vetorizador salvos para a impressão digital atual.
+
+        Parâmetros:
+        -----------
+        classifier : PDFClassifier
+            O classificador que receberá os artefatos carregados.
+        folders : dict
+            Dicionário {rótulo: diretório} com os diretórios do corpus de treinamento.
+
+        Retorna:
+        --------
+        bool
+            True se os artefatos foram encontrados e carregados, False caso seja necessário treinar.
+        """
+        artifact_path = os.path.join(self.store_path, self.fingerprint(classifier, folders))
+        model_path = os.path.join(artifact_path, self.MODEL_FILE)
+        vectorizer_path = os.path.join(artifact_path, self.VECTORIZER_FILE)
+        if not (os.path.exists(model_path) and os.path.exists(vectorizer_path)):
+            return False
+
+        classifier.load_model(model_path=model_path, vectorizer_path=vectorizer_path)
+        self._store_mtime = os.stat(self.store_path).st_mtime_ns
+        return True
+
+    def save(self, classifier, folders):
+        """
+        Salva o modelo e o vetorizador treinados sob a impressão digital atual.
+
+        Os arquivos são gravados em um diretório temporário e movidos de uma só vez para o destino, de modo
+        que outros processos nunca encontrem um artefato incompleto. Em seguida, os artefatos salvos antes
+        deste (de corpus ou parâmetros anteriores) são removidos.
+
+        Parâmetros:
+        -----------
+        classifier : PDFClassifier
+            O classificador já treinado.
+        folders : dict
+            Dicionário {rótulo: diretório} com os diretórios do corpus de treinamento.
+
+        Retorna:
+        --------
+        str
+            O diretório onde os artefatos foram salvos.
+        """
+        artifact_path = os.path.join(self.store_path, self.fingerprint(classifier, folders))
+        if os.path.isdir(artifact_path):
+            return artifact_path
+
+        os.makedirs(self.store_path, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=self.store_path, prefix='.tmp-')
+        try:
+            classifier.save_model(model_path=os.path.join(tmp_path, self.MODEL_FILE),
+                                  vectorizer_path=os.path.join(tmp_path, self.VECTORIZER_FILE))
+            os.rename(tmp_path, artifact_path)
+        except OSError:
+            # Outro processo salvou o mesmo artefato primeiro
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.isdir(artifact_path):
+                raise
+        self._prune(artifact_path)
+        self._store_mtime = os.stat(self.store_path).st_mtime_ns
+        return artifact_path
+
+    def refresh(self, classifier, folders):
+        """
+        Carrega no classificador o artefato atual quando outro processo salvou um novo (por exemplo, depois de
+        uma atualização incremental). A verificação consulta apenas a data de modificação do diretório do
+        armazenamento; a impressão digital só é calculada quando ela muda.
+
+        Parâmetros:
+        -----------
+        classifier : PDFClassifier
+            O classificador que receberá os artefatos carregados.
+        folders : dict
+            Dicionário {rótulo: diretório} com os diretórios do corpus de treinamento.
+
+        Retorna:
+        --------
+        bool
+            True se um novo artefato foi carregado.
+        """
+        try:
+            store_mtime = os.stat(self.store_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if store_mtime == self._store_mtime:
+            return False
+        self._store_mtime = store_mtime
+        return self.load(classifier, folders)
+
+    def _prune(self, artifact_path):
+        # Remove os artefatos mais antigos que o atual; os mais novos podem ter sido salvos por outro processo
+        saved_at = os.stat(artifact_path).st_mtime_ns
+        with os.scandir(self.store_path) as it:
+            for entry in it:
+                if entry.is_dir() and not entry.name.startswith('.') and entry.path != artifact_path:
+                    try:
+                        if entry.stat().st_mtime_ns < saved_at:
+                            shutil.rmtree(entry.path, ignore_errors=True)
+                    except FileNotFoundError:
+                        continue
@@ -1,23 +1,78 @@
 import PyPDF2
 import re
-from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.metrics import confusion_matrix, accuracy_score, f1_score, recall_score, classification_report
 import os
 import pickle
 import json
+import zlib
+import atexit
+import copy
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+def _load_pdf_text(pdf_path, text_cache):
+    """
+    Extrai e pré-processa o texto de um PDF em um processo do pool de `load_corpus`.
+
+    Retorna uma tupla (texto processado, erro), onde apenas um dos dois é diferente de None, para que um
+    PDF corrompido não interrompa o carregamento dos demais.
+    """
+    try:
+        classifier = PDFClassifier(text_cache=text_cache)
+        return classifier.preprocess_text(classifier.extract_text_from_pdf(pdf_path)), None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
+def _extract_pdf_text(pdf_path, text_cache):
+    """
+    Extrai o texto bruto de um PDF em um processo do pool de `extract_texts`.
+
+    Retorna uma tupla (texto, erro), onde apenas um dos dois é diferente de None.
+    """
+    try:
+        return PDFClassifier(text_cache=text_cache).extract_text_from_pdf(pdf_path), None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
+# Pool de processos de `extract_texts`, criado no primeiro uso e compartilhado por todas as requisições do processo,
+# para que uploads simultâneos não criem (e copiem o modelo carregado para) um pool novo cada um
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+def _extraction_executor(max_workers=None):
+    """
+    Retorna o pool de processos de `extract_texts`, criando-o no primeiro uso. O número de processos é o da
+    primeira chamada; o pool é encerrado na saída do interpretador.
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ProcessPoolExecutor(max_workers=max_workers)
+            atexit.register(_extraction_pool.shutdown)
+        return _extraction_pool
+
+def _discard_extraction_executor(executor):
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is executor:
+            _extraction_pool = None
+    executor.shutdown(wait=False)
+
 class PDFClassifier:
     """
     Classe para classificação de documentos PDF utilizando aprendizado de máquina.
 
     Atributos:
     -----------
-    vectorizer : CountVectorizer
-        Vetorizador de texto para converter texto em uma matriz de contagem de tokens.
+    vectorizer : CountVectorizer or HashingVectorizer
+        Vetorizador de texto para converter texto em uma matriz de contagem de tokens. Com o espaço de atributos
+        'hashing', o vetorizador não guarda vocabulário e aceita termos novos nas atualizações incrementais.
     model : MultinomialNB
         Modelo de classificação Naive Bayes Multinomial.
     paths : list
@@ -26,26 +81,69 @@ class PDFClassifier:
         Lista para armazenar os textos processados extraídos dos PDFs.
     labels : list
         Lista para armazenar os rótulos (labels) associados aos PDFs.
+    text_cache : TextCache or None
+        Cache opcional do texto extraído dos PDFs, endereçado pelo hash do conteúdo do arquivo.
+    rules : RuleClassifier or None
+        Estágio opcional de marcadores textuais, consultado antes do modelo em `classify_texts`.
 
     Métodos:
     --------
     extract_text_from_pdf(pdf_path):
-        Extrai o texto de um arquivo PDF especificado.
+        Extrai o texto de um arquivo PDF especificado, consultando o cache de texto, se configurado.
+
+    read_pdf_text(pdf_path):
+        Extrai o texto de um arquivo PDF com o PyPDF2, sem consultar o cache.
+
+    iter_pdf_pages(pdf_path):
+        Extrai o texto de um arquivo PDF página a página, sob demanda.
     
     preprocess_text(text):
         Realiza o pré-processamento do texto extraído (remoção de caracteres especiais, números e conversão para minúsculas).
     
+    extract_texts(pdf_paths, max_workers=None):
+        Extrai em paralelo o texto de vários PDFs, isolando as falhas de cada arquivo.
+
     load_pdfs(path, label):
         Carrega os PDFs de um diretório especificado, extrai e processa o texto, e associa um rótulo (label) a cada PDF.
+
+    load_corpus(folders, max_workers=None):
+        Carrega em paralelo os PDFs de vários diretórios rotulados, isolando as falhas de cada arquivo.
     
-    train_model():
+    train_model(evaluate=True):
         Treina o modelo de classificação utilizando os textos processados dos PDFs.
+
+    train_streaming(folders, chunk_size=256, test_size=0.2, max_workers=None):
+        Treina o modelo lendo o corpus do disco em blocos, sem mantê-lo em memória (requer o espaço 'hashing').
+
+    release_corpus():
+        Libera os caminhos, textos e rótulos do corpus carregado, que não são necessários após o treinamento.
+
+    partial_update(texts, labels):
+        Atualiza o modelo treinado de forma incremental com novos documentos rotulados.
     
     evaluate_model(y_test, y_pred):
         Avalia o modelo utilizando métricas de desempenho como matriz de confusão, acurácia, F1-score e recall.
     
     predict_pdf_type(pdf_path):
         Prediz o tipo de documento PDF (Nota Fiscal, Boleto, Imposto de Renda) baseado no modelo treinado.
+
+    predict_pdf_type_partial(pdf_path, threshold=0.95, max_pages=None, max_chars=None):
+        Prediz o tipo de documento lendo apenas as primeiras páginas necessárias para uma decisão confiável.
+
+    classify_pages(pages, threshold=0.95, max_pages=None, max_chars=None):
+        Classifica um documento consumindo apenas as páginas necessárias de um iterador de páginas.
+
+    predict_text(preprocessed_text):
+        Prediz o tipo de documento e a probabilidade de cada classe a partir de um texto já pré-processado.
+
+    predict_texts(preprocessed_texts):
+        Prediz o tipo e as probabilidades de vários textos pré-processados com uma única vetorização.
+
+    classify_texts(texts, preprocessed_texts=None, record=True):
+        Classifica textos brutos em cascata: marcadores textuais primeiro e o modelo apenas para os demais.
+
+    predict_many(pdf_paths=(), texts=(), max_workers=None):
+        Prediz em lote o tipo de vários PDFs e/ou textos, extraindo os PDFs em paralelo.
     
     tune_hyperparameters():
         Ajusta os hiperparâmetros do modelo para melhorar a performance.
@@ -63,20 +161,69 @@ class PDFClassifier:
         Gera uma visualização gráfica da matriz de confusão.
     """
 
-    def __init__(self):
+    # Rótulos usados no treinamento e os tipos de documento correspondentes
+    LABEL_NAMES = {0: "Boleto", 1: "Nota Fiscal", 2: "Imposto de Renda"}
+    UNKNOWN_LABEL = "Tipo desconhecido"
+
+    def __init__(self, text_cache=None, feature_space='count', n_features=2 ** 18, rules=None):
         """
         Inicializa a classe PDFClassifier com um vetor de contagem de palavras, um modelo Naive Bayes Multinomial
         e listas para armazenar os caminhos, textos processados e rótulos dos PDFs.
+
+        Parâmetros:
+        -----------
+        text_cache : TextCache, opcional
+            Cache do texto extraído dos PDFs. Quando informado, cada documento é lido pelo PyPDF2 uma única vez.
+        feature_space : str
+            'count' para um CountVectorizer com vocabulário fixado no treinamento, ou 'hashing' para um
+            HashingVectorizer sem estado, com `n_features` atributos.
+        n_features : int
+            Número de atributos do espaço 'hashing'.
+        rules : RuleClassifier, opcional
+            Estágio de marcadores textuais que decide os documentos inequívocos sem vetorização.
         """
-        self.vectorizer = CountVectorizer()
+        if feature_space == 'hashing':
+            # Contagens não negativas e sem normalização, como espera o MultinomialNB
+            self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+        elif feature_space == 'count':
+            self.vectorizer = CountVectorizer()
+        else:
+            raise ValueError(f"Espaço de atributos desconhecido: {feature_space}")
         self.model = MultinomialNB()
         self.paths = []
         self.pdf_texts = []
         self.labels = []
+        self.text_cache = text_cache
+        self.rules = rules
+        self._update_lock = threading.Lock()
 
     def extract_text_from_pdf(self, pdf_path):
         """
-        Extrai o texto de um arquivo PDF.
+        Extrai o texto de um arquivo PDF, consultando antes o cache de texto, se configurado.
+
+        Parâmetros:
+        -----------
+        pdf_path : str
+            O caminho completo do arquivo PDF.
+
+        Retorna:
+        --------
+        str
+            O texto extraído do PDF.
+        """
+        if self.text_cache is None:
+            return self.read_pdf_text(pdf_path)
+
+        key = self.text_cache.hash_file(pdf_path)
+        text = self.text_cache.get(key)
+        if text is None:
+            text = self.read_pdf_text(pdf_path)
+            self.text_cache.set(key, text)
+        return text
+
+    def read_pdf_text(self, pdf_path):
+        """
+        Extrai o texto de um arquivo PDF com o PyPDF2, sem consultar o cache.
 
         Parâmetros:
         -----------
@@ -88,13 +235,27 @@ class PDFClassifier:
         str
             O texto extraído do PDF.
         """
+        return "".join(self.iter_pdf_pages(pdf_path))
+
+    def iter_pdf_pages(self, pdf_path):
+        """
+        Extrai o texto de um arquivo PDF página a página, sob demanda.
+
+        Parâmetros:
+        -----------
+        pdf_path : str
+            O caminho completo do arquivo PDF.
+
+        Retorna:
+        --------
+        generator
+            Gerador com o texto de cada página; as páginas seguintes só são lidas se o gerador for consumido.
+        """
         with open(pdf_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
-            text = ""
             for page_num in range(len(reader.pages)):
                 page = reader.pages[page_num]
-                text += page.extract_text()
-        return text
+                yield page.extract_text()
 
     def preprocess_text(self, text):
         """
@@ -122,6 +283,35 @@ class PDFClassifier:
         text = re.sub(r'\s+', ' ', text).strip()
         return text
 
+    def extract_texts(self, pdf_paths, max_workers=None):
+        """
+        Extrai o texto de vários PDFs, em paralelo quando há mais de um arquivo. O pool de processos é criado no
+        primeiro uso e reaproveitado pelas chamadas seguintes do mesmo processo; se um processo do pool morrer, o
+        pool é descartado e os arquivos desta chamada são extraídos sequencialmente.
+
+        Parâmetros:
+        -----------
+        pdf_paths : list
+            Os caminhos completos dos arquivos PDF.
+        max_workers : int, opcional
+            Número de processos do pool (o da primeira chamada). Por padrão, o número de CPUs da máquina; com 1,
+            extrai sequencialmente.
+
+        Retorna:
+        --------
+        list
+            Lista de tuplas (texto, erro) na mesma ordem de `pdf_paths`, onde apenas um dos dois é diferente de None.
+        """
+        if len(pdf_paths) <= 1 or max_workers == 1:
+            return [_extract_pdf_text(pdf_path, self.text_cache) for pdf_path in pdf_paths]
+
+        executor = _extraction_executor(max_workers)
+        try:
+            return list(executor.map(_extract_pdf_text, pdf_paths, [self.text_cache] * len(pdf_paths)))
+        except BrokenProcessPool:
+            _discard_extraction_executor(executor)
+            return [_extract_pdf_text(pdf_path, self.text_cache) for pdf_path in pdf_paths]
+
     def load_pdfs(self, path, label):
         """
         Carrega os arquivos PDF de um diretório especificado, extrai e processa o texto e associa um rótulo (label) a cada PDF.
@@ -137,7 +327,7 @@ class PDFClassifier:
         --------
         None
         """
-        files = os.listdir(path)
+        files = sorted(os.listdir(path))
         for file_name in files:
             pdf_path = os.path.join(path, file_name)
             self.paths.append(pdf_path)
@@ -146,13 +336,65 @@ class PDFClassifier:
             self.pdf_texts.append(preprocessed_text)
             self.labels.append(label)
 
-    def train_model(self):
+    def load_corpus(self, folders, max_workers=None):
+        """
+        Carrega em paralelo, com um pool de processos, os PDFs de vários diretórios rotulados.
+
+        A ordem de `paths`, `pdf_texts` e `labels` é a mesma que chamadas sucessivas a `load_pdfs` produziriam
+        (alfabética em cada diretório, independente do sistema de arquivos), de modo que a divisão treino/teste de
+        `train_model` é a mesma em qualquer máquina com o mesmo corpus. Um PDF que não puder ser lido
+        é ignorado e reportado, sem interromper o carregamento dos demais.
+
+        Parâmetros:
+        -----------
+        folders : dict
+            Dicionário {rótulo: diretório} com os diretórios a carregar, na ordem desejada.
+        max_workers : int, opcional
+            Número de processos do pool. Por padrão, o número de CPUs da máquina.
+
+        Retorna:
+        --------
+        list
+            Lista de tuplas (caminho, erro) com os PDFs que não puderam ser carregados.
+        """
+        pdf_paths = []
+        pdf_labels = []
+        for label, path in folders.items():
+            # Ordem alfabética, como na impressão digital do ModelStore: a ordem de os.listdir depende do sistema de
+            # arquivos, e com ela a divisão treino/teste
+            for file_name in sorted(os.listdir(path)):
+                # Ignora arquivos auxiliares, como os valores reais do corpus sintético
+                if not file_name.lower().endswith('.pdf'):
+                    continue
+                pdf_paths.append(os.path.join(path, file_name))
+                pdf_labels.append(label)
+
+        failures = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # executor.map devolve os resultados na ordem de entrada, independente de qual processo termina antes
+            results = executor.map(_load_pdf_text, pdf_paths, [self.text_cache] * len(pdf_paths), chunksize=8)
+            for pdf_path, label, (preprocessed_text, error) in zip(pdf_paths, pdf_labels, results):
+                if error is not None:
+                    print(f'Falha ao carregar {pdf_path}: {error}')
+                    failures.append((pdf_path, error))
+                    continue
+                self.paths.append(pdf_path)
+                self.pdf_texts.append(preprocessed_text)
+                self.labels.append(label)
+        return failures
+
+    def train_model(self, evaluate=True):
         """
         Treina o modelo de classificação Naive Bayes Multinomial com os textos processados dos PDFs.
 
         A função realiza a vetorização dos textos, divide os dados em conjuntos de treinamento e teste,
         e treina o modelo com o conjunto de treinamento. Após o treinamento, o modelo é avaliado com o conjunto de teste.
 
+        Parâmetros:
+        -----------
+        evaluate : bool
+            Se o modelo deve ser avaliado (métricas, gráfico e registro em `model_performance.json`) após o treinamento.
+
         Retorna:
         --------
         None
@@ -160,11 +402,133 @@ class PDFClassifier:
         X = self.vectorizer.fit_transform(self.pdf_texts)
         X_train, X_test, y_train, y_test = train_test_split(X, self.labels, test_size=0.2, random_state=42)
         self.model.fit(X_train, y_train)
+        if not evaluate:
+            return
         y_pred = self.model.predict(X_test)
         
         # Avaliação do modelo
         self.evaluate_model(y_test, y_pred)
 
+    def train_streaming(self, folders, chunk_size=256, test_size=0.2, max_workers=None):
+        """
+        Treina o modelo lendo o corpus do disco em blocos de `chunk_size` PDFs, com MultinomialNB.partial_fit.
+
+        Apenas um bloco de textos fica em memória por vez e nada é acumulado em `paths`, `pdf_texts` ou `labels`,
+        de modo que a memória usada não cresce com o tamanho do corpus. Por isso é necessário o espaço de
+        atributos 'hashing', que não depende de um vocabulário ajustado sobre o corpus inteiro.
+
+        Os PDFs de teste são escolhidos de forma determinística pelo hash do nome do arquivo e avaliados em uma
+        segunda passagem, após o treinamento. PDFs que não puderem ser lidos são ignorados e reportados.
+
+        Parâmetros:
+        -----------
+        folders : dict
+            Dicionário {rótulo: diretório} com os diretórios do corpus de treinamento.
+        chunk_size : int
+            Número de PDFs lidos e vetorizados por bloco.
+        test_size : float
+            Fração aproximada dos PDFs reservada para a avaliação do modelo.
+        max_workers : int, opcional
+            Número de processos usados na extração do texto de cada bloco.
+
+        Retorna:
+        --------
+        list
+            Lista de tuplas (caminho, erro) com os PDFs que não puderam ser carregados.
+        """
+        if not isinstance(self.vectorizer, HashingVectorizer):
+            raise ValueError("O treinamento em blocos requer o espaço de atributos 'hashing'.")
+
+        def is_test(pdf_path):
+            return zlib.crc32(os.path.basename(pdf_path).encode('utf-8')) % 100 < test_size * 100
+
+        classes = sorted(self.LABEL_NAMES)
+        failures = []
+        y_test, y_pred = [], []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for train in (True, False):
+                for chunk in self._iter_corpus_chunks(folders, chunk_size, lambda path: is_test(path) != train):
+                    chunk_paths = [pdf_path for pdf_path, _ in chunk]
+                    results = executor.map(_load_pdf_text, chunk_paths, [self.text_cache] * len(chunk_paths))
+                    texts, chunk_labels = [], []
+                    for (pdf_path, label), (preprocessed_text, error) in zip(chunk, results):
+                        if error is not None:
+                            print(f'Falha ao carregar {pdf_path}: {error}')
+                            failures.append((pdf_path, error))
+                            continue
+                        texts.append(preprocessed_text)
+                        chunk_labels.append(label)
+                    if not texts:
+                        continue
+
+                    X = self.vectorizer.transform(texts)
+                    if train:
+                        self.model.partial_fit(X, chunk_labels, classes=classes)
+                    else:
+                        y_test.extend(chunk_labels)
+                        y_pred.extend(self.model.predict(X).tolist())
+
+        # Avaliação do modelo
+        if y_test:
+            self.evaluate_model(y_test, y_pred)
+        return failures
+
+    def _iter_corpus_chunks(self, folders, chunk_size, selected):
+        chunk = []
+        for label, path in folders.items():
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith('.pdf') or not selected(entry.path):
+                    continue
+                chunk.append((entry.path, label))
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def release_corpus(self):
+        """
+        Libera os caminhos, textos e rótulos do corpus carregado, que não são necessários após o treinamento.
+
+        Retorna:
+        --------
+        None
+        """
+        self.paths = []
+        self.pdf_texts = []
+        self.labels = []
+
+    def partial_update(self, texts, labels):
+        """
+        Atualiza o modelo treinado de forma incremental (MultinomialNB.partial_fit) com novos documentos rotulados,
+        sem reler o corpus de treinamento.
+
+        Com o espaço de atributos 'count' o vocabulário do treinamento é mantido e termos novos são ignorados;
+        com o espaço 'hashing' todos os termos contribuem.
+
+        A atualização é feita em uma cópia do modelo, que substitui `model` de uma só vez: as predições feitas ao
+        mesmo tempo (fila de ingestão, uploads) usam o modelo anterior ou o atualizado, nunca um modelo com os
+        contadores parcialmente atualizados. Atualizações simultâneas são feitas uma de cada vez.
+
+        Parâmetros:
+        -----------
+        texts : list
+            Os textos brutos dos novos documentos.
+        labels : list
+            Os rótulos dos novos documentos (0: Boleto, 1: Nota Fiscal, 2: Imposto de Renda).
+
+        Retorna:
+        --------
+        None
+        """
+        X = self.vectorizer.transform([self.preprocess_text(text) for text in texts])
+        with self._update_lock:
+            model = copy.deepcopy(self.model)
+            model.partial_fit(X, labels, classes=sorted(self.LABEL_NAMES))
+            self.model = model
+
     def evaluate_model(self, y_test, y_pred):
         """
         Avalia o modelo de classificação utilizando métricas como matriz de confusão, acurácia, F1-score e recall.
@@ -206,18 +570,207 @@ class PDFClassifier:
             O tipo de documento predito ("Nota Fiscal", "Boleto", "Imposto de Renda", ou "Tipo desconhecido").
         """
         text = self.extract_text_from_pdf(pdf_path)
-        preprocessed_text = self.preprocess_text(text)
-        vectorized_text = self.vectorizer.transform([preprocessed_text])
-        prediction = self.model.predict(vectorized_text)[0]
-        
-        if prediction == 1:
-            return "Nota Fiscal"
-        elif prediction == 0:
-            return "Boleto"
-        elif prediction == 2:
-            return "Imposto de Renda"
-        else:
-            return "Tipo desconhecido"
+        prediction, _ = self.classify_texts([text])[0]
+        return prediction
+
+    def predict_pdf_type_partial(self, pdf_path, threshold=0.95, max_pages=None, max_chars=None):
+        """
+        Prediz o tipo de documento PDF lendo as páginas sob demanda e parando assim que a probabilidade da classe
+        mais provável atingir `threshold` (ou os marcadores do estágio de regras decidirem), ou ao atingir
+        `max_pages` páginas ou `max_chars` caracteres.
+
+        Se o texto completo do PDF já estiver no cache de texto, ele é usado (limitado a `max_chars`) sem ler o PDF.
+
+        Parâmetros:
+        -----------
+        pdf_path : str
+            O caminho completo do arquivo PDF a ser classificado.
+        threshold : float
+            Probabilidade mínima da classe mais provável para encerrar a leitura.
+        max_pages : int, opcional
+            Número máximo de páginas lidas.
+        max_chars : int, opcional
+            Número máximo de caracteres considerados.
+
+        Retorna:
+        --------
+        tuple
+            O tipo de documento predito, o dicionário {tipo de documento: probabilidade} e o número de páginas
+            lidas (0 quando o texto veio do cache).
+        """
+        if self.text_cache is not None:
+            text = self.text_cache.get(self.text_cache.hash_file(pdf_path))
+            if text is not None:
+                prediction, probabilities = self.classify_texts([text[:max_chars]])[0]
+                return prediction, probabilities, 0
+
+        pages = self.iter_pdf_pages(pdf_path)
+        try:
+            return self.classify_pages(pages, threshold, max_pages, max_chars)
+        finally:
+            # Fecha o arquivo mesmo quando a leitura é interrompida antes da última página
+            pages.close()
+
+    def classify_pages(self, pages, threshold=0.95, max_pages=None, max_chars=None):
+        """
+        Classifica um documento a partir do texto de suas páginas, consumindo do iterador apenas as páginas
+        necessárias: a leitura para quando a probabilidade da classe mais provável atinge `threshold` (ou os
+        marcadores do estágio de regras decidem), ou ao atingir `max_pages` páginas ou `max_chars` caracteres.
+        As páginas restantes continuam disponíveis no iterador.
+
+        As classificações intermediárias não entram nas estatísticas do estágio de marcadores; apenas a decisão
+        final é registrada, uma vez por documento.
+
+        Parâmetros:
+        -----------
+        pages : iterator
+            O texto de cada página do documento, como em `iter_pdf_pages`.
+        threshold : float
+            Probabilidade mínima da classe mais provável para encerrar a leitura.
+        max_pages : int, opcional
+            Número máximo de páginas lidas.
+        max_chars : int, opcional
+            Número máximo de caracteres considerados.
+
+        Retorna:
+        --------
+        tuple
+            O tipo de documento predito, o dicionário {tipo de documento: probabilidade} e o número de páginas
+            lidas.
+        """
+        text = ""
+        prediction, probabilities, pages_read = self.UNKNOWN_LABEL, {}, 0
+        for page_text in pages:
+            pages_read += 1
+            text = (text + page_text)[:max_chars]
+            prediction, probabilities = self.classify_texts([text], record=False)[0]
+            if max(probabilities.values()) >= threshold:
+                break
+            if max_pages is not None and pages_read >= max_pages:
+                break
+            if max_chars is not None and len(text) >= max_chars:
+                break
+        if self.rules is not None and pages_read:
+            # Registra a decisão final: pelos marcadores do texto lido ou pelo modelo
+            if self.rules.classify(text) is None:
+                self.rules.record_model()
+        return prediction, probabilities, pages_read
+
+    def predict_text(self, preprocessed_text):
+        """
+        Prediz o tipo de documento a partir de um texto já pré-processado, junto com a probabilidade de cada classe.
+
+        Parâmetros:
+        -----------
+        preprocessed_text : str
+            O texto do documento, já processado por `preprocess_text`.
+
+        Retorna:
+        --------
+        tuple
+            O tipo de documento predito ("Nota Fiscal", "Boleto", "Imposto de Renda", ou "Tipo desconhecido")
+            e um dicionário {tipo de documento: probabilidade}.
+        """
+        return self.predict_texts([preprocessed_text])[0]
+
+    def predict_texts(self, preprocessed_texts):
+        """
+        Prediz o tipo de vários documentos com uma única vetorização (matriz esparsa) e uma única chamada ao modelo.
+
+        Parâmetros:
+        -----------
+        preprocessed_texts : list
+            Os textos dos documentos, já processados por `preprocess_text`.
+
+        Retorna:
+        --------
+        list
+            Lista de tuplas (tipo de documento, {tipo de documento: probabilidade}), na ordem dos textos.
+        """
+        if not preprocessed_texts:
+            return []
+
+        # Uma única referência ao modelo, que pode ser substituído por `partial_update` durante a predição
+        model = self.model
+        vectorized_texts = self.vectorizer.transform(preprocessed_texts)
+        probabilities = model.predict_proba(vectorized_texts)
+        label_names = [self.LABEL_NAMES.get(label, self.UNKNOWN_LABEL) for label in model.classes_]
+
+        predictions = []
+        for row, best in zip(probabilities, probabilities.argmax(axis=1)):
+            predictions.append((label_names[best], dict(zip(label_names, row.tolist()))))
+        return predictions
+
+    def classify_texts(self, texts, preprocessed_texts=None, record=True):
+        """
+        Classifica textos brutos em cascata. Se houver um estágio de marcadores (`rules`), os documentos com
+        marcadores inequívocos são decididos por ele, com probabilidade 1.0; apenas os demais são pré-processados,
+        vetorizados e classificados pelo modelo, em lote.
+
+        Parâmetros:
+        -----------
+        texts : list
+            Os textos brutos extraídos dos PDFs.
+        preprocessed_texts : list, opcional
+            Os mesmos textos já pré-processados, para evitar processá-los novamente.
+        record : bool
+            Se as decisões entram nas estatísticas do estágio de marcadores (`rules.stats`).
+
+        Retorna:
+        --------
+        list
+            Lista de tuplas (tipo de documento, {tipo de documento: probabilidade}), na ordem dos textos.
+        """
+        predictions = [None] * len(texts)
+        if self.rules is not None:
+            for i, text in enumerate(texts):
+                label = self.rules.classify(text, record=record)
+                if label is not None:
+                    predictions[i] = (self.LABEL_NAMES[label], {
+                        name: float(other == label) for other, name in self.LABEL_NAMES.items()
+                    })
+
+        pending = [i for i, prediction in enumerate(predictions) if prediction is None]
+        if self.rules is not None and record:
+            self.rules.record_model(len(pending))
+        batch = self.predict_texts([
+            preprocessed_texts[i] if preprocessed_texts is not None else self.preprocess_text(texts[i])
+            for i in pending
+        ])
+        for i, prediction in zip(pending, batch):
+            predictions[i] = prediction
+        return predictions
+
+    def predict_many(self, pdf_paths=(), texts=(), max_workers=None):
+        """
+        Prediz em lote o tipo de vários documentos, informados por caminho de arquivo e/ou pelo texto bruto.
+
+        Os PDFs têm o texto extraído em paralelo; todos os textos são então vetorizados e classificados de uma
+        só vez, passando antes pelo estágio de marcadores, se houver. Documentos cujo texto não pôde ser
+        extraído (inclusive caminhos inexistentes) recebem "Tipo desconhecido" e probabilidades vazias.
+
+        Parâmetros:
+        -----------
+        pdf_paths : list
+            Caminhos de arquivos PDF.
+        texts : list
+            Textos brutos de documentos.
+        max_workers : int, opcional
+            Número de processos usados na extração do texto dos PDFs.
+
+        Retorna:
+        --------
+        list
+            Lista de tuplas (tipo de documento, {tipo de documento: probabilidade}): primeiro as dos PDFs, na
+            ordem de `pdf_paths`, e depois as dos textos, na ordem de `texts`.
+        """
+        all_texts = [text for text, _ in self.extract_texts(list(pdf_paths), max_workers)] + list(texts)
+        valid_indexes = [i for i, text in enumerate(all_texts) if text is not None]
+        predictions = [(self.UNKNOWN_LABEL, {})] * len(all_texts)
+        batch = self.classify_texts([all_texts[i] for i in valid_indexes])
+        for i, prediction in zip(valid_indexes, batch):
+            predictions[i] = prediction
+        return predictions
 
     def tune_hyperparameters(self):
         """
@@ -276,9 +829,12 @@ class PDFClassifier:
         None
         """
         with open(model_path, 'rb') as model_file:
-            self.model = pickle.load(model_file)
+            model = pickle.load(model_file)
         with open(vectorizer_path, 'rb') as vectorizer_file:
-            self.vectorizer = pickle.load(vectorizer_file)
+            vectorizer = pickle.load(vectorizer_file)
+        # Substitui os dois de uma só vez, sem intercalar com uma atualização incremental
+        with self._update_lock:
+            self.vectorizer, self.model = vectorizer, model
 
     def log_performance(self, log_path='model_performance.json', accuracy=None, f1=None, recall=None):
         """
@@ -0,0 +1,246 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Cache de respostas renderizadas, com expiração (TTL): um LRU em memória, por processo, e opcionalmente um
+    armazenamento em disco compartilhado entre os processos da mesma máquina.
+
+    As chaves começam pelo nome da rota ('<endpoint>|...'), de modo que as entradas de uma rota podem ser
+    invalidadas juntas. No disco, cada entrada é um arquivo `<endpoint>--<sha256 da chave>.cache` cuja data de
+    modificação é a sua expiração; a cada gravação, as entradas expiradas são removidas, e as que expiram
+    primeiro também, enquanto o armazenamento tiver mais de `max_entries` entradas. Uma invalidação também
+    atualiza o arquivo `.generation`, e cada processo descarta o seu LRU em memória quando percebe que ele
+    mudou, para não continuar servindo uma entrada invalidada por outro processo.
+
+    As entradas de cada versão (por exemplo, dos templates e arquivos estáticos publicados) ficam em um
+    subdiretório próprio do armazenamento: os processos da mesma versão compartilham as entradas, e os
+    subdiretórios de outras versões são removidos na inicialização.
+
+    Atributos:
+    -----------
+    max_entries : int
+        Número máximo de entradas no LRU em memória e no armazenamento em disco.
+    default_ttl : int
+        Tempo de vida padrão das entradas, em segundos.
+    store_path : str or None
+        Diretório das entradas desta versão no armazenamento compartilhado, ou None para usar apenas a memória.
+
+    Métodos:
+    --------
+    get(key):
+        Retorna o valor armazenado para a chave, ou None se não existir ou tiver expirado.
+
+    set(key, value, ttl=None):
+        Armazena o valor para a chave.
+
+    invalidate(*endpoints):
+        Remove as entradas das rotas informadas (ou todas, se nenhuma for informada).
+
+    clear():
+        Remove todas as entradas.
+    """
+
+    GENERATION = '.generation'
+
+    def __init__(self, max_entries=256, default_ttl=300, store_path=None, version='default'):
+        """
+        Inicializa o cache de respostas.
+
+        Parâmetros:
+        -----------
+        max_entries : int
+            Número máximo de entradas no LRU em memória e no armazenamento em disco.
+        default_ttl : int
+            Tempo de vida padrão das entradas, em segundos.
+        store_path : str, opcional
+            Diretório do armazenamento compartilhado entre processos.
+        version : str
+            A versão das respostas armazenadas; as entradas de outras versões no armazenamento são removidas.
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.store_path = os.path.join(store_path, version) if store_path else None
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        if store_path:
+            os.makedirs(self.store_path, exist_ok=True)
+            with os.scandir(store_path) as it:
+                for entry in it:
+                    if entry.is_dir() and entry.name != version:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+            self._generation = self._read_generation()
+
+    def get(self, key):
+        """
+        Retorna o valor armazenado para a chave e o marca como usado recentemente.
+
+        Parâmetros:
+        -----------
+        key : str
+            A chave da entrada ('<endpoint>|...').
+
+        Retorna:
+        --------
+        object or None
+            O valor armazenado, ou None se a entrada não existir ou tiver expirado.
+        """
+        now = time.time()
+        with self._lock:
+            self._check_generation()
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return entry[1]
+                del self._memory[key]
+        if not self.store_path:
+            return None
+
+        try:
+            with open(self._entry_path(key), 'rb') as file:
+                expires_at, stored_key, value = pickle.load(file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        if stored_key != key or expires_at <= now:
+            return None
+        with self._lock:
+            self._remember(key, expires_at, value)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Armazena o valor para a chave, na memória e, se configurado, no disco.
+
+        Parâmetros:
+        -----------
+        key : str
+            A chave da entrada ('<endpoint>|...').
+        value : object
+            O valor a armazenar (serializável com pickle, se houver armazenamento em disco).
+        ttl : int, opcional
+            Tempo de vida da entrada, em segundos. Por padrão, `default_ttl`.
+
+        Retorna:
+        --------
+        None
+        """
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, expires_at, value)
+        if not self.store_path:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.store_path, prefix='.tmp-')
+        except OSError:
+            # Diretório removido pela inicialização de outra versão: a entrada fica apenas na memória
+            return
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump((expires_at, key, value), file)
+            os.utime(tmp_path, (expires_at, expires_at))
+            os.replace(tmp_path, self._entry_path(key))
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            return
+        self._prune()
+
+    def _prune(self):
+        # Remove as entradas expiradas e, acima do limite, as que expiram primeiro (a data de modificação de
+        # cada entrada é a sua expiração)
+        now = time.time()
+        entries = []
+        try:
+            with os.scandir(self.store_path) as it:
+                for entry in it:
+                    if not entry.name.endswith('.cache'):
+                        continue
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            return
+        entries.sort()
+        excess = len(entries) - self.max_entries
+        for index, (expires_at, entry_path) in enumerate(entries):
+            if expires_at > now and index >= excess:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+
+    def invalidate(self, *endpoints):
+        """
+        Remove as entradas das rotas informadas, em todos os processos que compartilham o armazenamento.
+
+        Parâmetros:
+        -----------
+        endpoints : str
+            Os nomes das rotas (endpoints do Flask). Sem nenhum, remove todas as entradas.
+
+        Retorna:
+        --------
+        None
+        """
+        with self._lock:
+            for key in list(self._memory):
+                if not endpoints or key.split('|', 1)[0] in endpoints:
+                    del self._memory[key]
+        if not self.store_path:
+            return
+        prefixes = tuple(f'{endpoint}--' for endpoint in endpoints)
+        try:
+            with os.scandir(self.store_path) as it:
+                for entry in it:
+                    if entry.name.endswith('.cache') and (not prefixes or entry.name.startswith(prefixes)):
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            pass
+            with open(os.path.join(self.store_path, self.GENERATION), 'w') as file:
+                file.write(str(time.time_ns()))
+        except FileNotFoundError:
+            # Diretório removido pela inicialização de outra versão: não há entradas a invalidar
+            return
+        with self._lock:
+            self._generation = self._read_generation()
+
+    def clear(self):
+        self.invalidate()
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_generation(self):
+        try:
+            return os.stat(os.path.join(self.store_path, self.GENERATION)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _check_generation(self):
+        # Outro processo invalidou entradas: as cópias em memória deste processo podem estar desatualizadas
+        if self.store_path:
+            generation = self._read_generation()
+            if generation != self._generation:
+                self._memory.clear()
+                self._generation = generation
+
+    def _entry_path(self, key):
+        endpoint = key.split('|', 1)[0]
+        return os.path.join(self.store_path, f"{endpoint}--{hashlib.sha256(key.encode('utf-8')).hexdigest()}.cache")
@@ -0,0 +1,112 @@
+import re
+import threading
+
+
+class RuleClassifier:
+    """
+    Classe para classificação rápida de documentos por marcadores textuais característicos de cada tipo.
+
+    É o primeiro estágio da cascata de classificação do PDFClassifier: quando os marcadores de exatamente um tipo
+    de documento aparecem no texto, a decisão é tomada sem vetorização; quando nenhum ou mais de um tipo é
+    encontrado, o documento segue para o modelo Naive Bayes. As expressões são compiladas uma única vez.
+
+    Atributos:
+    -----------
+    rules : dict
+        Dicionário {rótulo: [expressões compiladas]} com os marcadores de cada tipo de documento.
+    stats : dict
+        Contadores de decisões da cascata: 'rules' (decididos pelos marcadores), 'model' (encaminhados ao modelo)
+        e 'ambiguous' (com marcadores de mais de um tipo, também encaminhados ao modelo).
+
+    Métodos:
+    --------
+    classify(text, record=True):
+        Retorna o rótulo do documento se os marcadores forem inequívocos, ou None.
+
+    record_model(count=1):
+        Registra documentos que foram decididos pelo modelo.
+
+    hit_rates():
+        Retorna a fração dos documentos decidida por cada estágio da cascata.
+    """
+
+    # Rótulo -> marcadores (0: Boleto, 1: Nota Fiscal, 2: Imposto de Renda)
+    MARKERS = {
+        0: [r'Linha digit[aá]vel', r'Nosso N[uú]mero'],
+        1: [r'NFe No \d+', r'Chave de\s*Acesso\s*\d{44}'],
+        2: [r'Extrato do Imposto de Renda'],
+    }
+
+    def __init__(self, markers=None):
+        """
+        Inicializa o RuleClassifier compilando os marcadores de cada tipo de documento.
+
+        Parâmetros:
+        -----------
+        markers : dict, opcional
+            Dicionário {rótulo: [expressões regulares]}. Por padrão, `RuleClassifier.MARKERS`.
+        """
+        self.rules = {
+            label: [re.compile(pattern) for pattern in patterns]
+            for label, patterns in (markers or self.MARKERS).items()
+        }
+        self.stats = {'rules': 0, 'ambiguous': 0, 'model': 0}
+        self._lock = threading.Lock()
+
+    def classify(self, text, record=True):
+        """
+        Procura os marcadores de cada tipo de documento no texto bruto.
+
+        Parâmetros:
+        -----------
+        text : str
+            O texto extraído do PDF, antes do pré-processamento.
+        record : bool
+            Se a decisão entra em `stats`. Decisões intermediárias (por exemplo, a cada página lida na
+            classificação parcial) não devem ser contadas.
+
+        Retorna:
+        --------
+        int or None
+            O rótulo do documento, se apenas os marcadores de um tipo foram encontrados, ou None.
+        """
+        matched = [label for label, patterns in self.rules.items() if any(p.search(text) for p in patterns)]
+        if not record:
+            return matched[0] if len(matched) == 1 else None
+        with self._lock:
+            if len(matched) == 1:
+                self.stats['rules'] += 1
+                return matched[0]
+            if matched:
+                self.stats['ambiguous'] += 1
+        return None
+
+    def record_model(self, count=1):
+        """
+        Registra documentos que não foram decididos pelos marcadores e seguiram para o modelo.
+
+        Parâmetros:
+        -----------
+        count : int
+            Número de documentos decididos pelo modelo.
+
+        Retorna:
+        --------
+        None
+        """
+        with self._lock:
+            self.stats['model'] += count
+
+    def hit_rates(self):
+        """
+        Retorna a fração dos documentos classificados decidida por cada estágio da cascata.
+
+        Retorna:
+        --------
+        dict
+            Dicionário {'rules': fração, 'model': fração, 'ambiguous': fração}; frações zeradas se nenhum
+            documento foi classificado.
+        """
+        with self._lock:
+            total = self.stats['rules'] + self.stats['model']
+            return {stage: (count / total if total else 0.0) for stage, count in self.stats.items()}
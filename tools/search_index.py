@@ -0,0 +1,144 @@
+import unicodedata
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+
+class SearchIndex:
+    """
+    Classe que converte os dados extraídos de um documento nas entradas do índice de busca (tbFileSearch).
+
+    Apenas os campos marcados com `search` na especificação de cada template são indexados, um registro por
+    campo preenchido: textos ('exact' e 'prefix') em ValueText, normalizados sem acentos, em maiúsculas e sem
+    pontuação (de modo que "12.345.678/0001-95" e "12345678000195" coincidem), e valores e datas ('range') em
+    ValueNumber e ValueDate. As entradas são geradas na extração, junto com o FileData, para que a busca seja
+    uma consulta por índice em (TemplateID, FieldName, valor) em vez de uma varredura do JSON de tbFileData.
+
+    Atributos:
+    -----------
+    fields : dict
+        Para cada TemplateID, um dicionário {nome do campo: (caminho, campo)} dos campos indexados.
+
+    Métodos:
+    --------
+    entries(template_id, information):
+        Retorna as entradas do índice dos dados extraídos de um documento.
+
+    field(template_id, name):
+        Retorna o campo indexado de um template, ou None.
+
+    query_value(field, text):
+        Converte o valor informado na busca para o formato armazenado no índice.
+    """
+
+    MAX_TEXT_LENGTH = 255
+    # Limite de DECIMAL(15, 2)
+    MAX_NUMBER = Decimal(10) ** 13
+    DATE_FORMATS = {'date': ['%d/%m/%Y'], 'datetime': ['%d/%m/%Y %H:%M:%S', '%d/%m/%Y']}
+    QUERY_DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%Y-%m-%dT%H:%M', '%d/%m/%Y %H:%M:%S']
+
+    def __init__(self, fields_by_template):
+        """
+        Inicializa o índice a partir dos campos de cada template.
+
+        Parâmetros:
+        -----------
+        fields_by_template : dict
+            Para cada TemplateID, a lista de tuplas (caminho, campo), como em `FieldSpecEngine.fields`.
+        """
+        self.fields = {
+            template_id: {'/'.join(path): (path, field) for path, field in fields if field.search}
+            for template_id, fields in fields_by_template.items()
+        }
+
+    def field(self, template_id, name):
+        path_field = self.fields.get(template_id, {}).get(name)
+        return path_field[1] if path_field else None
+
+    def entries(self, template_id, information):
+        """
+        Retorna as entradas do índice dos dados extraídos de um documento.
+
+        Parâmetros:
+        -----------
+        template_id : int
+            O TemplateID do documento.
+        information : dict
+            Os dados extraídos, no formato da especificação do template.
+
+        Retorna:
+        --------
+        list
+            Dicionários com TemplateID, FieldName e ValueText, ValueNumber ou ValueDate, um por campo indexado
+            preenchido. Falta apenas o FileID, acrescentado por quem grava as entradas.
+        """
+        entries = []
+        for name, (path, field) in self.fields.get(template_id, {}).items():
+            value = information
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+            column, indexed = self._index_value(field, value)
+            if indexed is not None:
+                entries.append({'TemplateID': template_id, 'FieldName': name, column: indexed})
+        return entries
+
+    def _index_value(self, field, value):
+        if not isinstance(value, str) or not value:
+            return None, None
+        if field.search != 'range':
+            return 'ValueText', self.normalize_text(value)[:self.MAX_TEXT_LENGTH] or None
+        if field.kind == 'decimal':
+            return 'ValueNumber', self._parse_number(value)
+        for date_format in self.DATE_FORMATS.get(field.kind, []):
+            try:
+                return 'ValueDate', datetime.strptime(value.strip(), date_format)
+            except ValueError:
+                continue
+        return None, None
+
+    def _parse_number(self, value):
+        try:
+            number = Decimal(value)
+        except InvalidOperation:
+            return None
+        return number if number.is_finite() and abs(number) < self.MAX_NUMBER else None
+
+    def query_value(self, field, text):
+        """
+        Converte o valor informado na busca para o formato armazenado no índice.
+
+        Parâmetros:
+        -----------
+        field : Field
+            O campo buscado.
+        text : str
+            O valor informado: um texto, um número (1234.56 ou 1.234,56) ou uma data (AAAA-MM-DD ou DD/MM/AAAA).
+
+        Retorna:
+        --------
+        str, Decimal, datetime or None
+            O valor normalizado, ou None se o valor não for válido para o campo.
+        """
+        text = (text or '').strip()
+        if not text:
+            return None
+        if field.search != 'range':
+            return self.normalize_text(text) or None
+        if field.kind == 'decimal':
+            if ',' in text:
+                text = text.replace('.', '').replace(',', '.')
+            return self._parse_number(text)
+        for date_format in self.QUERY_DATE_FORMATS:
+            try:
+                return datetime.strptime(text, date_format)
+            except ValueError:
+                continue
+        return None
+
+    @staticmethod
+    def normalize_text(value):
+        """
+        Normaliza um texto para o índice: sem acentos, em maiúsculas, sem pontuação e com espaços simples.
+        """
+        text = unicodedata.normalize('NFKD', value)
+        text = ''.join(char for char in text.upper() if char.isalnum() or char.isspace())
+        return ' '.join(text.split())
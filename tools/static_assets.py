@@ -0,0 +1,185 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+
+class StaticAssets:
+    """
+    Classe que gera as versões publicadas dos arquivos estáticos (CSS e JS): minificadas, com o hash do conteúdo
+    no nome e pré-comprimidas em gzip (e em brotli, se o pacote estiver instalado).
+
+    Como o nome de cada versão muda sempre que o conteúdo muda, os arquivos podem ser servidos com cache de
+    longa duração, e a compressão é feita uma única vez na geração, não a cada requisição. O manifesto
+    (manifest.json) relaciona o nome original de cada arquivo ao nome da sua versão publicada.
+
+    Atributos:
+    -----------
+    source_folder : str
+        O diretório dos arquivos estáticos originais.
+    build_folder : str
+        O diretório onde as versões publicadas são gravadas.
+    manifest : dict
+        Para cada arquivo original, o nome da sua versão publicada.
+
+    Métodos:
+    --------
+    build():
+        Gera as versões publicadas que ainda não existem e atualiza o manifesto.
+
+    resolve(filename):
+        Retorna o nome da versão publicada de um arquivo, ou None.
+
+    variant(filename, encodings):
+        Escolhe a variante pré-comprimida de uma versão publicada conforme as codificações aceitas.
+    """
+
+    EXTENSIONS = ('.css', '.js')
+    MANIFEST = 'manifest.json'
+    # Sufixo e codificação de cada variante, em ordem de preferência
+    ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+    # Comentários e textos entre aspas do CSS, que não são alterados pela minificação (exceto os comentários
+    # comuns, removidos), e referências a source maps (não publicados)
+    CSS_TOKEN = re.compile(rb'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'', re.DOTALL)
+    SOURCE_MAP = re.compile(rb'\n?(//|/\*)# sourceMappingURL=[^\n]*')
+
+    def __init__(self, source_folder, build_folder, extensions=EXTENSIONS):
+        """
+        Inicializa o gerador de arquivos estáticos.
+
+        Parâmetros:
+        -----------
+        source_folder : str
+            O diretório dos arquivos estáticos originais.
+        build_folder : str
+            O diretório onde as versões publicadas são gravadas (por exemplo, static/dist).
+        extensions : tuple
+            As extensões dos arquivos publicados.
+        """
+        self.source_folder = source_folder
+        self.build_folder = build_folder
+        self.extensions = extensions
+        self.manifest = {}
+
+    def build(self):
+        """
+        Gera as versões publicadas dos arquivos estáticos que ainda não existem, remove as versões antigas e
+        grava o manifesto. Arquivos que não mudaram não são regravados.
+
+        Retorna:
+        --------
+        dict
+            O manifesto {nome original: nome da versão publicada}.
+        """
+        os.makedirs(self.build_folder, exist_ok=True)
+        manifest = {}
+        for filename in sorted(os.listdir(self.source_folder)):
+            base, extension = os.path.splitext(filename)
+            source_path = os.path.join(self.source_folder, filename)
+            if extension not in self.extensions or not os.path.isfile(source_path):
+                continue
+            with open(source_path, 'rb') as file:
+                content = self.minify(extension, file.read())
+            built = f'{base}.{hashlib.sha256(content).hexdigest()[:12]}{extension}'
+            if not os.path.exists(os.path.join(self.build_folder, built)):
+                self._write(built, content)
+                self._write(built + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    self._write(built + '.br', brotli.compress(content))
+            manifest[filename] = built
+
+        current = set(manifest.values())
+        for filename in os.listdir(self.build_folder):
+            built = filename
+            for _, suffix in self.ENCODINGS:
+                built = built[:-len(suffix)] if built.endswith(suffix) else built
+            if filename != self.MANIFEST and not filename.endswith('.tmp') and built not in current:
+                try:
+                    os.remove(os.path.join(self.build_folder, filename))
+                except FileNotFoundError:
+                    # Removido por outro processo que gerou os arquivos ao mesmo tempo
+                    pass
+        self._write(self.MANIFEST, json.dumps(manifest, indent=2).encode('utf-8'))
+        self.manifest = manifest
+        return manifest
+
+    def _write(self, filename, content):
+        # Grava em um arquivo temporário e renomeia, para que outro processo nunca leia um arquivo incompleto
+        path = os.path.join(self.build_folder, filename)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+
+    def minify(self, extension, content):
+        """
+        Minifica o conteúdo de um arquivo CSS (comentários e espaços) ou JS (com o rjsmin, se instalado).
+
+        Parâmetros:
+        -----------
+        extension : str
+            A extensão do arquivo ('.css' ou '.js').
+        content : bytes
+            O conteúdo original.
+
+        Retorna:
+        --------
+        bytes
+            O conteúdo minificado.
+        """
+        content = self.SOURCE_MAP.sub(b'', content)
+        if extension == '.css':
+            parts = []
+            position = 0
+            for match in self.CSS_TOKEN.finditer(content):
+                parts.append(self._squeeze_css(content[position:match.start()]))
+                token = match.group(0)
+                if not token.startswith(b'/*') or token.startswith(b'/*!'):
+                    parts.append(token)
+                position = match.end()
+            parts.append(self._squeeze_css(content[position:]))
+            return b''.join(parts).strip()
+        if extension == '.js' and rjsmin is not None:
+            return rjsmin.jsmin(content, keep_bang_comments=True)
+        return content
+
+    @staticmethod
+    def _squeeze_css(content):
+        content = re.sub(rb'\s+', b' ', content)
+        content = re.sub(rb' ?([{};,>]) ?', rb'\1', content)
+        return content.replace(b';}', b'}')
+
+    def resolve(self, filename):
+        return self.manifest.get(filename)
+
+    def variant(self, filename, encodings):
+        """
+        Escolhe a variante de uma versão publicada a ser enviada.
+
+        Parâmetros:
+        -----------
+        filename : str
+            O nome da versão publicada.
+        encodings : list
+            As codificações aceitas pelo cliente (cabeçalho Accept-Encoding).
+
+        Retorna:
+        --------
+        tuple
+            O nome do arquivo a enviar e a sua codificação (ou None, para o arquivo sem compressão).
+        """
+        for encoding, suffix in self.ENCODINGS:
+            if encoding in encodings and os.path.exists(os.path.join(self.build_folder, filename + suffix)):
+                return filename + suffix, encoding
+        return filename, None
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import tempfile
+
+
+class TextCache:
+    """
+    Cache em disco para o texto extraído de documentos PDF, endereçado pelo hash do conteúdo do arquivo.
+
+    Cada entrada é um arquivo `<sha256>.txt` no diretório do cache. A data de modificação da entrada é
+    atualizada a cada acesso, e quando o tamanho total ultrapassa o limite as entradas acessadas há mais
+    tempo são removidas (LRU) até liberar 10% do limite. Como o cache vive em disco, ele é compartilhado
+    entre reinicializações e entre os processos que usam o mesmo diretório.
+
+    Atributos:
+    -----------
+    cache_path : str
+        Diretório onde as entradas do cache são armazenadas.
+    max_bytes : int
+        Tamanho máximo, em bytes, ocupado pelas entradas do cache.
+
+    Métodos:
+    --------
+    hash_file(file_path):
+        Calcula o hash SHA-256 do conteúdo de um arquivo.
+
+    get(key):
+        Retorna o texto armazenado para a chave, ou None se não existir.
+
+    set(key, text):
+        Armazena o texto para a chave, removendo as entradas mais antigas se necessário.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_path, max_bytes=256 * 1024 * 1024):
+        """
+        Inicializa o cache de texto.
+
+        Parâmetros:
+        -----------
+        cache_path : str
+            Diretório onde as entradas do cache são armazenadas.
+        max_bytes : int
+            Tamanho máximo, em bytes, ocupado pelas entradas do cache.
+        """
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+        self._size = None
+
+    def hash_file(self, file_path):
+        """
+        Calcula o hash SHA-256 do conteúdo de um arquivo, lendo-o em blocos.
+
+        Parâmetros:
+        -----------
+        file_path : str
+            O caminho do arquivo.
+
+        Retorna:
+        --------
+        str
+            O hash em hexadecimal.
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(self.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Retorna o texto armazenado para a chave e marca a entrada como usada recentemente.
+
+        Parâmetros:
+        -----------
+        key : str
+            O hash do conteúdo do arquivo.
+
+        Retorna:
+        --------
+        str or None
+            O texto armazenado, ou None se a entrada não existir.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'rb') as file:
+                content = file.read()
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        try:
+            return content.decode('utf-8', errors='surrogatepass')
+        except UnicodeDecodeError:
+            return None
+
+    def set(self, key, text):
+        """
+        Armazena o texto para a chave e aplica o limite de tamanho do cache.
+
+        Parâmetros:
+        -----------
+        key : str
+            O hash do conteúdo do arquivo.
+        text : str
+            O texto extraído do arquivo.
+
+        Retorna:
+        --------
+        None
+        """
+        os.makedirs(self.cache_path, exist_ok=True)
+        entry_path = self._entry_path(key)
+        try:
+            previous_size = os.path.getsize(entry_path)
+        except FileNotFoundError:
+            previous_size = 0
+        # Grava os bytes em UTF-8 sem conversão de quebras de linha, para que o texto lido do cache seja idêntico
+        # ao extraído do PDF (inclusive '\r' e caracteres substitutos isolados)
+        content = text.encode('utf-8', errors='surrogatepass')
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_path, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(content)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            # Uma falha na gravação do cache (por exemplo, disco cheio) não impede o uso do texto já extraído
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            return
+
+        if self._size is None:
+            self._size = self._total_size()
+        else:
+            self._size += len(content) - previous_size
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_path, f'{key}.txt')
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.cache_path) as it:
+            for entry in it:
+                if entry.name.endswith('.txt'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _total_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        # Recalcula a partir do disco, pois outros processos também escrevem no cache, e libera até 90% do
+        # limite para não varrer o diretório a cada nova entrada
+        entries = sorted(self._entries())
+        size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, entry_size, entry_path in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        self._size = size
@@ -1,12 +1,20 @@
-from flask import render_template, request, redirect, url_for, flash, send_from_directory, session
+import os
+import hashlib
+import hmac
+import mimetypes
+from functools import lru_cache
+from urllib.parse import quote
+from flask import render_template, request, redirect, url_for, flash, send_from_directory, send_file, session, abort, Response
 from werkzeug.security import check_password_hash
-from app import app, db
+from werkzeug.utils import safe_join
+from app import app, db, metrics, static_assets
 from models import Contact, Employee
-from decorators import login_required, permission_required
+from decorators import login_required, permission_required, cached_response
 from enums import PermissionLevel as pl
 
 # Rota para a página inicial
 @app.route('/')
+@cached_response()
 def home():
     """
     Renderiza a página inicial. Se o usuário estiver logado, renderiza o dashboard.
@@ -17,6 +25,7 @@ def home():
 
 # Rota para a página de serviços
 @app.route('/services')
+@cached_response()
 def services():
     """
     Renderiza a página de serviços.
@@ -25,6 +34,7 @@ def services():
 
 # Rota para a página sobre
 @app.route('/about')
+@cached_response()
 def about():
     """
     Renderiza a página sobre.
@@ -115,5 +125,97 @@ def logout():
 def imagem(nome_arquivo):
     """
     Serve um arquivo do diretório de uploads.
+
+    A resposta tem um ETag forte (hash do conteúdo) e a data de modificação do arquivo, de modo que as
+    revalidações (If-None-Match/If-Modified-Since) recebem 304 sem o conteúdo, e aceita intervalos (Range) para
+    a leitura parcial de arquivos grandes. Com UPLOADS_SENDFILE, o envio do conteúdo é delegado ao proxy da
+    frente (X-Accel-Redirect ou X-Sendfile) e o worker responde apenas os cabeçalhos.
+    """
+    path = safe_join(app.config['UPLOAD_PATH'], nome_arquivo)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    stat = os.stat(path)
+    etag = content_etag(path, stat.st_mtime_ns, stat.st_size)
+    mode = app.config['UPLOADS_SENDFILE']
+    if mode is None:
+        return send_file(path, etag=etag, last_modified=stat.st_mtime, max_age=app.config['UPLOADS_MAX_AGE'],
+                         conditional=True)
+
+    response = Response(mimetype=mimetypes.guess_type(nome_arquivo)[0] or 'application/octet-stream')
+    response.set_etag(etag)
+    response.last_modified = stat.st_mtime
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['UPLOADS_MAX_AGE']
+    response.make_conditional(request)
+    if response.status_code == 304:
+        return response
+    # O proxy envia o conteúdo (e trata os intervalos); o corpo desta resposta é descartado por ele
+    if mode == 'x-accel':
+        response.headers['X-Accel-Redirect'] = app.config['UPLOADS_ACCEL_PREFIX'] + quote(nome_arquivo)
+    else:
+        response.headers['X-Sendfile'] = path
+    return response
+
+@lru_cache(maxsize=1024)
+def content_etag(path, mtime_ns, size):
+    """
+    Retorna o hash do conteúdo de um arquivo, usado como ETag. O resultado fica em cache para cada versão do
+    arquivo (data de modificação e tamanho), então o arquivo só é lido novamente quando muda.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+# Rota para os arquivos estáticos publicados (ver StaticAssets)
+@app.route('/assets/<path:filename>')
+def static_asset(filename):
+    """
+    Serve a versão publicada de um arquivo estático, pré-comprimida conforme o Accept-Encoding do cliente.
+
+    O nome do arquivo contém o hash do seu conteúdo, então a resposta pode ficar em cache indefinidamente.
+    """
+    encodings = [encoding for encoding, _ in static_assets.ENCODINGS if request.accept_encodings[encoding]]
+    variant, encoding = static_assets.variant(filename, encodings)
+    response = send_from_directory(app.config['STATIC_BUILD_FOLDER'], variant,
+                                   mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=app.config['STATIC_ASSETS_MAX_AGE'])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.immutable = True
+    return response
+
+@app.template_global()
+def asset_url(filename):
     """
-    return send_from_directory('uploads', nome_arquivo)
+    Retorna a URL da versão publicada de um arquivo de static/, ou a URL do próprio arquivo se ele não tiver
+    versão publicada.
+    """
+    built = static_assets.resolve(filename)
+    if built is None:
+        return url_for('static', filename=filename)
+    return url_for('static_asset', filename=built)
+
+# Rota para as métricas da aplicação
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Expõe as métricas do pipeline de documentos no formato texto do Prometheus.
+
+    O acesso é restrito aos endereços de METRICS_ALLOWED_IPS e às requisições com o token METRICS_TOKEN
+    ("Authorization: Bearer <token>"), já que os coletores do Prometheus não têm sessão na aplicação.
+
+    As métricas são mantidas em memória por processo (MetricsRegistry): com vários workers, cada resposta traz
+    apenas os valores do worker que a atendeu. Nesse caso, cada worker deve ser coletado separadamente (por
+    exemplo, em portas próprias), e as séries somadas na consulta.
+    """
+    if not app.config['METRICS_ENABLED']:
+        abort(404)
+    token = app.config['METRICS_TOKEN']
+    authorization = request.headers.get('Authorization', '')
+    authorized = bool(token) and hmac.compare_digest(authorization.encode('utf-8'), f'Bearer {token}'.encode('utf-8'))
+    if not authorized and request.remote_addr not in app.config['METRICS_ALLOWED_IPS']:
+        abort(403)
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
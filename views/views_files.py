@@ -1,48 +1,86 @@
 import os
 import json
-import codecs
-from flask import render_template, request, redirect, url_for, flash
+import shutil
+import csv
+import hashlib
+import tempfile
+from flask import render_template, request, redirect, url_for, flash, jsonify
 from werkzeug.utils import secure_filename
-from app import app, db, pdf_classifier
-from models import File, FileData
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, update, func, or_, and_
+from sqlalchemy.orm import selectinload
+from sqlalchemy.exc import SQLAlchemyError
+from app import app, db, pdf_classifier, document_pipeline, training_folders, ingestion_queue, search_index, model_store
+from models import File, FileData, FileSearch
 from decorators import login_required, permission_required
 from enums import PermissionLevel as pl
-from tools.extractors.boleto_extraction import BoletoExtractionStrategy
-from tools.extractors.nota_fiscal_extraction import NotaFiscalExtractionStrategy
-from tools.extractors.imposto_de_renda_extraction import ImpostoDeRendaExtractionStrategy
-import pandas as pd
-from flask import send_file
-from io import BytesIO
+from openpyxl import Workbook
+from flask import send_file, Response, stream_with_context
+from io import StringIO
+from tools.columnar_export import ColumnarExporter
 
 @app.route('/list_files', methods=['GET'])
 @login_required
 @permission_required(pl.EDITOR)
 def list_files():
     """
-    Lista todos os arquivos com dados preparados para exibição.
+    Lista os arquivos com dados preparados para exibição, uma página por vez.
+
+    A paginação é por chave (keyset) sobre (InsertionDate, FileID), do mais recente para o mais antigo: o cursor
+    `after` (ou `before`, para voltar) guarda a chave do último (ou primeiro) arquivo da página exibida, de modo
+    que cada página custa uma consulta limitada pelo índice, independente de quantas páginas vieram antes. Os
+    dados de cada arquivo são carregados em uma única consulta adicional por página.
+
+    Filtros (query string): template_id, status, date_from e date_to (AAAA-MM-DD).
     """
-    # Query para buscar todos os arquivos e seus dados associados
-    files = File.query.all()
-    
+    page_size = app.config['LIST_FILES_PAGE_SIZE']
+    filters = {key: request.args.get(key, '') for key in ('template_id', 'status', 'date_from', 'date_to')}
+
+    conditions = []
+    if filters['template_id'].isdigit():
+        conditions.append(File.TemplateID == int(filters['template_id']))
+    if filters['status']:
+        conditions.append(File.Status == filters['status'])
+    try:
+        if filters['date_from']:
+            conditions.append(File.InsertionDate >= datetime.strptime(filters['date_from'], '%Y-%m-%d'))
+        if filters['date_to']:
+            conditions.append(File.InsertionDate < datetime.strptime(filters['date_to'], '%Y-%m-%d') + timedelta(days=1))
+    except ValueError:
+        flash('Data inválida; use o formato AAAA-MM-DD.', 'warning')
+        return redirect(url_for('list_files'))
+
+    after = parse_cursor(request.args.get('after'))
+    before = parse_cursor(request.args.get('before'))
+    query = File.query.filter(*conditions).options(selectinload(File.file_data))
+    if before:
+        # Voltando: busca em ordem crescente a partir do cursor e inverte a página
+        files = query.filter(keyset_condition(before, newer=True)) \
+            .order_by(File.InsertionDate.asc(), File.FileID.asc()).limit(page_size + 1).all()
+        has_previous, has_next = len(files) > page_size, True
+        files = files[:page_size][::-1]
+    else:
+        if after:
+            query = query.filter(keyset_condition(after, newer=False))
+        files = query.order_by(File.InsertionDate.desc(), File.FileID.desc()).limit(page_size + 1).all()
+        has_previous, has_next = after is not None, len(files) > page_size
+        files = files[:page_size]
+
+    # Contagem apenas sobre tbFiles, sem ordenação nem carregamento dos dados
+    total = db.session.query(func.count(File.FileID)).filter(*conditions).scalar()
+
     # Preparar dados para renderização
     prepared_files = []
     for file in files:
         file_data_list = []
-        for file_data in file.file_data:  # Relacionamento file.file_data
-            try:
-                # Decodificar o campo 'Information' do file_data
-                information = json.loads(file_data.Information)
-                information = decode_unicode_escape(information)
-            except (json.JSONDecodeError, AttributeError):
-                information = {"Erro": "Informação não está no formato JSON."}
-            
-            # Adicionar os dados preparados
+        for file_data in file.file_data:  # Relacionamento file.file_data, já carregado para a página
+            # O campo 'Information' já é um objeto JSON nativo em UTF-8
             file_data_list.append({
                 "DataID": file_data.DataID,
                 "InsertionDate": file_data.InsertionDate,
-                "Information": information
+                "Information": file_data.Information
             })
-        
+
         prepared_files.append({
             "FileID": file.FileID,
             "Status": file.Status,
@@ -51,25 +89,117 @@ def list_files():
             "TemplateID": file.TemplateID,
             "file_data": file_data_list
         })
-    
-    return render_template('list_files.html', files=prepared_files)
-
-def decode_unicode_escape(data):
-    if isinstance(data, dict):
-        return {key: decode_unicode_escape(value) for key, value in data.items()}
-    elif isinstance(data, list):
-        return [decode_unicode_escape(item) for item in data]
-    elif isinstance(data, str):
-        try:
-            # Tenta primeiro decodificar a string como 'utf-8' normal
-            data = data.encode('latin1').decode('utf-8')
-            # Tenta decodificar novamente para capturar todas as sequências de escape
-            data = codecs.decode(data, 'unicode_escape')
-            return data
-        except (UnicodeEncodeError, UnicodeDecodeError):
-            return data
-    else:
-        return data
+
+    active_filters = {key: value for key, value in filters.items() if value}
+    pagination = {
+        'total': total,
+        'previous_url': url_for('list_files', before=format_cursor(files[0]), **active_filters)
+        if has_previous and files else None,
+        'next_url': url_for('list_files', after=format_cursor(files[-1]), **active_filters)
+        if has_next and files else None,
+    }
+    return render_template('list_files.html', files=prepared_files, filters=filters, pagination=pagination)
+
+def format_cursor(file):
+    """
+    Retorna o cursor de paginação de um arquivo: a sua chave (InsertionDate, FileID) em texto.
+    """
+    return f"{file.InsertionDate.isoformat()}_{file.FileID}"
+
+def parse_cursor(cursor):
+    """
+    Converte um cursor de paginação em uma tupla (InsertionDate, FileID), ou None se o cursor for inválido.
+    """
+    try:
+        insertion_date, file_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(insertion_date), int(file_id)
+    except (AttributeError, ValueError):
+        return None
+
+def keyset_condition(cursor, newer):
+    """
+    Condição dos arquivos depois do cursor na ordem da listagem: mais antigos (newer=False) ou mais recentes.
+    A comparação é expandida (em vez de uma comparação de tuplas) para que o MySQL use o índice de InsertionDate.
+    """
+    insertion_date, file_id = cursor
+    if newer:
+        return or_(File.InsertionDate > insertion_date,
+                   and_(File.InsertionDate == insertion_date, File.FileID > file_id))
+    return or_(File.InsertionDate < insertion_date,
+               and_(File.InsertionDate == insertion_date, File.FileID < file_id))
+
+# Rota para buscar arquivos pelos dados extraídos
+@app.route('/search', methods=['GET'])
+@login_required
+@permission_required(pl.EDITOR)
+def search_files():
+    """
+    Busca arquivos pelos campos extraídos, usando o índice tbFileSearch (preenchido na extração).
+
+    O campo é informado em `field` ('<TemplateID>:<campo>'). Campos de identificação (CNPJ/CPF, chave de
+    acesso, nosso número) são buscados pelo valor exato de `q`, nomes pelo prefixo de `q` e valores e datas
+    pela faixa entre `min` e `max`. Cada busca é uma leitura do índice (TemplateID, FieldName, valor), na
+    ordem do valor, paginada por chave com o cursor `after`.
+
+    Requer:
+    - Usuário autenticado.
+    - Permissão de EDITOR.
+    """
+    page_size = app.config['SEARCH_PAGE_SIZE']
+    params = {key: request.args.get(key, '') for key in ('field', 'q', 'min', 'max')}
+    field_groups = [
+        (type_name, [(f'{template_id}:{name}', name, field)
+                     for name, (_, field) in search_index.fields.get(template_id, {}).items()])
+        for type_name, (template_id, _) in document_pipeline.DOCUMENT_TYPES.items()
+    ]
+
+    template_id, _, field_name = params['field'].partition(':')
+    field = search_index.field(int(template_id), field_name) if template_id.isdigit() else None
+    conditions = None
+    if field is not None and field.search == 'range':
+        column = FileSearch.ValueNumber if field.kind == 'decimal' else FileSearch.ValueDate
+        low, high = (search_index.query_value(field, params[key]) for key in ('min', 'max'))
+        if (params['min'] and low is None) or (params['max'] and high is None):
+            flash('Valor inválido; use números (1234,56) ou datas (AAAA-MM-DD).', 'warning')
+        else:
+            conditions = [column.isnot(None)]
+            if low is not None:
+                conditions.append(column >= low)
+            if high is not None:
+                # Uma data sem horário inclui o dia inteiro
+                if field.kind != 'decimal' and high == datetime.combine(high.date(), datetime.min.time()):
+                    conditions.append(column < high + timedelta(days=1))
+                else:
+                    conditions.append(column <= high)
+    elif field is not None:
+        column = FileSearch.ValueText
+        value = search_index.query_value(field, params['q'])
+        if value:
+            conditions = [column.startswith(value, autoescape=True) if field.search == 'prefix' else column == value]
+
+    results = []
+    next_url = None
+    if conditions is not None:
+        query = select(FileSearch.SearchID, column.label('value'), File) \
+            .join(File, File.FileID == FileSearch.FileID) \
+            .where(FileSearch.TemplateID == int(template_id), FileSearch.FieldName == field_name, *conditions) \
+            .options(selectinload(File.file_data))
+        after = db.session.get(FileSearch, request.args.get('after', type=int)) if request.args.get('after') else None
+        if after is not None:
+            after_value = getattr(after, column.key)
+            query = query.where(or_(column > after_value,
+                                    and_(column == after_value, FileSearch.SearchID > after.SearchID)))
+        results = db.session.execute(query.order_by(column, FileSearch.SearchID).limit(page_size + 1)).all()
+        if len(results) > page_size:
+            results = results[:page_size]
+            next_url = url_for('search_files', after=results[-1].SearchID,
+                               **{key: value for key, value in params.items() if value})
+
+    return render_template('search_files.html', field_groups=field_groups, params=params, field=field,
+                           results=results, next_url=next_url)
+
+# Status dos arquivos cuja classificação e dados extraídos são reaproveitados por um novo envio do mesmo conteúdo
+REUSABLE_STATUSES = ('Uploaded', 'Extracted', 'Confirmed')
 
 # Rota para fazer upload de arquivos
 @app.route('/upload', methods=['GET', 'POST'])
@@ -95,53 +225,327 @@ def upload_file():
             flash('Nenhum arquivo selecionado.', 'danger')
             return redirect(url_for('upload_file'))
         
+        # Verifica se o diretório existe, se não, cria-o
+        if not os.path.exists(app.config['UPLOAD_FOLDER']):
+            os.makedirs(app.config['UPLOAD_FOLDER'])
+
+        uploads = []
         for file in files:
             if file:
-                filename = secure_filename(file.filename)
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                
-                # Verifica se o diretório existe, se não, cria-o
-                if not os.path.exists(app.config['UPLOAD_FOLDER']):
-                    os.makedirs(app.config['UPLOAD_FOLDER'])
-                
-                file.save(file_path)
-                prediction = pdf_classifier.predict_pdf_type(file_path)
-
-                templateID = 4
-                if prediction == "Nota Fiscal":
-                    extraction_strategy = NotaFiscalExtractionStrategy()
-                    templateID = 1
-                elif prediction == "Boleto":
-                    extraction_strategy = BoletoExtractionStrategy()
-                    templateID = 2
-                elif prediction == "Imposto de Renda":
-                    extraction_strategy = ImpostoDeRendaExtractionStrategy()
-                    templateID = 3
+                tmp_path, content_hash = save_upload(file)
+                uploads.append((secure_filename(file.filename), tmp_path, content_hash))
+
+        # Conteúdos já processados reaproveitam a classificação e os dados extraídos existentes; os que falharam ou
+        # ficaram presos na fila são processados novamente
+        known_files = {
+            known_file.ContentHash: known_file
+            for known_file in File.query.filter(File.ContentHash.in_([h for _, _, h in uploads])).all()
+        }
+        file_paths = []
+        content_hashes = []
+        duplicate_ids = []
+        requeued = {}
+        for filename, tmp_path, content_hash in uploads:
+            known_file = known_files.get(content_hash)
+            if known_file is None and content_hash not in content_hashes:
+                # O prefixo do hash evita que arquivos diferentes com o mesmo nome se sobrescrevam
+                file_path = os.path.join(app.config['UPLOAD_FOLDER'], f'{content_hash[:16]}_{filename}')
+                os.replace(tmp_path, file_path)
+                file_paths.append(file_path)
+                content_hashes.append(content_hash)
+                continue
+
+            if known_file is None:
+                os.remove(tmp_path)
+                flash(f'Arquivo "{filename}" repetido neste envio; apenas uma cópia será processada.', 'info')
+            elif known_file.Status in REUSABLE_STATUSES:
+                os.remove(tmp_path)
+                duplicate_ids.append(known_file.FileID)
+                flash(f'Arquivo "{filename}" duplicado: o mesmo conteúdo já foi enviado (arquivo {known_file.FileID}, '
+                      f'status {known_file.Status}); a classificação e os dados existentes foram reaproveitados.', 'info')
+            elif known_file.FileID not in requeued:
+                # Repõe o conteúdo no caminho já registrado, caso o arquivo tenha sido removido do disco
+                os.replace(tmp_path, known_file.FilePath)
+                requeued[known_file.FileID] = (filename, known_file.Status)
+            else:
+                os.remove(tmp_path)
+
+        # Arquivos que falharam ou ficaram presos em 'Processing' voltam para a fila
+        requeue_ids = list(requeued)
+        if requeue_ids:
+            queued_ids = requeue_files(requeue_ids, failed=True)
+            for file_id, (filename, status) in requeued.items():
+                if file_id in queued_ids:
+                    flash(f'Arquivo "{filename}" já enviado (arquivo {file_id}, status {status}) será processado '
+                          f'novamente.', 'info')
                 else:
-                    flash(f"Tipo de documento desconhecido para o arquivo {filename}.", 'warning')
-                    continue
+                    flash(f'Arquivo "{filename}" já enviado (arquivo {file_id}) ainda está em processamento.', 'info')
+            if app.config['INGESTION_ASYNC']:
+                ingestion_queue.submit(process_queued_files, queued_ids)
+            else:
+                process_queued_files(queued_ids)
+
+        # Em segundo plano: registra os arquivos na fila e responde sem esperar o processamento
+        if app.config['INGESTION_ASYNC']:
+            file_ids, failures = persist_files([
+                {'Status': 'Queued', 'FilePath': file_path, 'ContentHash': content_hash,
+                 'TemplateID': document_pipeline.UNKNOWN_TEMPLATE_ID}
+                for file_path, content_hash in zip(file_paths, content_hashes)
+            ])
+            for file_path, error in failures.items():
+                flash(f'Não foi possível registrar o arquivo "{os.path.basename(file_path)}": {error}', 'danger')
+            file_ids = list(file_ids.values())
+            if file_ids:
+                ingestion_queue.submit(process_queued_files, file_ids)
+                flash(f'{len(file_ids)} arquivo(s) enviado(s) para processamento.', 'info')
+            return redirect(url_for('upload_file', files=','.join(
+                str(file_id) for file_id in file_ids + requeue_ids + duplicate_ids)))
+
+        # Classifica e extrai os dados de todos os arquivos em lote, lendo cada PDF uma única vez, com o modelo
+        # mais recente do ModelStore
+        model_store.refresh(pdf_classifier, training_folders)
+        results = document_pipeline.process_many(file_paths, app.config['PIPELINE_MAX_WORKERS'])
+        content_hash_by_path = dict(zip(file_paths, content_hashes))
+        entries = []
+        predictions = {}
+        for result in results:
+            filename = os.path.basename(result.file_path)
+            if result.error:
+                flash(f"Não foi possível ler o arquivo {filename}: {result.error}", 'danger')
+                continue
+            if not result.is_known:
+                flash(f"Tipo de documento desconhecido para o arquivo {filename}.", 'warning')
+                continue
+            entries.append({
+                'Status': 'Uploaded',
+                'FilePath': result.file_path,
+                'ContentHash': content_hash_by_path[result.file_path],
+                'TemplateID': result.template_id,
+                'Information': result.data  # Gravado como objeto JSON nativo
+            })
+            predictions[result.file_path] = result.prediction
+
+        # Grava todos os arquivos e os seus dados extraídos em uma única transação
+        with document_pipeline.stage_seconds.labels(stage='db_commit').time():
+            file_ids, failures = persist_files(entries)
+        for entry in entries:
+            filename = os.path.basename(entry['FilePath'])
+            if entry['FilePath'] in file_ids:
+                flash(f'Arquivo "{filename}" do tipo {predictions[entry["FilePath"]]} salvo com sucesso!', 'success')
+            else:
+                flash(f'Não foi possível salvar o arquivo "{filename}": {failures[entry["FilePath"]]}', 'danger')
 
-                new_file = File(Status='Uploaded', FilePath=file_path, TemplateID=templateID)
-                db.session.add(new_file)
-                db.session.commit()
-                
-                # Extrair dados usando a estratégia selecionada
-                text = pdf_classifier.extract_text_from_pdf(file_path)
-                extracted_data = extraction_strategy.extract_data(text)
-
-                # Salva os dados extraídos na tabela FileData
-                new_file_data = FileData(
-                    FileID=new_file.FileID,  # Associa o FileData ao File criado
-                    Information=json.dumps(extracted_data)  # Converte o dicionário extracted_data para JSON
-                )
-                db.session.add(new_file_data)
-                db.session.commit()
-                
-                flash(f'Arquivo "{filename}" do tipo {prediction} salvo com sucesso!', 'success')
-        
         return redirect(url_for('upload_file'))
     
-    return render_template('upload_files.html')
+    return render_template('upload_files.html', file_ids=request.args.get('files', ''))
+
+
+def save_upload(file):
+    """
+    Grava o arquivo enviado em um arquivo temporário de UPLOAD_FOLDER, calculando o SHA-256 do conteúdo
+    durante a própria gravação (sem ler o arquivo novamente).
+
+    Retorna o caminho do arquivo temporário e o hash em hexadecimal.
+    """
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=app.config['UPLOAD_FOLDER'], prefix='.upload-')
+    with os.fdopen(fd, 'wb') as output:
+        for chunk in iter(lambda: file.stream.read(1024 * 1024), b''):
+            digest.update(chunk)
+            output.write(chunk)
+    return tmp_path, digest.hexdigest()
+
+
+def persist_files(entries):
+    """
+    Grava em lote os registros de File de um upload e, quando houver, os seus FileData, em uma única transação:
+    um INSERT em lote dos arquivos, uma consulta dos FileID gerados (pelo ContentHash, que é único) e um INSERT
+    em lote dos dados extraídos, seguidos de um único commit.
+
+    Se o lote falhar (por exemplo, quando um envio simultâneo gravou o mesmo conteúdo antes, violando o índice
+    único de ContentHash), cada arquivo é gravado em um savepoint próprio, ainda em uma única transação, e as
+    falhas são reportadas por arquivo.
+
+    Parâmetros:
+    - entries: Lista de dicionários com Status, FilePath, ContentHash, TemplateID e, opcionalmente, Information.
+
+    Retorna:
+    - Tupla ({FilePath: FileID} dos arquivos gravados, {FilePath: mensagem de erro} dos que falharam).
+    """
+    if not entries:
+        return {}, {}
+    file_rows = [{key: value for key, value in entry.items() if key != 'Information'} for entry in entries]
+    try:
+        db.session.execute(insert(File), file_rows)
+        file_ids = dict(db.session.execute(
+            select(File.ContentHash, File.FileID).where(File.ContentHash.in_([row['ContentHash'] for row in file_rows]))
+        ).all())
+        data_rows = [
+            {'FileID': file_ids[entry['ContentHash']], 'TemplateID': entry['TemplateID'], 'Information': entry['Information']}
+            for entry in entries if 'Information' in entry
+        ]
+        if data_rows:
+            db.session.execute(insert(FileData), data_rows)
+            index_file_data(data_rows)
+        db.session.commit()
+        return {entry['FilePath']: file_ids[entry['ContentHash']] for entry in entries}, {}
+    except SQLAlchemyError:
+        db.session.rollback()
+
+    saved = {}
+    failures = {}
+    for entry, file_row in zip(entries, file_rows):
+        try:
+            with db.session.begin_nested():
+                new_file = File(**file_row)
+                db.session.add(new_file)
+                db.session.flush()
+                if 'Information' in entry:
+                    data_row = {'FileID': new_file.FileID, 'TemplateID': entry['TemplateID'],
+                                'Information': entry['Information']}
+                    db.session.add(FileData(**data_row))
+                    db.session.flush()
+                    index_file_data([data_row])
+            saved[entry['FilePath']] = new_file.FileID
+        except SQLAlchemyError as e:
+            known_file = File.query.filter_by(ContentHash=entry['ContentHash']).first()
+            if known_file is not None:
+                # Outro envio gravou o mesmo conteúdo antes; a cópia deste envio é descartada
+                if known_file.FilePath != entry['FilePath'] and os.path.exists(entry['FilePath']):
+                    os.remove(entry['FilePath'])
+                failures[entry['FilePath']] = f'o mesmo conteúdo já foi enviado (arquivo {known_file.FileID})'
+            else:
+                failures[entry['FilePath']] = str(getattr(e, 'orig', None) or e)
+    db.session.commit()
+    return saved, failures
+
+
+def index_file_data(data_rows):
+    """
+    Grava, na transação atual, as entradas do índice de busca (tbFileSearch) dos registros de FileData
+    informados (dicionários com FileID, TemplateID e Information), em um único INSERT em lote.
+    """
+    entries = [
+        {'FileID': row['FileID'], **entry}
+        for row in data_rows
+        for entry in search_index.entries(row['TemplateID'], row['Information'])
+    ]
+    if entries:
+        db.session.execute(insert(FileSearch), entries)
+
+
+def process_queued_files(file_ids):
+    """
+    Processa um lote de arquivos enfileirados pelo upload: Queued -> Processing -> Extracted/Failed.
+
+    Executada pelas threads da IngestionQueue, dentro do contexto da aplicação. Arquivos que não puderam ser
+    lidos ou cujo tipo é desconhecido terminam com o status 'Failed'.
+
+    Cada arquivo é reservado com um UPDATE condicional (Queued -> Processing): quando o mesmo arquivo é
+    enfileirado por mais de um processo (por exemplo, na retomada da fila na inicialização), apenas um o processa.
+    """
+    claimed = [
+        file_id for file_id in file_ids
+        if db.session.execute(
+            update(File).where(File.FileID == file_id, File.Status == 'Queued').values(Status='Processing')
+        ).rowcount == 1
+    ]
+    db.session.commit()
+    if not claimed:
+        return
+    files = File.query.filter(File.FileID.in_(claimed)).order_by(File.FileID).all()
+
+    try:
+        # A fila já é paralela; o lote é extraído na própria thread, sem um pool de processos por lote
+        model_store.refresh(pdf_classifier, training_folders)
+        results = document_pipeline.process_many([file.FilePath for file in files], max_workers=1)
+        data_rows = []
+        for file, result in zip(files, results):
+            if result.error or not result.is_known:
+                file.Status = 'Failed'
+                continue
+            file.TemplateID = result.template_id
+            data_rows.append({'FileID': file.FileID, 'TemplateID': result.template_id, 'Information': result.data})
+            file.Status = 'Extracted'
+        with document_pipeline.stage_seconds.labels(stage='db_commit').time():
+            if data_rows:
+                db.session.execute(insert(FileData), data_rows)
+                index_file_data(data_rows)
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        File.query.filter(File.FileID.in_([file.FileID for file in files])).update(
+            {File.Status: 'Failed'}, synchronize_session=False)
+        db.session.commit()
+        raise
+
+
+def requeue_files(file_ids=None, failed=False):
+    """
+    Volta para 'Queued' os arquivos em 'Processing' enviados há mais de INGESTION_STALE_SECONDS (o processo que
+    os processava terminou antes de concluir) e, com `failed`, também os que terminaram em 'Failed'.
+
+    Parâmetros:
+    - file_ids: Os FileID considerados (por padrão, todos os arquivos).
+    - failed: Se os arquivos em 'Failed' também voltam para a fila.
+
+    Retorna:
+    - Lista dos FileID em 'Queued', prontos para serem enfileirados.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=app.config['INGESTION_STALE_SECONDS'])
+    requeue = and_(File.Status == 'Processing', File.InsertionDate < stale_before)
+    if failed:
+        requeue = or_(requeue, File.Status == 'Failed')
+    selected = [File.FileID.in_(file_ids)] if file_ids is not None else []
+    File.query.filter(*selected, requeue).update({File.Status: 'Queued'}, synchronize_session=False)
+    db.session.commit()
+    return db.session.scalars(
+        select(File.FileID).where(*selected, File.Status == 'Queued').order_by(File.InsertionDate, File.FileID)
+    ).all()
+
+
+def recover_queued_files():
+    """
+    Retoma a fila de processamento na inicialização da aplicação: os arquivos presos em 'Processing' voltam para
+    'Queued' (requeue_files), e todos os arquivos em 'Queued' são enfileirados novamente.
+
+    Retorna:
+    - Lista dos FileID enfileirados.
+    """
+    try:
+        file_ids = requeue_files()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        print(f"Não foi possível retomar a fila de processamento: {e}")
+        return []
+    if file_ids:
+        ingestion_queue.submit(process_queued_files, file_ids)
+    return file_ids
+
+
+# Rota para consultar o status de processamento dos arquivos
+@app.route('/files/status', methods=['GET'])
+@login_required
+@permission_required(pl.EDITOR)
+def files_status():
+    """
+    Retorna, em JSON, o status dos arquivos informados em `ids` (separados por vírgula).
+
+    Requer:
+    - Usuário autenticado.
+    - Permissão de EDITOR (a mesma da listagem e do upload).
+    """
+    file_ids = [int(file_id) for file_id in request.args.get('ids', '').split(',') if file_id.isdigit()]
+    files = File.query.filter(File.FileID.in_(file_ids)).all() if file_ids else []
+    return jsonify([
+        {
+            'FileID': file.FileID,
+            'FileName': os.path.basename(file.FilePath),
+            'Status': file.Status,
+            'TemplateID': file.TemplateID,
+        }
+        for file in files
+    ])
 
 
 # Rota para deletar arquivos
@@ -162,6 +566,9 @@ def delete_file(file_id):
     file = File.query.get_or_404(file_id)
     try:
         file.delete_file()
+        # Remove antes os registros que dependem do arquivo (índice de busca e dados extraídos)
+        FileSearch.query.filter_by(FileID=file.FileID).delete()
+        FileData.query.filter_by(FileID=file.FileID).delete()
         db.session.delete(file)
         db.session.commit()
         flash('Arquivo deletado com sucesso!', 'success')
@@ -169,43 +576,177 @@ def delete_file(file_id):
         flash(f'Ocorreu um erro ao deletar o arquivo: {str(e)}', 'danger')
     return redirect(url_for('list_files'))
 
+# Rota para confirmar o tipo de um arquivo
+@app.route('/confirm_file/<int:file_id>', methods=['POST'])
+@login_required
+@permission_required(pl.EDITOR)
+def confirm_file(file_id):
+    """
+    Confirma (ou corrige) o tipo de um arquivo e atualiza o classificador de forma incremental com ele.
+
+    O arquivo também é copiado para o diretório de treinamento do seu tipo, e o modelo atualizado é salvo no
+    ModelStore sob a impressão digital do corpus com a cópia: os demais processos o carregam antes de classificar,
+    e a próxima inicialização o reaproveita em vez de treinar novamente. Um arquivo já confirmado não é contado
+    de novo no modelo; se o seu tipo for corrigido, apenas a cópia de treinamento muda de diretório, e o modelo
+    é treinado novamente com o corpus corrigido na próxima inicialização.
+
+    Métodos:
+    - POST: Processa a confirmação do tipo do arquivo.
+
+    Requer:
+    - Usuário autenticado.
+    - Permissão de EDITOR.
+    """
+    file = File.query.get_or_404(file_id)
+    template_id = request.form.get('template_id', file.TemplateID, type=int)
+    label = document_pipeline.label_for_template(template_id)
+    if label is None:
+        flash('Selecione um tipo de documento conhecido para confirmar o arquivo.', 'warning')
+        return redirect(url_for('list_files'))
+
+    already_confirmed = file.Status == 'Confirmed'
+    training_name = f'confirmed_{file.FileID}_{os.path.basename(file.FilePath)}'
+    try:
+        text = pdf_classifier.extract_text_from_pdf(file.FilePath)
+        if not already_confirmed:
+            # Parte do modelo salvo por outro processo, para não descartar as confirmações feitas nele
+            model_store.refresh(pdf_classifier, training_folders)
+            pdf_classifier.partial_update([text], [label])
+        for folder_label, folder in training_folders.items():
+            if folder_label != label and os.path.exists(os.path.join(folder, training_name)):
+                os.remove(os.path.join(folder, training_name))
+        training_path = os.path.join(training_folders[label], training_name)
+        if not os.path.exists(training_path):
+            shutil.copy2(file.FilePath, training_path)
+        if not already_confirmed:
+            model_store.save(pdf_classifier, training_folders)
+    except Exception as e:
+        flash(f'Ocorreu um erro ao confirmar o arquivo: {str(e)}', 'danger')
+        return redirect(url_for('list_files'))
+
+    # Se o tipo foi corrigido (ou o arquivo falhou no processamento), extrai os dados com a estratégia do tipo confirmado
+    if template_id != file.TemplateID or not file.file_data:
+        file.TemplateID = template_id
+        information = document_pipeline.extract_for_template(template_id, text)
+        for file_data in file.file_data:
+            file_data.TemplateID = template_id
+            file_data.Information = information
+        if not file.file_data:
+            db.session.add(FileData(FileID=file.FileID, TemplateID=template_id, Information=information))
+        # Reindexa o arquivo com os dados do tipo confirmado
+        FileSearch.query.filter_by(FileID=file.FileID).delete()
+        index_file_data([{'FileID': file.FileID, 'TemplateID': template_id, 'Information': information}])
+    file.Status = 'Confirmed'
+    db.session.commit()
+    flash('Arquivo confirmado com sucesso!', 'success')
+    return redirect(url_for('list_files'))
+
 @app.route('/export_excel', methods=['POST'])
 @login_required
 @permission_required(pl.EDITOR)
 def export_excel():
     """
-    Exporta os arquivos relacionados a um TemplateID para um arquivo Excel.
-    
+    Exporta os arquivos relacionados a um TemplateID para um arquivo Excel ou CSV, com memória constante.
+
+    Os registros são lidos em lotes pela chave de FileData (sem carregar todos os arquivos de uma vez). O Excel é
+    montado em modo somente escrita em um arquivo temporário; o CSV é enviado em partes à medida que é gerado,
+    de modo que o download começa imediatamente.
+
+    Os formatos 'parquet' e 'flat_csv' exportam uma coluna tipada por campo extraído do template (números,
+    datas e textos), em vez do JSON completo. Sem o pyarrow instalado, 'parquet' é exportado como 'flat_csv'.
+
     Requer:
     - Usuário autenticado.
     - Permissão de EDITOR.
     """
-    template_id = request.form.get('template_id')
-    files = File.query.filter_by(TemplateID=template_id).all()
+    template_id = request.form.get('template_id', type=int)
+    export_format = request.form.get('format', 'xlsx')
 
-    if not files:
+    if db.session.query(File.FileID).join(FileData).filter(File.TemplateID == template_id).first() is None:
         flash('Nenhum arquivo encontrado para o Template selecionado.', 'warning')
         return redirect(url_for('list_files'))
 
-    data = []
-    for file in files:
-        for file_data in file.file_data:
-            data.append({
-                'FileID': file.FileID,
-                'Status': file.Status,
-                'InsertionDate': file.InsertionDate,
-                'FilePath': file.FilePath,
-                'TemplateID': file.TemplateID,
-                'DataID': file_data.DataID,
-                'FileData_InsertionDate': file_data.InsertionDate,
-                'Information': file_data.Information
-            })
+    if export_format in ('parquet', 'flat_csv'):
+        return export_columnar(template_id, export_format)
 
-    df = pd.DataFrame(data)
+    rows = iter_export_rows(template_id, app.config['EXPORT_BATCH_SIZE'])
+    if export_format == 'csv':
+        return Response(stream_with_context(stream_csv(rows)), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=files_export.csv'})
 
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Files')
-    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Files')
+    sheet.append(EXPORT_COLUMNS)
+    for row in rows:
+        sheet.append(row)
+    # O arquivo temporário é removido quando a resposta termina de ser enviada
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
     output.seek(0)
-    return send_file(output, as_attachment=True, download_name='files_export.xlsx', mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
\ No newline at end of file
+    return send_file(output, as_attachment=True, download_name='files_export.xlsx', mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+EXPORT_COLUMNS = ['FileID', 'Status', 'InsertionDate', 'FilePath', 'TemplateID', 'DataID', 'FileData_InsertionDate',
+                  'Information']
+
+def iter_export_batches(columns, template_id, batch_size):
+    """
+    Gera os registros da exportação de um TemplateID em lotes de `batch_size` (paginação por DataID), de modo
+    que apenas um lote fica em memória por vez. `columns` são as colunas selecionadas, incluindo FileData.DataID.
+    """
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(*columns)
+            .join(FileData, FileData.FileID == File.FileID)
+            .where(File.TemplateID == template_id, FileData.DataID > last_id)
+            .order_by(FileData.DataID)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].DataID
+
+def iter_export_rows(template_id, batch_size):
+    """
+    Gera as linhas da exportação de um TemplateID, com o campo Information como texto JSON.
+    """
+    columns = (File.FileID, File.Status, File.InsertionDate, File.FilePath, File.TemplateID,
+               FileData.DataID, FileData.InsertionDate, FileData.Information)
+    for rows in iter_export_batches(columns, template_id, batch_size):
+        for row in rows:
+            yield (*row[:-1], json.dumps(row[-1], ensure_ascii=False))
+
+def export_columnar(template_id, export_format):
+    """
+    Exporta os dados de um TemplateID com uma coluna tipada por campo, em Parquet ou em CSV.
+    """
+    exporter = ColumnarExporter(document_pipeline.fields_for_template(template_id))
+    columns = (File.FileID, File.Status, File.InsertionDate, File.FilePath, FileData.DataID, FileData.Information)
+    batches = iter_export_batches(columns, template_id, app.config['EXPORT_BATCH_SIZE'])
+    if export_format == 'parquet' and exporter.parquet_available():
+        # O arquivo temporário é removido quando a resposta termina de ser enviada
+        output = tempfile.TemporaryFile()
+        exporter.write_parquet(batches, output)
+        output.seek(0)
+        return send_file(output, as_attachment=True, download_name='files_export.parquet',
+                         mimetype='application/vnd.apache.parquet')
+    return Response(stream_with_context(exporter.iter_csv(batches)), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=files_export_flat.csv'})
+
+def stream_csv(rows, chunk_size=64 * 1024):
+    """
+    Gera o CSV da exportação em partes de aproximadamente `chunk_size` caracteres.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    # BOM para que o Excel reconheça o CSV como UTF-8
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()